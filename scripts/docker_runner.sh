@@ -57,8 +57,11 @@ check_environment() {
     local error_message=""
 
     # 檢查必要的參數
-    [ -z "$PTT_USERNAME" ] && { error_message="$error_message PTT_USERNAME"; missing_vars=$((missing_vars + 1)); }
-    [ -z "$PTT_PASSWORD" ] && { error_message="$error_message PTT_PASSWORD"; missing_vars=$((missing_vars + 1)); }
+    # 使用帳號檔案或編號帳號 (PTT_USERNAME_1 ...) 時不需要 PTT_USERNAME/PTT_PASSWORD
+    if [ -z "$PTT_ACCOUNTS_FILE" ] && [ -z "$PTT_USERNAME_1" ]; then
+        [ -z "$PTT_USERNAME" ] && { error_message="$error_message PTT_USERNAME"; missing_vars=$((missing_vars + 1)); }
+        [ -z "$PTT_PASSWORD" ] && { error_message="$error_message PTT_PASSWORD"; missing_vars=$((missing_vars + 1)); }
+    fi
     [ -z "$TELEGRAM_BOT_TOKEN" ] && { error_message="$error_message TELEGRAM_BOT_TOKEN"; missing_vars=$((missing_vars + 1)); }
     [ -z "$TELEGRAM_CHAT_ID" ] && { error_message="$error_message TELEGRAM_CHAT_ID"; missing_vars=$((missing_vars + 1)); }
 
@@ -111,9 +114,26 @@ run_ptt_login() {
         log_message "PTT 程式執行完成，狀態碼: $status"
     fi
     
-    # 提取登入統計
-    successful_logins=$(echo "$output" | grep -o "登入成功：[0-9]*" | grep -o "[0-9]*" || echo "0")
-    failed_logins=$(echo "$output" | grep -o "登入失敗：[0-9]*" | grep -o "[0-9]*" || echo "0")
+    # 提取登入統計（LOG_FORMAT=json 時解析 batch_summary 事件）
+    if [ "$(echo "${LOG_FORMAT:-}" | tr '[:upper:]' '[:lower:]')" = "json" ]; then
+        read -r successful_logins failed_logins < <(echo "$output" | $PYTHON_PATH -c '
+import json, sys
+succeeded = failed = 0
+for line in sys.stdin:
+    try:
+        record = json.loads(line)
+    except ValueError:
+        continue
+    if isinstance(record, dict) and record.get("event") == "batch_summary":
+        succeeded, failed = record.get("succeeded", 0), record.get("failed", 0)
+print(succeeded, failed)
+')
+    else
+        successful_logins=$(echo "$output" | grep -o "登入成功：[0-9]*" | grep -o "[0-9]*" || echo "0")
+        failed_logins=$(echo "$output" | grep -o "登入失敗：[0-9]*" | grep -o "[0-9]*" || echo "0")
+    fi
+    successful_logins=${successful_logins:-0}
+    failed_logins=${failed_logins:-0}
     total_accounts=$((successful_logins + failed_logins))
     
     # 顯示結果摘要
@@ -433,6 +453,7 @@ show_usage() {
     echo "環境變數:"
     echo "  PTT_USERNAME       PTT 帳號"
     echo "  PTT_PASSWORD       PTT 密碼"
+    echo "  PTT_ACCOUNTS_FILE  多帳號檔案 (.csv/.jsonl/.toml，可取代 PTT_USERNAME/PTT_PASSWORD)"
     echo "  TELEGRAM_BOT_TOKEN Telegram 機器人 Token"
     echo "  TELEGRAM_CHAT_ID   Telegram 聊天 ID"
     echo "  TEST_MODE          測試模式 (true/false)"
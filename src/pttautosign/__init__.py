@@ -2,14 +2,8 @@
 PTT Auto Sign - A tool for automatic PTT login with Telegram notifications.
 """
 
-from importlib.metadata import PackageNotFoundError, version as _pkg_version
 from typing import TYPE_CHECKING, Any
 
-try:
-    __version__ = _pkg_version("pttautosign")
-except PackageNotFoundError:  # not installed (e.g. running from a source tree)
-    __version__ = "0.0.0"
-
 __author__ = "crazycat836"
 __email__ = "crazycat836@gmail.com"
 
@@ -21,6 +15,7 @@ __all__ = [
 ]
 
 if TYPE_CHECKING:  # for type checkers / IDEs only — no runtime import
+    __version__: str
     from pttautosign.utils.config import AppConfig, ConfigValidationError
     from pttautosign.utils.app_context import AppContext
     from pttautosign.main import main
@@ -34,6 +29,16 @@ def __getattr__(name: str) -> Any:
     keeps modules such as ``pttautosign.utils.config`` importable in isolation
     (e.g. for unit tests) without triggering global state mutation.
     """
+    if name == "__version__":
+        # importlib.metadata is slow to import; only the benchmarks need this.
+        from importlib.metadata import PackageNotFoundError, version as _pkg_version
+
+        try:
+            version = _pkg_version("pttautosign")
+        except PackageNotFoundError:  # not installed (e.g. running from a source tree)
+            version = "0.0.0"
+        globals()["__version__"] = version
+        return version
     if name in ("AppConfig", "ConfigValidationError"):
         from pttautosign.utils import config
 
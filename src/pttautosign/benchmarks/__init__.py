@@ -0,0 +1 @@
+"""Micro- and macro-benchmarks for the hot paths (``pttautosign bench``)."""
@@ -0,0 +1,106 @@
+"""
+``pttautosign bench`` command line.
+"""
+
+import argparse
+import sys
+from typing import List, Optional
+
+from pttautosign.benchmarks.harness import (
+    BenchResult,
+    compare,
+    load_results,
+    sample_mismatches,
+    to_document,
+    write_results,
+)
+from pttautosign.benchmarks.suites import SUITES, BenchOptions
+from pttautosign.utils.config import LOGIN_ENGINES
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse ``pttautosign bench`` arguments"""
+    parser = argparse.ArgumentParser(prog="pttautosign bench", description="Benchmark the PTT Auto Sign hot paths")
+    parser.add_argument("--only", help=f"Comma-separated suites to run ({', '.join(SUITES)})")
+    parser.add_argument("--output", "-o", help="Write results as JSON to this file")
+    parser.add_argument("--baseline", help="Compare against a results file and fail on regressions")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown vs. baseline (default 0.2 = 20%%)")
+    parser.add_argument("--sizes", default="1,10,100,1000", help="Batch sizes for batch_login")
+    parser.add_argument("--engines", default="thread,async,process", help="Login engines for batch_login")
+    parser.add_argument("--ptt-latency-ms", type=float, default=5.0, help="Injected latency per PTT screen")
+    parser.add_argument("--concurrency", type=int, default=5, help="ptt_max_concurrency for batch_login")
+    parser.add_argument("--quick", action="store_true", help="Fewer rounds and calls (smoke run)")
+    parser.add_argument("--note", default="", help="Free-text note stored in the --output file")
+    return parser.parse_args(argv)
+
+
+def _format_row(result: BenchResult) -> str:
+    line = f"{result.name:<32} median {result.median_ms:>10.3f} ms   p95 {result.p95_ms:>10.3f} ms"
+    if "accounts_per_sec" in result.extra:
+        line += f"   {result.extra['accounts_per_sec']:>8.1f} accounts/s"
+    return line
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the selected suites.
+
+    Returns:
+        int: Exit code; 1 when a regression against the baseline was found
+    """
+    args = parse_args(argv)
+
+    selected = list(SUITES)
+    if args.only:
+        selected = [name.strip() for name in args.only.split(",") if name.strip()]
+        unknown = [name for name in selected if name not in SUITES]
+        if unknown:
+            print(f"Unknown suite(s): {', '.join(unknown)}", file=sys.stderr)
+            return 2
+
+    engines = tuple(engine.strip() for engine in args.engines.split(",") if engine.strip())
+    unknown = [engine for engine in engines if engine not in LOGIN_ENGINES]
+    if unknown:
+        print(f"Unknown engine(s): {', '.join(unknown)} (choose from {', '.join(LOGIN_ENGINES)})", file=sys.stderr)
+        return 2
+
+    options = BenchOptions(
+        sizes=tuple(int(size) for size in args.sizes.split(",") if size.strip()),
+        engines=engines,
+        ptt_latency_ms=args.ptt_latency_ms,
+        concurrency=args.concurrency,
+        quick=args.quick,
+    )
+
+    results: List[BenchResult] = []
+    for name in selected:
+        for result in SUITES[name](options):
+            print(_format_row(result), flush=True)
+            results.append(result)
+
+    if args.output:
+        write_results(args.output, results, args.note)
+        print(f"Results written to {args.output}")
+
+    if not args.baseline:
+        return 0
+
+    current = to_document(results)["results"]
+    baseline = load_results(args.baseline)
+    skipped = sample_mismatches(current, baseline)
+    if skipped:
+        print(f"Skipped {len(skipped)} case(s) sampled differently from {args.baseline} (--quick vs. full run?)")
+    regressions = compare(current, baseline, args.threshold)
+    if not regressions:
+        print(f"No regressions against {args.baseline} (threshold {args.threshold:.0%})")
+        return 0
+    print(f"{len(regressions)} regression(s) against {args.baseline} (threshold {args.threshold:.0%}):")
+    for regression in regressions:
+        print(
+            f"  {regression.name}: {regression.baseline_ms:.3f} ms -> {regression.current_ms:.3f} ms"
+            f" (x{regression.ratio:.2f})"
+        )
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
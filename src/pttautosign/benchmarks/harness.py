@@ -0,0 +1,190 @@
+"""
+Timing, result files and baseline comparison for the benchmark suite.
+"""
+
+import json
+import platform
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from pttautosign import __version__
+from pttautosign.utils.metrics import LatencyHistogram
+
+# Statistic compared against the baseline (lower is better).
+COMPARE_STAT = "median_ms"
+
+
+@dataclass
+class BenchResult:
+    """Timing statistics of one benchmark case (milliseconds per call)."""
+    name: str
+    min_ms: float
+    median_ms: float
+    mean_ms: float
+    p95_ms: float
+    max_ms: float
+    repeat: int
+    number: int
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a JSON-serialisable dictionary (without the name)."""
+        result = {
+            "min_ms": self.min_ms,
+            "median_ms": self.median_ms,
+            "mean_ms": self.mean_ms,
+            "p95_ms": self.p95_ms,
+            "max_ms": self.max_ms,
+            "repeat": self.repeat,
+            "number": self.number,
+        }
+        result.update(self.extra)
+        return result
+
+
+@dataclass
+class Regression:
+    """A benchmark that got slower than its baseline by more than the threshold."""
+    name: str
+    baseline_ms: float
+    current_ms: float
+
+    @property
+    def ratio(self) -> float:
+        """Current time divided by the baseline time."""
+        return self.current_ms / self.baseline_ms if self.baseline_ms else float("inf")
+
+
+def summarize(name: str, samples: List[float], number: int = 1, **extra: Any) -> BenchResult:
+    """Build a :class:`BenchResult` from per-call samples (milliseconds)."""
+    histogram = LatencyHistogram()
+    for sample in samples:
+        histogram.add(sample)
+    return BenchResult(
+        name=name,
+        min_ms=min(samples),
+        median_ms=histogram.percentile(50),
+        mean_ms=sum(samples) / len(samples),
+        p95_ms=histogram.percentile(95),
+        max_ms=histogram.percentile(100),
+        repeat=len(samples),
+        number=number,
+        extra=extra,
+    )
+
+
+def measure(name: str, func: Callable[[], Any], repeat: int = 5, number: int = 1, warmup: int = 1, **extra: Any) -> BenchResult:
+    """Time ``func``.
+
+    ``func`` is called ``warmup`` times untimed, then ``repeat`` rounds of
+    ``number`` calls are timed; each sample is the mean time per call of one
+    round.
+
+    Args:
+        name: Benchmark case name
+        func: Zero-argument callable to time
+        repeat: Number of timed rounds
+        number: Calls per round
+        warmup: Untimed calls before the first round
+        **extra: Additional fields stored with the result
+
+    Returns:
+        BenchResult: Timing statistics
+    """
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - start) * 1000 / number)
+    return summarize(name, samples, number, **extra)
+
+
+def environment() -> Dict[str, str]:
+    """Describe the machine the benchmarks ran on."""
+    return {
+        "pttautosign": __version__,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
+def to_document(results: List[BenchResult], note: str = "") -> Dict[str, Any]:
+    """Results file content: environment plus one entry per case."""
+    document: Dict[str, Any] = {"environment": environment()}
+    if note:
+        document["note"] = note
+    document["results"] = {result.name: result.to_dict() for result in results}
+    return document
+
+
+def write_results(path: str, results: List[BenchResult], note: str = "") -> None:
+    """Write ``results`` as JSON to ``path`` (``note`` is stored alongside)."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(to_document(results, note), f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+
+def load_results(path: str) -> Dict[str, Dict[str, Any]]:
+    """Read the per-case results from a file written by :func:`write_results`."""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["results"]
+
+
+def sample_mismatches(current: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]]) -> List[str]:
+    """Cases measured with different ``repeat``/``number`` in the two files.
+
+    A ``--quick`` run and a full run sample differently, so their medians
+    are not comparable.
+    """
+    return [
+        name
+        for name, result in current.items()
+        if name in baseline
+        and any(
+            key in result and key in baseline[name] and result[key] != baseline[name][key]
+            for key in ("repeat", "number")
+        )
+    ]
+
+
+def compare(
+    current: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Dict[str, Any]],
+    threshold: float = 0.2,
+    stat: Optional[str] = None,
+) -> List[Regression]:
+    """Find cases that are more than ``threshold`` slower than the baseline.
+
+    Only cases present in both files and sampled the same way (see
+    :func:`sample_mismatches`) are compared.
+
+    Args:
+        current: Per-case results of this run
+        baseline: Per-case results of the stored baseline
+        threshold: Allowed slowdown as a fraction (0.2 = 20 %)
+        stat: Statistic to compare (``median_ms`` by default)
+
+    Returns:
+        List[Regression]: Regressed cases, worst first
+    """
+    stat = stat or COMPARE_STAT
+    skipped = set(sample_mismatches(current, baseline))
+    regressions = []
+    for name, result in current.items():
+        if name not in baseline or name in skipped:
+            continue
+        base_ms = baseline[name].get(stat)
+        current_ms = result.get(stat)
+        if base_ms is None or current_ms is None:
+            continue
+        if current_ms > base_ms * (1 + threshold):
+            regressions.append(Regression(name, base_ms, current_ms))
+    return sorted(regressions, key=lambda r: r.ratio, reverse=True)
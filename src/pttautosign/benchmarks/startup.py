@@ -0,0 +1,152 @@
+"""
+Import-time profile of a sign-in run's startup (``pttautosign --profile-startup``).
+"""
+
+import os
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Optional
+
+import pttautosign
+
+# Cold start budget (milliseconds) for ``--profile-startup``: interpreter
+# start up to the point a sign-in run opens its first PTT connection. Without
+# a bytecode cache (``PYTHONDONTWRITEBYTECODE=1`` and no precompiled .pyc)
+# compiling PyPtt, websockets and requests alone blows it.
+STARTUP_BUDGET_MS = 1000.0
+
+# What ``pttautosign.main`` does before the first socket opens: load .env,
+# patch PyPtt, import the application context and the configured login
+# engine. Nothing connects and no credentials are needed.
+_STARTUP_CODE = (
+    "import os;"
+    "from dotenv import load_dotenv; load_dotenv();"
+    "from pttautosign.patches.pyptt_patch import apply_patches; apply_patches();"
+    "import pttautosign.utils.app_context;"
+    "from pttautosign.utils.factory import login_service_class;"
+    "login_service_class(os.getenv('ptt_login_engine', 'thread').lower())"
+)
+
+# ``-X importtime`` line: "import time: <self us> | <cumulative us> | <indent><module>"
+_IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)\s*$")
+
+
+@dataclass
+class ImportRecord:
+    """One module import as reported by ``-X importtime``."""
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+@dataclass
+class StartupProfile:
+    """Cold start time and the per-module import breakdown behind it."""
+    cold_start_ms: float
+    imports: List[ImportRecord]
+
+    @property
+    def import_ms(self) -> float:
+        """Time spent importing, summed over every module."""
+        return sum(record.self_us for record in self.imports) / 1000
+
+    def slowest(self, count: int = 15) -> List[ImportRecord]:
+        """Modules with the highest self time."""
+        return sorted(self.imports, key=lambda record: record.self_us, reverse=True)[:count]
+
+    def by_package(self) -> Dict[str, float]:
+        """Self time per top-level package in milliseconds, largest first."""
+        totals: Dict[str, float] = defaultdict(float)
+        for record in self.imports:
+            totals[record.module.partition(".")[0]] += record.self_us / 1000
+        return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+
+def parse_importtime(output: str) -> List[ImportRecord]:
+    """Parse the ``-X importtime`` lines of ``output`` (other lines are ignored)."""
+    records = []
+    for line in output.splitlines():
+        match = _IMPORTTIME_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            records.append(ImportRecord(module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return records
+
+
+def _startup_env(env: Optional[Mapping[str, str]]) -> Dict[str, str]:
+    """``env`` (default ``os.environ``) with this package importable from a source tree."""
+    env = dict(os.environ if env is None else env)
+    src_dir = os.path.dirname(os.path.dirname(pttautosign.__file__))
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [src_dir, env.get("PYTHONPATH")]))
+    return env
+
+
+def _run(args: List[str], env: Dict[str, str]) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, *args, "-c", _STARTUP_CODE], capture_output=True, text=True, check=True, env=env)
+
+
+def cold_start_ms(env: Optional[Mapping[str, str]] = None) -> float:
+    """Wall time of a sign-in run's startup in a fresh interpreter, in milliseconds.
+
+    Includes interpreter start. The run inherits ``PYTHONDONTWRITEBYTECODE``
+    and any bytecode cache, like a cron run does.
+
+    Args:
+        env: Environment for the run (``os.environ`` by default)
+    """
+    env = _startup_env(env)
+    started = time.perf_counter()
+    _run([], env)
+    return (time.perf_counter() - started) * 1000
+
+
+def profile_startup(env: Optional[Mapping[str, str]] = None) -> StartupProfile:
+    """Profile the startup of a sign-in run in fresh interpreters.
+
+    The cold start is timed by :func:`cold_start_ms` and the import breakdown
+    collected in a second run under ``-X importtime``, whose bookkeeping would
+    otherwise inflate the timing.
+
+    Args:
+        env: Environment for the runs (``os.environ`` by default)
+    """
+    elapsed_ms = cold_start_ms(env)
+    imports = parse_importtime(_run(["-X", "importtime"], _startup_env(env)).stderr)
+    return StartupProfile(cold_start_ms=elapsed_ms, imports=imports)
+
+
+def format_profile(profile: StartupProfile, top: int = 15, budget_ms: float = STARTUP_BUDGET_MS) -> str:
+    """Human-readable report of ``profile``."""
+    lines = [
+        f"Cold start: {profile.cold_start_ms:.1f} ms (budget {budget_ms:.0f} ms)",
+        f"Imports:    {profile.import_ms:.1f} ms across {len(profile.imports)} modules",
+        "",
+        "By package (self time):",
+    ]
+    for package, total_ms in list(profile.by_package().items())[:top]:
+        lines.append(f"  {package:<40} {total_ms:>9.1f} ms")
+    lines += ["", "Slowest modules (self / cumulative):"]
+    for record in profile.slowest(top):
+        lines.append(
+            f"  {record.module:<40} {record.self_us / 1000:>9.1f} ms {record.cumulative_us / 1000:>9.1f} ms"
+        )
+    return "\n".join(lines)
+
+
+def main(top: int = 15, budget_ms: float = STARTUP_BUDGET_MS) -> int:
+    """Print the startup profile.
+
+    Returns:
+        int: Exit code; 1 when the cold start is over ``budget_ms``
+    """
+    profile = profile_startup()
+    print(format_profile(profile, top=top, budget_ms=budget_ms))
+    if profile.cold_start_ms > budget_ms:
+        print(f"Cold start is over budget by {profile.cold_start_ms - budget_ms:.1f} ms", file=sys.stderr)
+        return 1
+    return 0
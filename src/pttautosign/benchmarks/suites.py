@@ -0,0 +1,325 @@
+"""
+Benchmark cases for the hot paths.
+
+Every suite takes :class:`BenchOptions` and returns a list of
+:class:`~pttautosign.benchmarks.harness.BenchResult`. Nothing here touches
+the network: PTT is replaced by an in-process stub with injected latency (or,
+for the process engine, whose workers cannot see the stub, by the local fake
+PTT server) and Telegram by a local HTTP stub.
+"""
+
+import logging
+import os
+import subprocess
+import sys
+import time
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from unittest.mock import patch
+
+import pttautosign
+from pttautosign.benchmarks.harness import BenchResult, measure, summarize
+from pttautosign.utils.interfaces import NotificationService
+
+# Environment used by the config benchmarks (a valid minimal configuration).
+_BENCH_ENV = {
+    "TELEGRAM_BOT_TOKEN": "123456789:bench-token",
+    "TELEGRAM_CHAT_ID": "1",
+}
+
+# A PTT screen with colour escapes, as fed to the ANSI-stripping patch.
+_ANSI_SCREEN = "\n".join(
+    f"\x1b[1;37;44m {i:>6} \x1b[m\x1b[1;33m+\x1b[m 10/16 \x1b[36mauthor{i:<8}\x1b[m □ [問卦] 第 {i} 篇文章"
+    for i in range(24)
+)
+_PLAIN_SCREEN = "\n".join(f" {i:>6} + 10/16 author{i:<8} □ [問卦] 第 {i} 篇文章" for i in range(24))
+
+
+@dataclass
+class BenchOptions:
+    """Knobs shared by every suite."""
+    sizes: Tuple[int, ...] = (1, 10, 100, 1000)
+    engines: Tuple[str, ...] = ("thread", "async", "process")
+    ptt_latency_ms: float = 5.0
+    concurrency: int = 5
+    quick: bool = False
+
+    def repeat(self, default: int) -> int:
+        """Rounds per case, reduced in quick mode."""
+        return max(1, default // 3) if self.quick else default
+
+    def number(self, default: int) -> int:
+        """Calls per round, reduced in quick mode."""
+        return max(1, default // 10) if self.quick else default
+
+
+class _NullNotifier(NotificationService):
+    """Notification service that does nothing."""
+
+    def send_message(self, text: str, parse_mode: str = "html") -> bool:
+        return True
+
+    def send_error_notification(self, error: Exception, context: Optional[Dict[str, Any]] = None) -> bool:
+        return True
+
+
+class _StubPTTAPI:
+    """Stand-in for ``PyPtt.PTT.API``; each screen round trip sleeps ``latency``."""
+
+    latency = 0.0
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def login(self, ptt_id: str, ptt_pw: str, kick_other_session: bool = True) -> None:
+        time.sleep(self.latency)
+
+    def get_user(self, ptt_id: str) -> Dict[str, Any]:
+        time.sleep(self.latency)
+        return {"login_count": 1000, "mail": "No new mails"}
+
+    def logout(self) -> None:
+        time.sleep(self.latency)
+
+
+@contextmanager
+def _quiet() -> Iterator[None]:
+    """Silence the application's INFO logs while benchmarking."""
+    app_logger = logging.getLogger("pttautosign")
+    previous = app_logger.level
+    app_logger.setLevel(logging.WARNING)
+    try:
+        yield
+    finally:
+        app_logger.setLevel(previous)
+
+
+def _subprocess_env() -> Dict[str, str]:
+    """Environment for cold-start subprocesses that can import this package."""
+    src_dir = os.path.dirname(os.path.dirname(pttautosign.__file__))
+    env = dict(os.environ, **_BENCH_ENV)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [src_dir, env.get("PYTHONPATH")]))
+    return env
+
+
+def _cold_start_ms(code: str) -> float:
+    """Run ``code`` in a fresh interpreter; it must print elapsed milliseconds."""
+    completed = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True, env=_subprocess_env()
+    )
+    return float(completed.stdout.strip().splitlines()[-1])
+
+
+def bench_batch_login(options: BenchOptions) -> List[BenchResult]:
+    """``batch_login`` wall time and throughput per engine and batch size.
+
+    The process engine's workers are separate interpreters that the patched
+    ``PyPtt.PTT.API`` does not reach, so it runs PyPtt against the fake PTT
+    server with the same per-screen latency (``ptt`` in the result says
+    which). Its cases include spawning the workers, which is the overhead
+    the engine adds.
+    """
+    from pttautosign.testing.fake_ptt import FakePTTScenario, FakePTTServer, Latency
+    from pttautosign.utils import ptt as ptt_module
+    from pttautosign.utils.config import PTTConfig
+    from pttautosign.utils.factory import login_service_class
+
+    stub = type("StubPTTAPI", (_StubPTTAPI,), {"latency": options.ptt_latency_ms / 1000})
+    results = []
+    with ExitStack() as stack:
+        stack.enter_context(_quiet())
+        stack.enter_context(patch.object(ptt_module.PTT, "API", stub))
+        server = None
+        if "process" in options.engines:
+            scenario = FakePTTScenario(latency=Latency(mean_ms=options.ptt_latency_ms))
+            server = stack.enter_context(FakePTTServer(scenario))
+        for engine in options.engines:
+            for size in options.sizes:
+                target = {"host": "localhost", "port": server.port} if engine == "process" else {}
+                config = PTTConfig(max_retries=0, max_concurrency=options.concurrency, login_engine=engine, **target)
+                backend = "fake_server" if engine == "process" else "stub"
+                service = login_service_class(engine)(_NullNotifier(), config, disable_notifications=True)
+                accounts = [(f"bench{i:04d}", "password") for i in range(size)]
+                result = measure(
+                    f"batch_login[{engine},n={size}]",
+                    lambda: service.batch_login(accounts),
+                    repeat=options.repeat(3 if size < 1000 else 1),
+                    warmup=0,
+                    accounts=size,
+                    ptt_latency_ms=options.ptt_latency_ms,
+                    ptt=backend,
+                )
+                result.extra["accounts_per_sec"] = size / (result.median_ms / 1000)
+                results.append(result)
+    return results
+
+
+def bench_telegram(options: BenchOptions) -> List[BenchResult]:
+    """``TelegramBot.send_message`` round trip against a local HTTP stub."""
+    from pttautosign.testing.telegram_stub import TelegramStub
+    from pttautosign.utils.config import TelegramConfig
+    from pttautosign.utils.telegram import TelegramBot
+
+    with _quiet(), TelegramStub() as stub:
+        # Rate limiting is off: this times the HTTP round trip, not the pacing.
+        config = TelegramConfig(
+            token=_BENCH_ENV["TELEGRAM_BOT_TOKEN"],
+            chat_id="1",
+            retry_count=1,
+            rate_limit=0,
+            chat_rate_limit=0,
+            api_base=stub.base_url,
+        )
+        bot = TelegramBot(config)
+        result = measure(
+            "telegram.send_message",
+            lambda: bot.send_message("✅ PTT bench 登入成功\n📆 登入天數: 1000 天"),
+            repeat=options.repeat(5),
+            number=options.number(50),
+        )
+    return [result]
+
+
+def bench_logging(options: BenchOptions) -> List[BenchResult]:
+    """``ColorShortNameFormatter.format`` cost per record, with colors on."""
+    from pttautosign.utils.config import LogConfig
+    from pttautosign.utils.logger import ColorShortNameFormatter
+
+    formatter = ColorShortNameFormatter(LogConfig().log_format, datefmt="%Y-%m-%d %H:%M:%S", use_color=True)
+    record = logging.LogRecord(
+        "pttautosign.utils.ptt", logging.INFO, __file__, 1, "帳號 %s 登入成功", ("bench",), None
+    )
+    result = measure(
+        "logging.format", lambda: formatter.format(record), repeat=options.repeat(5), number=options.number(10000)
+    )
+    result.extra["records_per_sec"] = round(1000 / result.median_ms) if result.median_ms else None
+    return [result]
+
+
+def bench_config(options: BenchOptions) -> List[BenchResult]:
+    """``AppConfig.from_env`` (warm and cold), the PyPtt import and account loading."""
+    from pttautosign.utils.config import AppConfig
+
+    with patch.dict(os.environ, _BENCH_ENV):
+        warm = measure(
+            "config.from_env", AppConfig.from_env, repeat=options.repeat(5), number=options.number(200)
+        )
+
+    repeat = options.repeat(5)
+    cold = summarize(
+        "config.from_env_cold",
+        [
+            _cold_start_ms(
+                "import time; t = time.perf_counter();"
+                "from pttautosign.utils.config import AppConfig; AppConfig.from_env();"
+                "print((time.perf_counter() - t) * 1000)"
+            )
+            for _ in range(repeat)
+        ],
+    )
+    pyptt = summarize(
+        "import.pyptt",
+        [
+            _cold_start_ms("import time; t = time.perf_counter(); import PyPtt; print((time.perf_counter() - t) * 1000)")
+            for _ in range(repeat)
+        ],
+    )
+    return [warm, cold, pyptt, _bench_accounts(options)]
+
+
+def _bench_accounts(options: BenchOptions) -> BenchResult:
+    """``load_accounts`` streaming a 10k-row accounts CSV."""
+    import tempfile
+
+    from pttautosign.utils.accounts import load_accounts
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "accounts.csv")
+        with open(path, "w", encoding="utf-8") as f:
+            f.writelines(f"user{i:05d},password{i}\n" for i in range(10000))
+        return measure(
+            "accounts.load[10000]",
+            lambda: load_accounts({"PTT_ACCOUNTS_FILE": path}),
+            repeat=options.repeat(5),
+            number=options.number(10),
+        )
+
+
+# Cold-start code paths: what each one sets up after ``AppConfig.from_env``.
+_STARTUP_PATHS = {
+    "config": "",
+    "notification": "from pttautosign.utils.factory import ServiceFactory;"
+    "ServiceFactory(config).get_notification_service();",
+    "login": "from pttautosign.utils.factory import ServiceFactory;"
+    "ServiceFactory(config).get_login_service();",
+}
+
+
+def bench_startup(options: BenchOptions) -> List[BenchResult]:
+    """Cold start of the config-only, notification-only and login code paths.
+
+    ``pyptt_imported`` records whether the path pulled in PyPtt; only the
+    login path should. ``startup.sign_in`` is the whole cold start of a
+    sign-in run, including the interpreter, against its budget.
+    """
+    results = []
+    for label, setup in _STARTUP_PATHS.items():
+        code = (
+            "import sys, time; t = time.perf_counter();"
+            "from pttautosign.utils.config import AppConfig; config = AppConfig.from_env();"
+            f"{setup}"
+            "print((time.perf_counter() - t) * 1000, 'PyPtt' in sys.modules)"
+        )
+        samples, imported = [], False
+        for _ in range(options.repeat(5)):
+            completed = subprocess.run(
+                [sys.executable, "-c", code], capture_output=True, text=True, check=True, env=_subprocess_env()
+            )
+            elapsed, pyptt = completed.stdout.strip().splitlines()[-1].split()
+            samples.append(float(elapsed))
+            imported = pyptt == "True"
+        results.append(summarize(f"startup.{label}", samples, pyptt_imported=imported))
+
+    # Interpreter start through everything a sign-in run imports before its
+    # first PTT connection; the number ``--profile-startup`` holds to budget.
+    from pttautosign.benchmarks.startup import STARTUP_BUDGET_MS, cold_start_ms
+
+    env = _subprocess_env()
+    results.append(
+        summarize(
+            "startup.sign_in",
+            [cold_start_ms(env) for _ in range(options.repeat(5))],
+            budget_ms=STARTUP_BUDGET_MS,
+        )
+    )
+    return results
+
+
+def bench_patches(options: BenchOptions) -> List[BenchResult]:
+    """The ANSI-stripping ``patched_get_data`` wrapper, with and without escapes."""
+    from pttautosign.patches.pyptt_patch import strip_ansi_get_data
+
+    results = []
+    for label, screen in (("ansi", _ANSI_SCREEN), ("plain", _PLAIN_SCREEN)):
+        patched_get_data = strip_ansi_get_data(lambda: screen)
+        results.append(
+            measure(
+                f"patches.get_data[{label}]",
+                patched_get_data,
+                repeat=options.repeat(5),
+                number=options.number(10000),
+            )
+        )
+    return results
+
+
+# Suite name -> benchmark function, in run order.
+SUITES: Dict[str, Callable[[BenchOptions], List[BenchResult]]] = {
+    "batch_login": bench_batch_login,
+    "telegram": bench_telegram,
+    "logging": bench_logging,
+    "config": bench_config,
+    "startup": bench_startup,
+    "patches": bench_patches,
+}
@@ -20,6 +20,18 @@ def parse_args() -> argparse.Namespace:
     """Parse command line arguments"""
     parser = argparse.ArgumentParser(description="PTT Auto Sign")
     parser.add_argument("--test-login", action="store_true", help="Test login functionality")
+    parser.add_argument("--force", action="store_true", help="Log in even accounts already signed in today")
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="Report cold start time and a per-module import breakdown instead of signing in",
+    )
+    parser.add_argument(
+        "--startup-budget-ms",
+        type=float,
+        default=None,
+        help="Cold start budget for --profile-startup (exit 1 when over)",
+    )
     return parser.parse_args()
 
 
@@ -36,8 +48,20 @@ def _bootstrap_logging() -> None:
 
 def main():
     """Main entry point for the PTT Auto Sign program"""
+    # ``pttautosign bench ...`` runs the benchmark suite instead of a sign-in.
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        from pttautosign.benchmarks.cli import main as bench_main
+
+        sys.exit(bench_main(sys.argv[2:]))
+
     args = parse_args()
 
+    if args.profile_startup:
+        from pttautosign.benchmarks import startup
+
+        budget_ms = startup.STARTUP_BUDGET_MS if args.startup_budget_ms is None else args.startup_budget_ms
+        sys.exit(startup.main(budget_ms=budget_ms))
+
     _bootstrap_logging()
 
     # Load environment variables from .env for local development.
@@ -58,14 +82,14 @@ def main():
 
     from pttautosign.utils.app_context import AppContext
 
+    app_context = AppContext()
     try:
-        app_context = AppContext()
         app_context.initialize()
 
         if args.test_login:
-            _run_test_login(app_context)
+            _run_test_login(app_context, force=args.force)
         else:
-            app_context.run()
+            app_context.run(force=args.force)
 
     except ConfigValidationError as e:
         logger.error(f"設定錯誤：{e}")
@@ -73,27 +97,43 @@ def main():
     except Exception as e:
         logger.error(f"執行時錯誤：{e}", exc_info=True)
         sys.exit(1)
+    finally:
+        # Send (or keep for the next run) notifications still queued.
+        app_context.close()
 
 
-def _run_test_login(app_context) -> None:
+def _run_test_login(app_context, force: bool = False) -> None:
     """Run the login flow in test mode and exit non-zero if every login failed."""
+    from pttautosign.utils.logger import MAX_LISTED_ACCOUNTS, format_accounts
+
     logger.debug("正在執行測試模式")
 
     login_service = app_context.get_login_service()
     accounts = app_context.get_accounts()
 
     logger.info("開始登入測試")
-    results = login_service.batch_login(accounts)
+    results = login_service.batch_login(accounts, force=force)
 
     success_count = sum(1 for success in results.values() if success)
-    logger.info("登入測試完成")
+    logger.info(
+        "登入測試完成",
+        extra={
+            "event": "batch_summary",
+            "total": len(accounts),
+            "succeeded": success_count,
+            "failed": len(accounts) - success_count,
+        },
+    )
     logger.debug(f"帳號總數：{len(accounts)}")
     logger.info(f"登入成功：{success_count}")
     logger.info(f"登入失敗：{len(accounts) - success_count}")
 
     if success_count < len(accounts):
         failed_accounts = [account for account, success in results.items() if not success]
-        logger.warning(f"失敗帳號：{', '.join(failed_accounts)}")
+        logger.warning(
+            f"失敗帳號：{format_accounts(failed_accounts)}",
+            extra={"_accounts": failed_accounts[:MAX_LISTED_ACCOUNTS]},
+        )
 
     if success_count == 0:
         sys.exit(1)
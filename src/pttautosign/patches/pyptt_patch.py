@@ -12,6 +12,21 @@ import importlib.util
 
 logger = logging.getLogger(__name__)
 
+# SGR (colour) escape sequences that PyPtt may leave in screen text.
+_ANSI_RE = re.compile(r"\x1B\[\d+;*\d*m")
+
+
+def strip_ansi_get_data(original_get_data):
+    """Wrap ``screens.get_data`` so string results have SGR escapes removed."""
+
+    def patched_get_data(*args, **kwargs):
+        result = original_get_data(*args, **kwargs)
+        if isinstance(result, str) and "\x1B[" in result:
+            return _ANSI_RE.sub("", result)
+        return result
+
+    return patched_get_data
+
 
 class PyPttPatcher:
     """Apply targeted, import-time compatibility patches for PyPtt."""
@@ -116,16 +131,7 @@ class PyPttPatcher:
         if not hasattr(screens, "get_data"):
             return
 
-        original_get_data = screens.get_data
-        ansi_re = re.compile(r"\x1B\[\d+;*\d*m")
-
-        def patched_get_data(*args, **kwargs):
-            result = original_get_data(*args, **kwargs)
-            if isinstance(result, str) and "\x1B[" in result:
-                return ansi_re.sub("", result)
-            return result
-
-        screens.get_data = patched_get_data
+        screens.get_data = strip_ansi_get_data(screens.get_data)
 
 
 def apply_patches() -> bool:
@@ -0,0 +1 @@
+"""Local stand-ins for external services, for offline tests and benchmarks."""
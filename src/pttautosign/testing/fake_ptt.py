@@ -0,0 +1,443 @@
+"""
+Local PTT stand-in server for offline throughput and latency benchmarks.
+
+The server speaks PTT's websocket protocol closely enough for PyPtt's
+``login``, ``get_user`` and ``logout`` to run unmodified against it. Point
+the service at it with ``ptt_host=localhost`` and ``ptt_port=<port>``::
+
+    python -m pttautosign.testing.fake_ptt --port 8899 --latency-ms 80 --jitter-ms 40
+"""
+
+import argparse
+import asyncio
+import logging
+import math
+import random
+import re
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Optional
+
+from websockets.asyncio.server import ServerConnection, serve
+from websockets.exceptions import ConnectionClosed
+
+# Distributions understood by ``Latency``.
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "normal", "lognormal")
+
+# Outcomes of a login, as counted in ``FakePTTStats.outcomes``.
+OUTCOMES = ("success", "wrong_password", "too_often", "overload", "hang")
+
+_CLEAR = "\x1b[H\x1b[2J"
+
+# Telnet negotiation (IAC WILL/WONT/DO/DONT x, IAC SB ... IAC SE) sent by PyPtt.
+_TELNET_RE = re.compile(rb"\xff\xfa.*?\xff\xf0|\xff[\xfb-\xfe].", re.DOTALL)
+
+# Cursor keys, refresh (^L) and padding around the keys PyPtt sends.
+_KEY_NOISE_RE = re.compile(r"\x1b\[[A-D]|[\x0c ]")
+
+_WELCOME = "【 批踢踢實業坊 】 (本機測試伺服器)\n\n請輸入代號，或以 guest 參觀，或以 new 註冊: "
+
+_MAIN_MENU = (
+    "【主功能表】                       批踢踢實業坊\n"
+    "{mail}"
+    "\n"
+    "                     (A)nnounce     【 精華公佈欄 】\n"
+    "                     (F)avorite     【 我 的 最愛 】\n"
+    "                     (C)lass        【 分組討論區 】\n"
+    "                     (M)ail         【 私人信件區 】\n"
+    "                     (T)alk         【 休閒聊天區 】\n"
+    "                     (U)ser         【 個人設定區 】\n"
+    "                     (X)yz          【 系統資訊區 】\n"
+    "                     (P)lay         【 娛樂與休閒 】\n"
+    "                     (N)amelist     【 編特別名單 】\n"
+    "                   > (G)oodbye        離開，再見…\n"
+    "\n"
+    "{now}  | {ptt_id} | 線上 1 人       (h)說明"
+)
+
+_TALK_MENU = (
+    "【聊天說話】                       批踢踢實業坊\n"
+    "\n"
+    "                     (L)Users       【 線上使用者列表 】\n"
+    "                     (Q)uery        【 查詢網友 】\n"
+    "                     (W)ater        【 顯示上幾次熱訊 】\n"
+)
+
+_USER_INFO = (
+    "《ＩＤ暱稱》{ptt_id} (本機測試帳號)《經濟狀況》小康 ($1000)\n"
+    "《登入次數》{login_count} 次 (同天內只計一次) 《有效文章》0 篇 (退:0)\n"
+    "《目前動態》聊天說話     《私人信箱》{mail}\n"
+    "《上次上站》{now} 《上次故鄉》127.0.0.1\n"
+    "《 五子棋 》 0 勝  0 敗  0 和 《象棋戰績》 0 勝  0 敗  0 和\n"
+    "\n"
+    "                              請按任意鍵繼續"
+)
+
+_WRONG_PASSWORD = "密碼不對或無此帳號！請檢查大小寫及有無輸入錯誤。\n請重新輸入"
+_TOO_OFTEN = "登入太頻繁，請稍後再試\n\n                              請按任意鍵繼續"
+_OVERLOAD = "程式耗用過多計算資源，立刻斷線"
+_GOODBYE = "【 批踢踢實業坊 】 歡迎下次再來\n\n                              請按任意鍵繼續"
+
+
+@dataclass
+class Latency:
+    """Per-screen response delay distribution, in milliseconds.
+
+    ``fixed`` always waits ``mean_ms``; ``uniform`` draws from
+    ``mean_ms ± spread_ms``; ``normal`` and ``lognormal`` use ``mean_ms`` as the
+    mean and ``spread_ms`` as the standard deviation (``lognormal`` gives the
+    long tail seen on a busy server).
+    """
+    distribution: str = "fixed"
+    mean_ms: float = 0.0
+    spread_ms: float = 0.0
+
+    def __post_init__(self):
+        """Validate the distribution parameters."""
+        if self.distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Latency distribution must be one of: {', '.join(LATENCY_DISTRIBUTIONS)}")
+        if self.mean_ms < 0 or self.spread_ms < 0:
+            raise ValueError("Latency mean and spread must be non-negative")
+
+    def sample(self, rng: random.Random) -> float:
+        """Draw one delay, in seconds."""
+        if self.distribution == "fixed" or self.spread_ms == 0:
+            delay_ms = self.mean_ms
+        elif self.distribution == "uniform":
+            delay_ms = rng.uniform(self.mean_ms - self.spread_ms, self.mean_ms + self.spread_ms)
+        elif self.distribution == "normal":
+            delay_ms = rng.gauss(self.mean_ms, self.spread_ms)
+        elif self.mean_ms == 0:
+            delay_ms = 0.0
+        else:
+            sigma2 = math.log(1 + (self.spread_ms / self.mean_ms) ** 2)
+            delay_ms = rng.lognormvariate(math.log(self.mean_ms) - sigma2 / 2, math.sqrt(sigma2))
+        return max(0.0, delay_ms) / 1000
+
+
+@dataclass
+class FakePTTScenario:
+    """What the fake server does to each login.
+
+    Injection rates are probabilities per login and are checked in the order
+    hang, overload, too-often, wrong-password; ``passwords`` (when given)
+    additionally rejects any account whose password does not match.
+
+    - ``hang``: credentials are read and nothing is ever answered
+    - ``overload``: PTT's "程式耗用過多" screen, then disconnect
+      (PyPtt raises ``UseTooManyResources``)
+    - ``too_often``: PTT's "登入太頻繁" screen; after the key press the server
+      waits ``too_often_penalty`` seconds and disconnects, as pttbbs does
+      (PyPtt reports a closed connection)
+    - ``wrong_password``: "密碼不對" (PyPtt raises ``WrongIDorPassword``)
+    """
+    latency: Latency = field(default_factory=Latency)
+    auth_latency: Latency = field(default_factory=Latency)
+    hang_rate: float = 0.0
+    overload_rate: float = 0.0
+    too_often_rate: float = 0.0
+    too_often_penalty: float = 0.0
+    wrong_password_rate: float = 0.0
+    passwords: Optional[Dict[str, str]] = None
+    new_mail: bool = False
+    seed: Optional[int] = None
+
+    def __post_init__(self):
+        """Validate the injection rates."""
+        for name in ("hang_rate", "overload_rate", "too_often_rate", "wrong_password_rate"):
+            if not 0.0 <= getattr(self, name) <= 1.0:
+                raise ValueError(f"{name} must be between 0 and 1")
+
+
+class FakePTTStats:
+    """Counters kept by the server (thread-safe)."""
+
+    def __init__(self):
+        """Initialize all counters to zero."""
+        self._lock = threading.Lock()
+        self.connections = 0
+        self.active_sessions = 0
+        self.peak_sessions = 0
+        self.get_user_calls = 0
+        self.logouts = 0
+        self.outcomes: Dict[str, int] = {name: 0 for name in OUTCOMES}
+        self.login_counts: Dict[str, int] = {}
+
+    def session_started(self) -> None:
+        """Count a new connection."""
+        with self._lock:
+            self.connections += 1
+            self.active_sessions += 1
+            self.peak_sessions = max(self.peak_sessions, self.active_sessions)
+
+    def session_ended(self) -> None:
+        """Count a closed connection."""
+        with self._lock:
+            self.active_sessions -= 1
+
+    def login(self, ptt_id: str, outcome: str) -> int:
+        """Count a login outcome; returns the account's successful login count."""
+        with self._lock:
+            self.outcomes[outcome] += 1
+            if outcome == "success":
+                self.login_counts[ptt_id] = self.login_counts.get(ptt_id, 0) + 1
+            return self.login_counts.get(ptt_id, 0)
+
+    def increment(self, name: str) -> None:
+        """Increment the counter attribute ``name``."""
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def snapshot(self) -> Dict[str, object]:
+        """Copy of every counter."""
+        with self._lock:
+            return {
+                "connections": self.connections,
+                "active_sessions": self.active_sessions,
+                "peak_sessions": self.peak_sessions,
+                "get_user_calls": self.get_user_calls,
+                "logouts": self.logouts,
+                "outcomes": dict(self.outcomes),
+            }
+
+
+class _Keys:
+    """Buffered reader for the keystrokes a client sends."""
+
+    def __init__(self, websocket: ServerConnection):
+        self._websocket = websocket
+        self._buffer = ""
+
+    async def read_until_enter(self) -> str:
+        """Return the next ``\\r``-terminated input, without noise keys."""
+        while "\r" not in self._buffer:
+            data = await self._websocket.recv()
+            if isinstance(data, str):
+                data = data.encode("utf-8")
+            self._buffer += _TELNET_RE.sub(b"", data).decode("utf-8", errors="ignore")
+        line, _, self._buffer = self._buffer.partition("\r")
+        return _KEY_NOISE_RE.sub("", line)
+
+    async def read_any(self) -> None:
+        """Wait for (and discard) the next key press."""
+        if self._buffer:
+            self._buffer = ""
+            return
+        await self._websocket.recv()
+
+
+class FakePTTServer:
+    """Scripted PTT websocket server running on a background event loop.
+
+    Usable as a context manager; ``port`` is the bound port (an ephemeral one
+    when 0 was requested)::
+
+        with FakePTTServer(FakePTTScenario(latency=Latency("lognormal", 80, 40))) as server:
+            config = PTTConfig(host="localhost", port=server.port)
+    """
+
+    def __init__(self, scenario: Optional[FakePTTScenario] = None, host: str = "127.0.0.1", port: int = 0):
+        """Initialize the server (call :meth:`start` to listen).
+
+        Args:
+            scenario: Latency and fault injection settings
+            host: Address to bind
+            port: Port to bind (0 picks a free one)
+        """
+        self.scenario = scenario or FakePTTScenario()
+        self.host = host
+        self.port = port
+        self.stats = FakePTTStats()
+        self.logger = logging.getLogger(__name__)
+        self._rng = random.Random(self.scenario.seed)
+        self._rng_lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._stopped: Optional[asyncio.Event] = None
+        self._error: Optional[BaseException] = None
+
+    def __enter__(self) -> "FakePTTServer":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def start(self, timeout: float = 5.0) -> None:
+        """Start listening on a background thread.
+
+        Raises:
+            RuntimeError: If the server did not come up within ``timeout``
+        """
+        self._thread = threading.Thread(target=self._run, name="fake-ptt", daemon=True)
+        self._thread.start()
+        if not self._ready.wait(timeout) or self._error:
+            raise RuntimeError(f"Fake PTT server failed to start: {self._error}")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Close every connection and stop the server thread."""
+        if self._loop and self._stopped:
+            self._loop.call_soon_threadsafe(self._stopped.set)
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        """Thread body: run the server until :meth:`stop`."""
+        self._loop = asyncio.new_event_loop()
+        try:
+            self._loop.run_until_complete(self._serve())
+        except BaseException as e:
+            self._error = e
+            self._ready.set()
+        finally:
+            leftovers = asyncio.all_tasks(self._loop)
+            for task in leftovers:
+                task.cancel()
+            if leftovers:
+                self._loop.run_until_complete(asyncio.gather(*leftovers, return_exceptions=True))
+            self._loop.close()
+
+    async def _serve(self) -> None:
+        """Bind, signal readiness and wait for the stop request."""
+        self._stopped = asyncio.Event()
+        async with serve(self._session, self.host, self.port, compression=None, ping_interval=None) as server:
+            self.port = server.sockets[0].getsockname()[1]
+            self.logger.debug(f"本機 PTT 測試伺服器啟動於 ws://{self.host}:{self.port}/bbs")
+            self._ready.set()
+            await self._stopped.wait()
+
+    def _random(self) -> float:
+        with self._rng_lock:
+            return self._rng.random()
+
+    async def _delay(self, latency: Latency) -> None:
+        with self._rng_lock:
+            delay = latency.sample(self._rng)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _show(self, websocket: ServerConnection, screen: str) -> None:
+        """Send ``screen`` after the configured per-screen latency."""
+        await self._delay(self.scenario.latency)
+        await websocket.send((_CLEAR + screen.replace("\n", "\r\n")).encode("utf-8"))
+
+    def _pick_outcome(self, ptt_id: str, password: str) -> str:
+        """Decide how this login ends."""
+        scenario = self.scenario
+        if self._random() < scenario.hang_rate:
+            return "hang"
+        if self._random() < scenario.overload_rate:
+            return "overload"
+        if self._random() < scenario.too_often_rate:
+            return "too_often"
+        if self._random() < scenario.wrong_password_rate:
+            return "wrong_password"
+        if scenario.passwords is not None and scenario.passwords.get(ptt_id) != password:
+            return "wrong_password"
+        return "success"
+
+    async def _session(self, websocket: ServerConnection) -> None:
+        """Play one client session."""
+        self.stats.session_started()
+        try:
+            await self._play(websocket, _Keys(websocket))
+        except ConnectionClosed:
+            pass
+        finally:
+            self.stats.session_ended()
+
+    async def _play(self, websocket: ServerConnection, keys: _Keys) -> None:
+        await self._show(websocket, _WELCOME)
+        ptt_id = (await keys.read_until_enter()).rstrip(",")
+        password = await keys.read_until_enter()
+
+        outcome = self._pick_outcome(ptt_id, password)
+        login_count = self.stats.login(ptt_id, outcome)
+        await self._delay(self.scenario.auth_latency)
+
+        if outcome == "hang":
+            await websocket.wait_closed()
+            return
+        if outcome == "overload":
+            await self._show(websocket, _OVERLOAD)
+            return
+        if outcome == "wrong_password":
+            await self._show(websocket, _WRONG_PASSWORD)
+            return
+        if outcome == "too_often":
+            await self._show(websocket, _TOO_OFTEN)
+            await keys.read_any()
+            await asyncio.sleep(self.scenario.too_often_penalty)
+            return
+
+        now = datetime.now().strftime("%m/%d/%Y %H:%M:%S %a")
+        mail_hint = "                         你有新信件\n" if self.scenario.new_mail else ""
+        mail_status = "有新信件" if self.scenario.new_mail else "最近無新信件"
+        await self._show(websocket, _MAIN_MENU.format(mail=mail_hint, now=now, ptt_id=ptt_id))
+
+        while True:
+            command = (await keys.read_until_enter()).upper()
+            if command.endswith("T"):
+                await self._show(websocket, _TALK_MENU)
+                await keys.read_until_enter()  # (Q)uery
+                query_id = await keys.read_until_enter()
+                self.stats.increment("get_user_calls")
+                await self._show(
+                    websocket,
+                    _USER_INFO.format(ptt_id=query_id, login_count=login_count, mail=mail_status, now=now),
+                )
+            elif command.endswith("G"):
+                await keys.read_until_enter()  # (y)es
+                self.stats.increment("logouts")
+                await self._show(websocket, _GOODBYE)
+                await websocket.wait_closed()
+                return
+            else:
+                await self._show(websocket, _MAIN_MENU.format(mail=mail_hint, now=now, ptt_id=ptt_id))
+
+
+def main() -> None:
+    """Run a fake PTT server in the foreground until interrupted."""
+    parser = argparse.ArgumentParser(description="本機 PTT 測試伺服器")
+    parser.add_argument("--host", default="127.0.0.1", help="監聽位址")
+    parser.add_argument("--port", type=int, default=8899, help="監聽埠號")
+    parser.add_argument("--distribution", choices=LATENCY_DISTRIBUTIONS, default="lognormal", help="延遲分布")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="每個畫面的平均延遲 (ms)")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="延遲標準差 / 範圍 (ms)")
+    parser.add_argument("--auth-latency-ms", type=float, default=0.0, help="驗證密碼的額外延遲 (ms)")
+    parser.add_argument("--wrong-password-rate", type=float, default=0.0, help="密碼錯誤比例")
+    parser.add_argument("--too-often-rate", type=float, default=0.0, help="登入太頻繁比例")
+    parser.add_argument("--too-often-penalty", type=float, default=0.0, help="登入太頻繁後的斷線延遲 (秒)")
+    parser.add_argument("--overload-rate", type=float, default=0.0, help="系統資源過載比例")
+    parser.add_argument("--hang-rate", type=float, default=0.0, help="無回應比例")
+    parser.add_argument("--seed", type=int, default=None, help="亂數種子")
+    args = parser.parse_args()
+
+    scenario = FakePTTScenario(
+        latency=Latency(args.distribution, args.latency_ms, args.jitter_ms),
+        auth_latency=Latency("fixed", args.auth_latency_ms),
+        hang_rate=args.hang_rate,
+        overload_rate=args.overload_rate,
+        too_often_rate=args.too_often_rate,
+        too_often_penalty=args.too_often_penalty,
+        wrong_password_rate=args.wrong_password_rate,
+        seed=args.seed,
+    )
+    logging.basicConfig(level=logging.INFO)
+    server = FakePTTServer(scenario, host=args.host, port=args.port)
+    server.start()
+    print(f"Fake PTT server listening on ws://{args.host}:{server.port}/bbs (ptt_host=localhost ptt_port={server.port})")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        print(server.stats.snapshot())
+
+
+if __name__ == "__main__":
+    main()
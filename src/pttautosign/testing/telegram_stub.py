@@ -0,0 +1,286 @@
+"""
+Local HTTP stand-in for the Telegram Bot API.
+
+Speaks enough of the Bot API (``sendMessage``, ``getMe``,
+``editMessageText``) for ``TelegramBot`` to run unmodified against it with
+``TELEGRAM_API_BASE=http://127.0.0.1:<port>``. Latency, 429 flood control
+and 5xx bursts can be injected, and every request is logged.
+"""
+
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Deque, Dict, List, Optional, Tuple, Union
+
+from pttautosign.testing.fake_ptt import Latency
+
+# Value of ``getMe``'s ``username`` field.
+STUB_BOT_USERNAME = "pttautosign_stub_bot"
+
+
+@dataclass
+class StubRequest:
+    """One request received by the stub and the status it was answered with."""
+    method: str
+    payload: Dict[str, Any]
+    status: int
+    received_at: float = field(default_factory=time.monotonic)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Answers ``POST /bot<token>/<method>`` like the Bot API does."""
+
+    # Keep-alive, so clients with a connection pool can reuse sockets.
+    protocol_version = "HTTP/1.1"
+    server: "_StubHTTPServer"
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length) if length else b""
+        try:
+            payload = json.loads(body) if body else {}
+        except ValueError:
+            payload = {}
+
+        prefix, _, method = self.path.rpartition("/")
+        token = prefix.rpartition("/bot")[2]
+        status, response, headers = self.server.stub._handle(token, method, payload)
+
+        data = json.dumps(response, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    # The Bot API accepts GET for parameterless methods such as getMe.
+    do_GET = do_POST
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """Keep the stub quiet."""
+
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, stub: "TelegramStub"):
+        super().__init__(address, _Handler)
+        self.stub = stub
+
+
+def _error(status: int, description: str, **parameters: Any) -> Dict[str, Any]:
+    """Bot API error body."""
+    body: Dict[str, Any] = {"ok": False, "error_code": status, "description": description}
+    if parameters:
+        body["parameters"] = parameters
+    return body
+
+
+class TelegramStub:
+    """Bot API stub on a background thread, usable as a context manager.
+
+    Every request is recorded in :attr:`requests` as ``(method, payload)`` and,
+    with its response status and arrival time, in :attr:`log`. Point a
+    ``TelegramBot`` at it with ``TelegramConfig(api_base=stub.base_url)``.
+
+    Faults:
+
+    * ``latency``: seconds (or a :class:`~pttautosign.testing.fake_ptt.Latency`)
+      to wait before answering each request
+    * ``chat_rate``: per-chat flood control; a ``sendMessage`` that arrives
+      sooner than ``1 / chat_rate`` seconds after the previous accepted one
+      for the same chat gets a 429 with ``retry_after``, as Telegram does
+    * :meth:`fail_next`: answer the next requests with a given status, e.g.
+      a 5xx burst or a scripted 429
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: Union[float, Latency] = 0.0,
+        chat_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        """Initialize the stub (call :meth:`start` to listen).
+
+        Args:
+            host: Address to bind
+            port: Port to bind (0 picks a free one)
+            latency: Delay before answering each request
+            chat_rate: Accepted ``sendMessage`` calls per second and chat (0: unlimited)
+            seed: Random seed for sampled latencies
+        """
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.chat_rate = chat_rate
+        self.requests: List[Tuple[str, Dict[str, Any]]] = []
+        self.log: List[StubRequest] = []
+        self.messages: Dict[int, Dict[str, Any]] = {}
+        self._faults: Deque[Tuple[int, Optional[int]]] = deque()
+        self._last_send: Dict[str, float] = {}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server: Optional[_StubHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "TelegramStub":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    @property
+    def request_count(self) -> int:
+        """Number of requests received so far."""
+        with self._lock:
+            return len(self.requests)
+
+    @property
+    def base_url(self) -> str:
+        """``http://host:port`` of the running stub (a ``TELEGRAM_API_BASE``)."""
+        return f"http://{self.host}:{self.port}"
+
+    def api_url(self, token: str) -> str:
+        """Bot API URL for ``token`` (the equivalent of ``https://api.telegram.org/bot<token>``)."""
+        return f"{self.base_url}/bot{token}"
+
+    def fail_next(self, status: int, count: int = 1, retry_after: Optional[int] = None) -> None:
+        """Answer the next ``count`` requests with ``status``.
+
+        Args:
+            status: HTTP status, e.g. 502 for a 5xx burst or 429
+            count: Number of requests to fail
+            retry_after: ``parameters.retry_after`` for a 429 (default 1)
+        """
+        with self._lock:
+            self._faults.extend([(status, retry_after)] * count)
+
+    def statuses(self) -> List[int]:
+        """Response status of every request so far, in arrival order."""
+        with self._lock:
+            return [entry.status for entry in self.log]
+
+    def start(self) -> None:
+        """Start serving on a background thread."""
+        self._server = _StubHTTPServer((self.host, self.port), self)
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="telegram-stub", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop serving and release the port."""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _delay(self) -> float:
+        """Seconds to wait before answering."""
+        if isinstance(self.latency, Latency):
+            with self._lock:
+                return self.latency.sample(self._rng)
+        return self.latency
+
+    def _handle(self, token: str, method: str, payload: Dict[str, Any]) -> Tuple[int, Dict[str, Any], Dict[str, str]]:
+        """Compute the response to one request and log it."""
+        delay = self._delay()
+        if delay > 0:
+            time.sleep(delay)
+
+        with self._lock:
+            self.requests.append((method, payload))
+            status, body, headers = self._respond(token, method, payload)
+            self.log.append(StubRequest(method, payload, status))
+        return status, body, headers
+
+    def _respond(self, token: str, method: str, payload: Dict[str, Any]) -> Tuple[int, Dict[str, Any], Dict[str, str]]:
+        """Bot API semantics (caller holds ``_lock``)."""
+        if self._faults:
+            status, retry_after = self._faults.popleft()
+            if status == 429:
+                return self._too_many_requests(retry_after or 1)
+            return status, _error(status, "Injected failure"), {}
+
+        if method == "getMe":
+            bot_id = int(token.partition(":")[0]) if token.partition(":")[0].isdigit() else 0
+            return 200, {
+                "ok": True,
+                "result": {"id": bot_id, "is_bot": True, "first_name": "PTT Auto Sign", "username": STUB_BOT_USERNAME},
+            }, {}
+
+        if method == "sendMessage":
+            chat_id, text = payload.get("chat_id"), payload.get("text")
+            if not chat_id:
+                return 400, _error(400, "Bad Request: chat_id is empty"), {}
+            if not text:
+                return 400, _error(400, "Bad Request: message text is empty"), {}
+            if self.chat_rate > 0:
+                now = time.monotonic()
+                previous = self._last_send.get(str(chat_id))
+                wait = previous + 1 / self.chat_rate - now if previous is not None else 0
+                if wait > 0:
+                    return self._too_many_requests(max(1, math.ceil(wait)))
+                self._last_send[str(chat_id)] = now
+            message = {
+                "message_id": len(self.messages) + 1,
+                "chat": {"id": chat_id},
+                "date": int(time.time()),
+                "text": text,
+            }
+            self.messages[message["message_id"]] = message
+            return 200, {"ok": True, "result": message}, {}
+
+        if method == "editMessageText":
+            message = self.messages.get(payload.get("message_id"))
+            if message is None or str(message["chat"]["id"]) != str(payload.get("chat_id")):
+                return 400, _error(400, "Bad Request: message to edit not found"), {}
+            if message["text"] == payload.get("text"):
+                return 400, _error(400, "Bad Request: message is not modified"), {}
+            message["text"] = payload.get("text", "")
+            return 200, {"ok": True, "result": message}, {}
+
+        return 404, _error(404, "Not Found"), {}
+
+    @staticmethod
+    def _too_many_requests(retry_after: int) -> Tuple[int, Dict[str, Any], Dict[str, str]]:
+        body = _error(429, f"Too Many Requests: retry after {retry_after}", retry_after=retry_after)
+        return 429, body, {"Retry-After": str(retry_after)}
+
+
+def main() -> None:
+    """Run a Telegram stub in the foreground until interrupted."""
+    parser = argparse.ArgumentParser(description="本機 Telegram Bot API 測試伺服器")
+    parser.add_argument("--host", default="127.0.0.1", help="監聽位址")
+    parser.add_argument("--port", type=int, default=8898, help="監聽埠號")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="每個請求的延遲 (ms)")
+    parser.add_argument("--chat-rate", type=float, default=0.0, help="每個聊天室每秒接受的訊息數 (0 表示不限制)")
+    args = parser.parse_args()
+
+    stub = TelegramStub(args.host, args.port, latency=args.latency_ms / 1000, chat_rate=args.chat_rate)
+    stub.start()
+    print(f"Telegram stub listening on {stub.base_url} (TELEGRAM_API_BASE={stub.base_url})")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub.stop()
+        print(f"{stub.request_count} requests, statuses: {dict(Counter(stub.statuses()))}")
+
+
+if __name__ == "__main__":
+    main()
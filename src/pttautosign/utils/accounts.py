@@ -0,0 +1,249 @@
+"""
+PTT account loading and compact account storage.
+"""
+
+import csv
+import json
+import logging
+import os
+import re
+import tomllib
+from array import array
+from collections.abc import Sequence
+from typing import Iterable, Iterator, Mapping, Optional, Tuple, Union, overload
+
+from pttautosign.utils.config import ConfigValidationError
+
+# Accounts file formats understood by :func:`load_accounts`, by file extension.
+ACCOUNT_FILE_FORMATS = (".csv", ".jsonl", ".toml")
+
+_INDEXED_USERNAME_RE = re.compile(r"^PTT_USERNAME_(\d+)$")
+_INVALID_USERNAME_RE = re.compile(r"[\s,]")
+
+Account = Tuple[str, str]
+
+
+class AccountStore(Sequence):
+    """Read-only sequence of ``(username, password)`` tuples.
+
+    Credentials are packed into one UTF-8 buffer with an offset array instead
+    of a tuple and two strings per account, so tens of thousands of accounts
+    take a few hundred kilobytes. Tuples are decoded on access, which makes
+    iteration lazy. The ``repr`` never shows passwords.
+    """
+
+    __slots__ = ("_buffer", "_bounds")
+
+    def __init__(self, accounts: Iterable[Account] = ()):
+        """Initialize the store.
+
+        Args:
+            accounts: Initial ``(username, password)`` pairs
+        """
+        self._buffer = bytearray()
+        # Two end offsets into ``_buffer`` per account: username, password.
+        self._bounds = array("Q")
+        for username, password in accounts:
+            self.add(username, password)
+
+    def add(self, username: str, password: str) -> None:
+        """Append an account."""
+        self._buffer += username.encode("utf-8")
+        self._bounds.append(len(self._buffer))
+        self._buffer += password.encode("utf-8")
+        self._bounds.append(len(self._buffer))
+
+    def _decode(self, index: int) -> Account:
+        start = self._bounds[2 * index - 1] if index else 0
+        middle, end = self._bounds[2 * index], self._bounds[2 * index + 1]
+        return self._buffer[start:middle].decode("utf-8"), self._buffer[middle:end].decode("utf-8")
+
+    def __len__(self) -> int:
+        return len(self._bounds) // 2
+
+    @overload
+    def __getitem__(self, index: int) -> Account: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "AccountStore": ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Account, "AccountStore"]:
+        if isinstance(index, slice):
+            return AccountStore(self._decode(i) for i in range(*index.indices(len(self))))
+        count = len(self)
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            raise IndexError("account index out of range")
+        return self._decode(index)
+
+    def __iter__(self) -> Iterator[Account]:
+        for index in range(len(self)):
+            yield self._decode(index)
+
+    def usernames(self) -> Iterator[str]:
+        """Iterate over the usernames only."""
+        for username, _ in self:
+            yield username
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, AccountStore):
+            return self._bounds == other._bounds and self._buffer == other._buffer
+        if isinstance(other, Sequence) and not isinstance(other, (str, bytes)):
+            return len(self) == len(other) and all(a == tuple(b) for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"AccountStore({len(self)} accounts)"
+
+
+def _check_account(username: str, password: str, source: str) -> Account:
+    """Validate one account; errors name ``source`` but never the password."""
+    username = username.strip()
+    if not username:
+        raise ConfigValidationError(f"{source}: PTT username is empty")
+    if _INVALID_USERNAME_RE.search(username):
+        raise ConfigValidationError(f"{source}: PTT username {username!r} contains whitespace or commas")
+    if not password:
+        raise ConfigValidationError(f"{source}: PTT password for {username!r} is empty")
+    return username, password
+
+
+def _env_accounts(environ: Mapping[str, str]) -> Iterator[Account]:
+    """``PTT_USERNAME``/``PTT_PASSWORD``, then ``PTT_USERNAME_<n>``/``PTT_PASSWORD_<n>`` by ``n``."""
+    username, password = environ.get("PTT_USERNAME"), environ.get("PTT_PASSWORD")
+    if username or password:
+        if not (username and password):
+            raise ConfigValidationError("PTT_USERNAME and PTT_PASSWORD must be set together")
+        yield _check_account(username, password, "PTT_USERNAME")
+
+    indexes = sorted(
+        int(match.group(1)) for match in map(_INDEXED_USERNAME_RE.match, environ) if match
+    )
+    for index in indexes:
+        name = f"PTT_USERNAME_{index}"
+        password = environ.get(f"PTT_PASSWORD_{index}", "")
+        if not password:
+            raise ConfigValidationError(f"{name} is set but PTT_PASSWORD_{index} is missing")
+        yield _check_account(environ[name], password, name)
+
+
+def _csv_accounts(path: str) -> Iterator[Account]:
+    """``username,password`` rows; an optional header, blank rows and ``#`` comments are skipped."""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        for row in reader:
+            line_number = reader.line_num
+            if not row or not "".join(row).strip() or row[0].lstrip().startswith("#"):
+                continue
+            if line_number == 1 and [cell.strip().lower() for cell in row[:2]] == ["username", "password"]:
+                continue
+            if len(row) < 2:
+                raise ConfigValidationError(f"{path} line {line_number}: expected username,password")
+            yield _check_account(row[0], row[1], f"{path} line {line_number}")
+
+
+def _jsonl_accounts(path: str) -> Iterator[Account]:
+    """One ``{"username": ..., "password": ...}`` object per line."""
+    with open(path, encoding="utf-8-sig") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            source = f"{path} line {line_number}"
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # The decoder message can quote the line, i.e. a password.
+                raise ConfigValidationError(f"{source}: invalid JSON") from None
+            if not isinstance(entry, dict):
+                raise ConfigValidationError(f"{source}: expected an object with username and password")
+            yield _check_account(str(entry.get("username", "")), str(entry.get("password", "")), source)
+
+
+def _toml_accounts(path: str) -> Iterator[Account]:
+    """An ``[[accounts]]`` array of tables with ``username`` and ``password``.
+
+    TOML has no streaming parser; the document is parsed whole, so prefer CSV
+    or JSONL for very large account lists.
+    """
+    with open(path, "rb") as f:
+        try:
+            document = tomllib.load(f)
+        except tomllib.TOMLDecodeError:
+            raise ConfigValidationError(f"{path}: invalid TOML") from None
+    entries = document.get("accounts", [])
+    if not isinstance(entries, list):
+        raise ConfigValidationError(f"{path}: 'accounts' must be an array of tables ([[accounts]])")
+    for number, entry in enumerate(entries, start=1):
+        source = f"{path} account {number}"
+        if not isinstance(entry, dict):
+            raise ConfigValidationError(f"{source}: expected a table with username and password")
+        yield _check_account(str(entry.get("username", "")), str(entry.get("password", "")), source)
+
+
+def _file_accounts(path: str) -> Iterator[Account]:
+    """Accounts from ``path``, in the format given by its extension."""
+    extension = os.path.splitext(path)[1].lower()
+    readers = {".csv": _csv_accounts, ".jsonl": _jsonl_accounts, ".toml": _toml_accounts}
+    if extension not in readers:
+        raise ConfigValidationError(
+            f"PTT_ACCOUNTS_FILE must end in one of: {', '.join(ACCOUNT_FILE_FORMATS)}"
+        )
+    if not os.path.isfile(path):
+        raise ConfigValidationError(f"PTT_ACCOUNTS_FILE not found: {path}")
+    try:
+        yield from readers[extension](path)
+    except (OSError, UnicodeDecodeError, csv.Error) as e:
+        raise ConfigValidationError(f"Cannot read PTT_ACCOUNTS_FILE {path}: {type(e).__name__}") from None
+
+
+def load_accounts(environ: Optional[Mapping[str, str]] = None) -> AccountStore:
+    """Load every configured PTT account into an :class:`AccountStore`.
+
+    Sources, in order: ``PTT_USERNAME``/``PTT_PASSWORD``, the indexed
+    ``PTT_USERNAME_<n>``/``PTT_PASSWORD_<n>`` pairs (by ``n``) and the file
+    named by ``PTT_ACCOUNTS_FILE`` (``.csv``, ``.jsonl`` or ``.toml``). Files
+    are read row by row straight into the store. PTT IDs are
+    case-insensitive, so a username seen again in any case is dropped; the
+    first occurrence wins.
+
+    Args:
+        environ: Environment to read (``os.environ`` by default)
+
+    Returns:
+        AccountStore: The accounts, in source order
+
+    Raises:
+        ConfigValidationError: If an account is invalid or none are configured
+    """
+    environ = os.environ if environ is None else environ
+    logger = logging.getLogger(__name__)
+
+    def _sources() -> Iterator[Account]:
+        yield from _env_accounts(environ)
+        path = environ.get("PTT_ACCOUNTS_FILE", "").strip()
+        if path:
+            yield from _file_accounts(path)
+
+    store = AccountStore()
+    seen = set()
+    duplicates = 0
+    for username, password in _sources():
+        key = username.lower()
+        if key in seen:
+            duplicates += 1
+            continue
+        seen.add(key)
+        store.add(username, password)
+
+    if duplicates:
+        logger.warning(f"已略過 {duplicates} 個重複的 PTT 帳號")
+    if not store:
+        raise ConfigValidationError(
+            "No PTT account found. Please set PTT_USERNAME and PTT_PASSWORD, "
+            "PTT_USERNAME_1/PTT_PASSWORD_1, ... or PTT_ACCOUNTS_FILE"
+        )
+    logger.debug(f"已載入 {len(store)} 個 PTT 帳號")
+    return store
@@ -4,8 +4,9 @@ Application context module.
 
 import logging
 from typing import Dict, Any, Optional, List, Tuple
+from pttautosign.utils.accounts import AccountStore
 from pttautosign.utils.config import AppConfig, get_ptt_accounts, ConfigValidationError
-from pttautosign.utils.logger import setup_logging, get_logger
+from pttautosign.utils.logger import MAX_LISTED_ACCOUNTS, format_accounts, setup_logging, get_logger
 from pttautosign.utils.factory import ServiceFactory
 from pttautosign.utils.interfaces import NotificationService, LoginService
 
@@ -16,7 +17,7 @@ class AppContext:
         """Initialize the application context."""
         self.app_config: Optional[AppConfig] = None
         self.service_factory: Optional[ServiceFactory] = None
-        self._accounts: Optional[List[Tuple[str, str]]] = None
+        self._accounts: Optional[AccountStore] = None
         self.logger = logging.getLogger(__name__)
 
     def initialize(self) -> None:
@@ -53,15 +54,17 @@ class AppContext:
         # Initialize service factory
         self.service_factory = ServiceFactory(self.app_config)
     
-    def get_accounts(self) -> List[Tuple[str, str]]:
+    def get_accounts(self) -> AccountStore:
         """Get the configured PTT accounts.
 
-        Returns the list cached during ``initialize()`` to avoid re-reading
-        environment variables (and re-raising ``ConfigValidationError``). Falls
-        back to a fresh read if accessed before initialization.
+        Returns the store cached during ``initialize()`` to avoid re-reading
+        environment variables and the accounts file (and re-raising
+        ``ConfigValidationError``). Falls back to a fresh read if accessed
+        before initialization. Iterating the store decodes one
+        ``(username, password)`` tuple at a time.
 
         Returns:
-            List[Tuple[str, str]]: List of (username, password) tuples
+            AccountStore: Sequence of (username, password) tuples
         """
         if self._accounts is None:
             self._accounts = get_ptt_accounts()
@@ -87,8 +90,23 @@ class AppContext:
             raise RuntimeError("Application context not initialized")
         return self.service_factory.get_login_service()
     
-    def run(self) -> None:
+    def close(self) -> None:
+        """Shut down the services; called once before the program exits.
+
+        Notifications still queued are sent, or kept for the next run.
+        """
+        if not self.service_factory:
+            return
+        try:
+            self.service_factory.close()
+        except Exception as e:
+            self.logger.error(f"關閉服務時發生錯誤：{str(e)}")
+
+    def run(self, force: bool = False) -> None:
         """Run the application.
+
+        Args:
+            force: Log in even accounts already signed in today
         
         Raises:
             RuntimeError: If application context not initialized
@@ -108,16 +126,27 @@ class AppContext:
             accounts = self.get_accounts()
             self.logger.debug(f"正在處理 {len(accounts)} 個 PTT 帳號")
             
-            results = login_service.batch_login(accounts)
+            results = login_service.batch_login(accounts, force=force)
             
             # Log results summary
             success_count = sum(1 for success in results.values() if success)
-            self.logger.debug(f"登入結果：{success_count}/{len(results)} 個帳號成功")
+            self.logger.debug(
+                f"登入結果：{success_count}/{len(results)} 個帳號成功",
+                extra={
+                    "event": "batch_summary",
+                    "total": len(results),
+                    "succeeded": success_count,
+                    "failed": len(results) - success_count,
+                },
+            )
             
             # Log failed accounts if any
             if success_count < len(results):
                 failed_accounts = [account for account, success in results.items() if not success]
-                self.logger.warning(f"失敗帳號：{', '.join(failed_accounts)}")
+                self.logger.warning(
+                    f"失敗帳號：{format_accounts(failed_accounts)}",
+                    extra={"_accounts": failed_accounts[:MAX_LISTED_ACCOUNTS]},
+                )
             else:
                 self.logger.debug("所有帳號處理完成")
             
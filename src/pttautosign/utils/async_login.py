@@ -0,0 +1,190 @@
+"""
+asyncio-based batch login engine.
+"""
+
+import asyncio
+import concurrent.futures
+import functools
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Tuple
+
+from pttautosign.utils import log_context
+from pttautosign.utils.metrics import BatchResult
+from pttautosign.utils.ptt import PTTAutoSign
+
+
+class AsyncLoginService(PTTAutoSign):
+    """PTT auto sign-in handler that drives logins as asyncio coroutines.
+
+    PyPtt's API is blocking, so each login *attempt* still runs on a worker
+    thread — but only while it is actually talking to PTT. Concurrency is
+    bounded by an ``asyncio.Semaphore`` held per attempt, and retry backoff is
+    an ``asyncio.sleep`` that holds neither a semaphore slot nor a thread. The
+    thread pool is therefore sized by ``max_concurrency``, not by the number
+    of accounts. With ``adaptive_concurrency`` the gate follows the shared
+    AIMD window instead of a fixed semaphore.
+    """
+
+    @asynccontextmanager
+    async def _adaptive_slot(self, condition: asyncio.Condition) -> AsyncIterator[None]:
+        """Hold a slot of the AIMD window without blocking the event loop."""
+        async with condition:
+            await condition.wait_for(self.concurrency.try_acquire)
+        try:
+            yield
+        finally:
+            self.concurrency.release()
+            async with condition:
+                condition.notify_all()
+
+    async def login_async(
+        self,
+        ptt_id: str,
+        ptt_passwd: str,
+        send_notification: bool = True,
+        semaphore: asyncio.Semaphore | None = None,
+        executor: concurrent.futures.Executor | None = None,
+        window_changed: asyncio.Condition | None = None,
+        timings: BatchResult | None = None,
+    ) -> bool:
+        """Perform login with retries without blocking the event loop.
+
+        Args:
+            ptt_id: PTT username
+            ptt_passwd: PTT password
+            send_notification: Whether to send notification on success/failure
+            semaphore: Shared concurrency gate; a private one is used if None
+            executor: Executor for the blocking PyPtt calls (loop default if None)
+            window_changed: Shared condition used to wait for an AIMD slot
+            timings: Batch result that collects per-attempt timings
+
+        Returns:
+            bool: Whether login was successful
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = semaphore or asyncio.Semaphore(1)
+        window_changed = window_changed or asyncio.Condition()
+
+        for attempt in range(self.max_retries + 1):
+            gate = self._adaptive_slot(window_changed) if self.concurrency else semaphore
+            async with gate:
+                # Token only once the slot is held (see _wait_for_login_token).
+                if self.rate_limiter:
+                    waited = await self.rate_limiter.acquire_async()
+                    if waited > 0:
+                        with log_context.attempt(ptt_id, attempt + 1):
+                            self.logger.debug(f"帳號 {ptt_id} 等待登入速率限制 {waited:.2f} 秒")
+                result = await loop.run_in_executor(
+                    executor,
+                    functools.partial(
+                        self._attempt_login, ptt_id, ptt_passwd, attempt, send_notification, timings=timings
+                    ),
+                )
+            if result is not None:
+                return result
+            await asyncio.sleep(self._backoff(attempt))
+
+        return False
+
+    def login(self, ptt_id: str, ptt_passwd: str, send_notification: bool = True) -> bool:
+        """Perform login with retries (blocking wrapper around ``login_async``)."""
+        try:
+            return asyncio.run(self.login_async(ptt_id, ptt_passwd, send_notification))
+        finally:
+            self._flush_notifications()
+
+    def batch_login(self, accounts: List[Tuple[str, str]], force: bool = False) -> BatchResult:
+        """Batch login to PTT accounts as concurrent coroutines.
+
+        Args:
+            accounts: List of (username, password) tuples
+            force: Log in even accounts the ledger says already signed in today
+
+        Returns:
+            BatchResult: Login results (username -> success) with per-phase timings
+        """
+        results = BatchResult()
+
+        if not accounts:
+            self.logger.warning("未設定 PTT 帳號")
+            return results
+
+        accounts = self._skip_signed_in(accounts, force, results)
+        if not accounts:
+            self.logger.info("所有帳號今日皆已簽到")
+            return results
+
+        self.logger.info(f"開始批次登入 {len(accounts)} 個帳號（asyncio，並行上限 {self.config.max_concurrency}）")
+
+        batch_started = time.perf_counter()
+        asyncio.run(self._batch_login_async(accounts, results))
+        results.elapsed_ms = (time.perf_counter() - batch_started) * 1000
+
+        success_count = sum(1 for success in results.values() if success)
+        self.logger.info(f"批次登入完成：{success_count}/{len(results)} 個帳號成功")
+        self._log_latency_summary(results)
+        self._log_concurrency_summary()
+        self._flush_notifications()
+
+        return results
+
+    async def _batch_login_async(self, accounts: List[Tuple[str, str]], results: BatchResult) -> None:
+        """Run every account's login coroutine under a shared concurrency limit.
+
+        Results are written into ``results``.
+        """
+        batch_timeout = self._batch_timeout(len(accounts))
+        semaphore = asyncio.Semaphore(self.config.max_concurrency)
+        window_changed = asyncio.Condition()
+        executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=min(len(accounts), self.config.max_concurrency),
+            thread_name_prefix="ptt-login",
+        )
+
+        task_to_account = {
+            asyncio.create_task(
+                self.login_async(
+                    username,
+                    password,
+                    semaphore=semaphore,
+                    executor=executor,
+                    window_changed=window_changed,
+                    timings=results,
+                )
+            ): username
+            for username, password in accounts
+        }
+        timed_out = False
+        try:
+            done, pending = await asyncio.wait(task_to_account, timeout=batch_timeout)
+
+            for task in done:
+                username = task_to_account[task]
+                with log_context.attempt(username):
+                    try:
+                        results[username] = task.result()
+                    except Exception as e:
+                        # No exc_info — the worker frames hold the password.
+                        self.logger.error(f"PTT 帳號 {username} 登入時發生錯誤：{type(e).__name__}: {e}")
+                        results[username] = False
+                    if results[username]:
+                        self.logger.debug(f"PTT 帳號 {username} 登入成功")
+                    else:
+                        self.logger.error(f"PTT 帳號 {username} 登入失敗")
+
+            if pending:
+                timed_out = True
+                if self.concurrency:
+                    self.concurrency.record_throttle("timeout")
+                for task in pending:
+                    task.cancel()
+                    username = task_to_account[task]
+                    results[username] = False
+                    with log_context.attempt(username):
+                        self.logger.error(f"PTT 帳號 {username} 登入逾時（超過 {batch_timeout} 秒）")
+                await asyncio.gather(*pending, return_exceptions=True)
+        finally:
+            # A hung PyPtt call cannot be interrupted; on timeout do not block
+            # on its worker thread.
+            executor.shutdown(wait=not timed_out, cancel_futures=True)
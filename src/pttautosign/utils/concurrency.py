@@ -0,0 +1,168 @@
+"""
+Adaptive (AIMD) concurrency control for batch logins.
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+
+@dataclass(frozen=True)
+class WindowChange:
+    """A single change of the concurrency window."""
+    timestamp: float
+    window: float
+    reason: str
+
+
+class AIMDController:
+    """Additive-increase / multiplicative-decrease concurrency window.
+
+    Every successful login grows the window by ``increase / window`` (so a
+    full window of successes adds ``increase``), and every throttling signal
+    (``LoginTooOften``, ``UseTooManyResources`` or a timeout) multiplies it by
+    ``decrease``. Throttling signals from attempts that started before the
+    most recent decrease are ignored, so a burst of failures from one
+    over-full window only cuts the window once.
+
+    The controller is thread-safe. Callers gate work with :meth:`slot` (or
+    :meth:`try_acquire` / :meth:`release`), which admits at most ``window``
+    attempts at a time.
+    """
+
+    def __init__(
+        self,
+        initial: int = 1,
+        minimum: int = 1,
+        maximum: int = 5,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        history_size: int = 256,
+    ):
+        """Initialize the controller.
+
+        Args:
+            initial: Starting window
+            minimum: Lower bound of the window
+            maximum: Upper bound of the window
+            increase: Window growth per full window of successes
+            decrease: Multiplicative factor applied on throttling (0 < x < 1)
+            history_size: Number of window changes kept for inspection
+
+        Raises:
+            ValueError: If the bounds or factors are inconsistent
+        """
+        if not 1 <= minimum <= maximum:
+            raise ValueError("AIMD bounds must satisfy 1 <= minimum <= maximum")
+        if not 0 < decrease < 1:
+            raise ValueError("AIMD decrease factor must be between 0 and 1")
+        if increase <= 0:
+            raise ValueError("AIMD increase must be positive")
+
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = increase
+        self.decrease = decrease
+        self._window = float(min(max(initial, minimum), maximum))
+        self._in_flight = 0
+        self._peak = self._window
+        self._decrease_count = 0
+        self._last_decrease = float("-inf")
+        self._cond = threading.Condition()
+        self._history: Deque[WindowChange] = deque(maxlen=history_size)
+        self._history.append(WindowChange(time.monotonic(), self._window, "initial"))
+
+    @property
+    def window(self) -> int:
+        """Number of attempts currently allowed to run concurrently."""
+        return int(self._window)
+
+    @property
+    def in_flight(self) -> int:
+        """Number of attempts currently holding a slot."""
+        return self._in_flight
+
+    @property
+    def history(self) -> List[WindowChange]:
+        """Recent window changes, oldest first."""
+        with self._cond:
+            return list(self._history)
+
+    def try_acquire(self) -> bool:
+        """Take a slot if the window allows it, without blocking."""
+        with self._cond:
+            if self._in_flight < self.window:
+                self._in_flight += 1
+                return True
+            return False
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Block until a slot is free (or ``timeout`` seconds pass)."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._in_flight < self.window, timeout):
+                return False
+            self._in_flight += 1
+            return True
+
+    def release(self) -> None:
+        """Return a slot taken by :meth:`acquire` / :meth:`try_acquire`."""
+        with self._cond:
+            self._in_flight = max(0, self._in_flight - 1)
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """Hold a slot for the duration of the ``with`` block."""
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def record_success(self) -> None:
+        """Additively grow the window after a successful login."""
+        with self._cond:
+            if self._window >= self.maximum:
+                return
+            previous = self.window
+            self._window = min(self.maximum, self._window + self.increase / self._window)
+            self._peak = max(self._peak, self._window)
+            if self.window != previous:
+                self._history.append(WindowChange(time.monotonic(), self._window, "success"))
+                self._cond.notify_all()
+
+    def record_throttle(self, reason: str, started_at: Optional[float] = None) -> bool:
+        """Multiplicatively shrink the window after a throttling signal.
+
+        Args:
+            reason: Short label recorded in the history (e.g. exception name)
+            started_at: ``time.monotonic()`` at which the throttled attempt
+                started; signals older than the last decrease are ignored
+
+        Returns:
+            bool: Whether the window was actually decreased
+        """
+        with self._cond:
+            if started_at is not None and started_at < self._last_decrease:
+                return False
+            self._window = max(float(self.minimum), self._window * self.decrease)
+            self._last_decrease = time.monotonic()
+            self._decrease_count += 1
+            self._history.append(WindowChange(self._last_decrease, self._window, reason))
+            return True
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current state, suitable for logging."""
+        with self._cond:
+            return {
+                "window": self.window,
+                "in_flight": self._in_flight,
+                "peak": int(self._peak),
+                "minimum": self.minimum,
+                "maximum": self.maximum,
+                "decreases": self._decrease_count,
+                "history": [asdict(change) for change in self._history],
+            }
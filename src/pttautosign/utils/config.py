@@ -6,13 +6,70 @@ import os
 import re
 import json
 import logging
-from typing import Union, Dict, Type, List, Tuple, Any
-from dataclasses import dataclass, field, asdict
+from typing import TYPE_CHECKING, Union, Dict, Iterator, Optional, Type, Any
+from collections.abc import Mapping
+from dataclasses import dataclass, field, fields, asdict
+from functools import lru_cache
 
-# NOTE: ``PyPtt`` is intentionally NOT imported at module top. It is imported
-# lazily inside ``PTTConfig.__post_init__`` so that this module (config
-# dataclasses, validation, secret redaction) can be imported and unit-tested
-# without PyPtt installed and without its import-time side effects.
+# Batch login engines understood by ``ServiceFactory.get_login_service``.
+LOGIN_ENGINES = ("thread", "async", "process")
+
+# What ``NotificationDispatcher`` does when its queue is full.
+QUEUE_POLICIES = ("block", "drop_oldest", "spill")
+
+if TYPE_CHECKING:
+    from pttautosign.utils.accounts import AccountStore
+
+# NOTE: ``PyPtt`` is intentionally NOT imported at module top, nor when a
+# ``PTTConfig`` is created. ``default_error_messages`` imports it the first
+# time ``PTTConfig.error_messages`` is read, so this module (config
+# dataclasses, validation, secret redaction) and ``AppConfig.from_env`` stay
+# usable without PyPtt installed and without its import-time cost.
+
+@lru_cache(maxsize=None)
+def default_error_messages() -> Dict[Type[Exception], str]:
+    """PyPtt login exception -> user-facing message (imports PyPtt on first call)
+
+    Returns:
+        Dict[Type[Exception], str]: Messages keyed by exception type
+    """
+    from PyPtt import exceptions as PTT_exceptions
+
+    return {
+        PTT_exceptions.NoSuchUser: "PTT 登入失敗！\n找不到使用者",
+        PTT_exceptions.WrongIDorPassword: "PTT 登入失敗！\n帳號或密碼錯誤",
+        PTT_exceptions.WrongPassword: "PTT 登入失敗！\n密碼錯誤",
+        PTT_exceptions.LoginTooOften: "PTT 登入失敗！\n登入次數過於頻繁",
+        PTT_exceptions.UseTooManyResources: "PTT 登入失敗！\n系統資源使用過多",
+        PTT_exceptions.UnregisteredUser: "未註冊的使用者"
+    }
+
+
+class _LazyErrorMessages(Mapping):
+    """Read-only view of :func:`default_error_messages`, resolved on first access."""
+
+    __slots__ = ("_messages",)
+
+    def __init__(self):
+        self._messages: Optional[Dict[Type[Exception], str]] = None
+
+    def _resolve(self) -> Dict[Type[Exception], str]:
+        if self._messages is None:
+            self._messages = default_error_messages()
+        return self._messages
+
+    def __getitem__(self, key: Type[Exception]) -> str:
+        return self._resolve()[key]
+
+    def __iter__(self) -> Iterator[Type[Exception]]:
+        return iter(self._resolve())
+
+    def __len__(self) -> int:
+        return len(self._resolve())
+
+    def __repr__(self) -> str:
+        state = "unresolved" if self._messages is None else f"{len(self._messages)} entries"
+        return f"<PyPtt error messages ({state})>"
 
 class ConfigValidationError(Exception):
     """Exception raised for configuration validation errors"""
@@ -26,6 +83,20 @@ class TelegramConfig:
     disable_notification: bool = False
     retry_count: int = 3
     timeout: int = 10
+    pool_size: int = 10
+    queue_size: int = 100
+    queue_policy: str = "block"
+    sender_threads: int = 1
+    flush_timeout: int = 30
+    spill_path: str = ""
+    digest: bool = False
+    urgent_errors: bool = True
+    rate_limit: float = 30.0
+    chat_rate_limit: float = 1.0
+    outbox_path: str = ""
+    api_base: str = "https://api.telegram.org"
+    error_window: int = 3600
+    error_cache_path: str = ""
     
     def validate(self) -> None:
         """Validate configuration
@@ -47,6 +118,35 @@ class TelegramConfig:
         
         if self.timeout <= 0:
             raise ConfigValidationError("Timeout must be positive")
+
+        if self.pool_size < 1:
+            raise ConfigValidationError("Pool size must be at least 1")
+
+        if not re.match(r'^https?://[^/]+', self.api_base):
+            raise ConfigValidationError("API base must be an http(s) URL")
+
+        if self.error_window < 0:
+            raise ConfigValidationError("Error window must be non-negative (0 reports every error)")
+
+        if self.rate_limit < 0 or self.chat_rate_limit < 0:
+            raise ConfigValidationError("Rate limits must be non-negative (0 disables)")
+
+        if self.queue_size < 0:
+            raise ConfigValidationError("Queue size must be non-negative (0 sends synchronously)")
+
+        if self.sender_threads < 1:
+            raise ConfigValidationError("Sender threads must be at least 1")
+
+        if self.flush_timeout < 0:
+            raise ConfigValidationError("Flush timeout must be non-negative")
+
+        if self.queue_policy not in QUEUE_POLICIES:
+            raise ConfigValidationError(
+                f"Queue policy must be one of: {', '.join(QUEUE_POLICIES)}"
+            )
+
+        if self.queue_policy == "spill" and not self.spill_path:
+            raise ConfigValidationError("The spill queue policy requires TELEGRAM_SPILL_PATH or CRON_DATA_DIR")
     
     @classmethod
     def from_env(cls) -> 'TelegramConfig':
@@ -73,6 +173,64 @@ class TelegramConfig:
             raise ConfigValidationError(
                 "TELEGRAM_TIMEOUT must be an integer"
             ) from e
+        try:
+            pool_size = int(os.getenv("TELEGRAM_POOL_SIZE", "10"))
+        except ValueError as e:
+            raise ConfigValidationError(
+                "TELEGRAM_POOL_SIZE must be an integer"
+            ) from e
+        try:
+            error_window = int(os.getenv("TELEGRAM_ERROR_WINDOW", "3600"))
+        except ValueError as e:
+            raise ConfigValidationError(
+                "TELEGRAM_ERROR_WINDOW must be an integer"
+            ) from e
+        try:
+            queue_size = int(os.getenv("TELEGRAM_QUEUE_SIZE", "100"))
+        except ValueError as e:
+            raise ConfigValidationError(
+                "TELEGRAM_QUEUE_SIZE must be an integer"
+            ) from e
+        try:
+            sender_threads = int(os.getenv("TELEGRAM_SENDER_THREADS", "1"))
+        except ValueError as e:
+            raise ConfigValidationError(
+                "TELEGRAM_SENDER_THREADS must be an integer"
+            ) from e
+        try:
+            flush_timeout = int(os.getenv("TELEGRAM_FLUSH_TIMEOUT", "30"))
+        except ValueError as e:
+            raise ConfigValidationError(
+                "TELEGRAM_FLUSH_TIMEOUT must be an integer"
+            ) from e
+        try:
+            rate_limit = float(os.getenv("TELEGRAM_RATE_LIMIT", "30"))
+        except ValueError as e:
+            raise ConfigValidationError(
+                "TELEGRAM_RATE_LIMIT must be a number"
+            ) from e
+        try:
+            chat_rate_limit = float(os.getenv("TELEGRAM_CHAT_RATE_LIMIT", "1"))
+        except ValueError as e:
+            raise ConfigValidationError(
+                "TELEGRAM_CHAT_RATE_LIMIT must be a number"
+            ) from e
+        queue_policy = os.getenv("TELEGRAM_QUEUE_POLICY", "block").lower()
+        api_base = os.getenv("TELEGRAM_API_BASE", "https://api.telegram.org").strip()
+        digest = os.getenv("TELEGRAM_DIGEST", "false").lower() == "true"
+        urgent_errors = os.getenv("TELEGRAM_URGENT_ERRORS", "true").lower() == "true"
+        # Spilled and undeliverable notifications default to CRON_DATA_DIR
+        # like the sign-in ledger.
+        data_dir = os.getenv("CRON_DATA_DIR")
+        spill_path = os.getenv("TELEGRAM_SPILL_PATH")
+        if spill_path is None:
+            spill_path = os.path.join(data_dir, "notification_spill.jsonl") if data_dir else ""
+        outbox_path = os.getenv("TELEGRAM_OUTBOX_PATH")
+        if outbox_path is None:
+            outbox_path = os.path.join(data_dir, "notification_outbox.sqlite3") if data_dir else ""
+        error_cache_path = os.getenv("TELEGRAM_ERROR_CACHE_PATH")
+        if error_cache_path is None:
+            error_cache_path = os.path.join(data_dir, "error_throttle.json") if data_dir else ""
 
         if not token or not chat_id:
             raise ConfigValidationError("Telegram bot token or chat id not set in environment variables")
@@ -82,7 +240,21 @@ class TelegramConfig:
             chat_id=chat_id,
             disable_notification=disable_notification,
             retry_count=retry_count,
-            timeout=timeout
+            timeout=timeout,
+            pool_size=pool_size,
+            queue_size=queue_size,
+            queue_policy=queue_policy,
+            sender_threads=sender_threads,
+            flush_timeout=flush_timeout,
+            spill_path=spill_path,
+            digest=digest,
+            urgent_errors=urgent_errors,
+            rate_limit=rate_limit,
+            chat_rate_limit=chat_rate_limit,
+            outbox_path=outbox_path,
+            api_base=api_base,
+            error_window=error_window,
+            error_cache_path=error_cache_path
         )
         
         config.validate()
@@ -117,27 +289,27 @@ class TelegramConfig:
 class PTTConfig:
     """PTT configuration"""
     timezone_hours: int = 8
-    error_messages: Dict[Type[Exception], str] = field(default_factory=dict)
+    error_messages: Mapping[Type[Exception], str] = field(
+        default_factory=_LazyErrorMessages, repr=False, compare=False
+    )
     max_retries: int = 3
     retry_delay: int = 2
     connection_timeout: int = 30
     kick_other_session: bool = True
-    
-    def __post_init__(self):
-        """Initialize error messages after instance creation"""
-        if not self.error_messages:
-            # Imported here (not at module top) to keep config.py PyPtt-free
-            # at import time.
-            from PyPtt import exceptions as PTT_exceptions
-
-            self.error_messages = {
-                PTT_exceptions.NoSuchUser: "PTT 登入失敗！\n找不到使用者",
-                PTT_exceptions.WrongIDorPassword: "PTT 登入失敗！\n帳號或密碼錯誤",
-                PTT_exceptions.WrongPassword: "PTT 登入失敗！\n密碼錯誤",
-                PTT_exceptions.LoginTooOften: "PTT 登入失敗！\n登入次數過於頻繁",
-                PTT_exceptions.UseTooManyResources: "PTT 登入失敗！\n系統資源使用過多",
-                PTT_exceptions.UnregisteredUser: "未註冊的使用者"
-            }
+    max_concurrency: int = 5
+    login_engine: str = "thread"
+    adaptive_concurrency: bool = False
+    min_concurrency: int = 1
+    login_rate: float = 0.0
+    login_burst: int = 1
+    ledger_path: str = ""
+    lean_login: bool = False
+    host: str = ""
+    port: int = 0
+    worker_max_logins: int = 50
+    # Upper bound (seconds) on a whole batch_login run. The budget otherwise
+    # grows with accounts x retries x backoff; 0 removes the cap.
+    max_batch_timeout: int = 1800
     
     def validate(self) -> None:
         """Validate configuration
@@ -156,6 +328,32 @@ class PTTConfig:
         
         if self.connection_timeout <= 0:
             raise ConfigValidationError("Connection timeout must be positive")
+
+        if self.max_concurrency <= 0:
+            raise ConfigValidationError("Max concurrency must be positive")
+
+        if not 1 <= self.min_concurrency <= self.max_concurrency:
+            raise ConfigValidationError("Min concurrency must be between 1 and max concurrency")
+
+        if self.login_rate < 0:
+            raise ConfigValidationError("Login rate must be non-negative")
+
+        if self.login_burst < 1:
+            raise ConfigValidationError("Login burst must be at least 1")
+
+        if self.max_batch_timeout < 0:
+            raise ConfigValidationError("Max batch timeout must be non-negative")
+
+        if self.worker_max_logins < 1:
+            raise ConfigValidationError("Worker max logins must be at least 1")
+
+        if not 0 <= self.port <= 65534:
+            raise ConfigValidationError("Port must be between 0 and 65534 (0 uses the PyPtt default)")
+
+        if self.login_engine not in LOGIN_ENGINES:
+            raise ConfigValidationError(
+                f"Login engine must be one of: {', '.join(LOGIN_ENGINES)}"
+            )
     
     @classmethod
     def from_env(cls) -> 'PTTConfig':
@@ -170,6 +368,12 @@ class PTTConfig:
             except ValueError as e:
                 raise ConfigValidationError(f"{name} must be an integer") from e
 
+        def _float_env(name: str, default: str) -> float:
+            try:
+                return float(os.getenv(name, default))
+            except ValueError as e:
+                raise ConfigValidationError(f"{name} must be a number") from e
+
         # Prefer the convention-consistent ``ptt_timezone_hours``; fall back to
         # the legacy ``timezone_hours`` for backward compatibility.
         timezone_env = "ptt_timezone_hours" if os.getenv("ptt_timezone_hours") is not None else "timezone_hours"
@@ -178,13 +382,42 @@ class PTTConfig:
         retry_delay = _int_env("ptt_retry_delay", "2")
         connection_timeout = _int_env("ptt_connection_timeout", "30")
         kick_other_session = os.getenv("ptt_kick_other_session", "true").lower() == "true"
+        max_concurrency = _int_env("ptt_max_concurrency", "5")
+        login_engine = os.getenv("ptt_login_engine", "thread").lower()
+        adaptive_concurrency = os.getenv("ptt_adaptive_concurrency", "false").lower() == "true"
+        min_concurrency = _int_env("ptt_min_concurrency", "1")
+        login_rate = _float_env("ptt_login_rate", "0")
+        login_burst = _int_env("ptt_login_burst", "1")
+        lean_login = os.getenv("ptt_lean_login", "false").lower() == "true"
+        host = os.getenv("ptt_host", "").strip()
+        port = _int_env("ptt_port", "0")
+        worker_max_logins = _int_env("ptt_worker_max_logins", "50")
+        max_batch_timeout = _int_env("ptt_max_batch_timeout", "1800")
+        # The sign-in ledger defaults to CRON_DATA_DIR (the Docker data volume)
+        # when no explicit path is given; without either it stays disabled.
+        ledger_path = os.getenv("ptt_ledger_path")
+        if ledger_path is None:
+            data_dir = os.getenv("CRON_DATA_DIR")
+            ledger_path = os.path.join(data_dir, "signin_ledger.sqlite3") if data_dir else ""
         
         config = cls(
             timezone_hours=timezone_hours,
             max_retries=max_retries,
             retry_delay=retry_delay,
             connection_timeout=connection_timeout,
-            kick_other_session=kick_other_session
+            kick_other_session=kick_other_session,
+            max_concurrency=max_concurrency,
+            login_engine=login_engine,
+            adaptive_concurrency=adaptive_concurrency,
+            min_concurrency=min_concurrency,
+            login_rate=login_rate,
+            login_burst=login_burst,
+            ledger_path=ledger_path,
+            lean_login=lean_login,
+            host=host,
+            port=port,
+            worker_max_logins=worker_max_logins,
+            max_batch_timeout=max_batch_timeout
         )
         
         config.validate()
@@ -196,10 +429,9 @@ class PTTConfig:
         Returns:
             Dict[str, Any]: Configuration as dictionary
         """
-        result = asdict(self)
-        # Remove error_messages as it contains exception types that can't be serialized
-        result.pop("error_messages", None)
-        return result
+        # error_messages is left out: it holds exception types, which can't be
+        # serialized, and reading it would import PyPtt.
+        return {f.name: getattr(self, f.name) for f in fields(self) if f.name != "error_messages"}
     
     def to_json(self) -> str:
         """Convert configuration to JSON
@@ -215,6 +447,36 @@ class LogConfig:
     log_format: str = '%(asctime)s [%(name)s] %(levelname)s: %(message)s'
     log_level: int = logging.INFO
     debug_mode: bool = False
+    async_logging: bool = False
+    rate_limit_burst: int = 10
+    rate_limit_window: float = 60.0
+    log_file: str = ""
+    log_file_max_bytes: int = 10 * 1024 * 1024
+    log_file_when: str = "daily"
+    log_file_retention_bytes: int = 100 * 1024 * 1024
+
+    def validate(self) -> None:
+        """Validate configuration
+        
+        Raises:
+            ConfigValidationError: If configuration is invalid
+        """
+        if self.rate_limit_burst < 0:
+            raise ConfigValidationError("Log rate limit burst must be non-negative (0 disables)")
+
+        if self.rate_limit_window <= 0:
+            raise ConfigValidationError("Log rate limit window must be positive")
+
+        if self.log_file_when not in ("", "hourly", "daily"):
+            raise ConfigValidationError("Log file rotation must be hourly, daily or empty (size only)")
+
+        if self.log_file_max_bytes < 0 or self.log_file_retention_bytes < 0:
+            raise ConfigValidationError("Log file sizes must be non-negative (0 disables)")
+
+    @property
+    def json_format(self) -> bool:
+        """Whether ``LOG_FORMAT=json`` selected one JSON object per record."""
+        return self.log_format.strip().lower() == "json"
 
     @classmethod
     def from_env(cls) -> 'LogConfig':
@@ -223,6 +485,7 @@ class LogConfig:
         Returns:
             LogConfig: Logging configuration
         """
+        # Either a ``logging`` format string or ``json`` for structured output.
         log_format = os.getenv("LOG_FORMAT", '%(asctime)s [%(name)s] %(levelname)s: %(message)s')
         
         # Handle DEBUG_MODE
@@ -235,11 +498,46 @@ class LogConfig:
             log_level_str = os.getenv("LOG_LEVEL", "INFO").upper()
             log_level = getattr(logging, log_level_str, logging.INFO)
         
+        # Queue-based logging: callers only enqueue records and one listener
+        # thread writes them, so a slow log reader cannot stall the workers.
+        async_logging = os.getenv("LOG_ASYNC", "false").lower() == "true"
+
+        # At most LOG_RATE_LIMIT_BURST records per log call site and level in
+        # every LOG_RATE_LIMIT_WINDOW seconds; the rest are counted and
+        # summarized.
+        try:
+            rate_limit_burst = int(os.getenv("LOG_RATE_LIMIT_BURST", "10"))
+            rate_limit_window = float(os.getenv("LOG_RATE_LIMIT_WINDOW", "60"))
+        except ValueError as e:
+            raise ConfigValidationError(
+                "LOG_RATE_LIMIT_BURST must be an integer and LOG_RATE_LIMIT_WINDOW a number"
+            ) from e
+
+        # Optional log file (e.g. under /app/data), rotated by size and time;
+        # rotated segments are gzipped in the background and capped in total.
+        log_file = os.getenv("LOG_FILE", "").strip()
+        log_file_when = os.getenv("LOG_FILE_WHEN", "daily").strip().lower()
+        try:
+            log_file_max_bytes = int(os.getenv("LOG_FILE_MAX_BYTES", str(10 * 1024 * 1024)))
+            log_file_retention_bytes = int(os.getenv("LOG_FILE_RETENTION_BYTES", str(100 * 1024 * 1024)))
+        except ValueError as e:
+            raise ConfigValidationError(
+                "LOG_FILE_MAX_BYTES and LOG_FILE_RETENTION_BYTES must be integers"
+            ) from e
+
         config = cls(
             log_format=log_format,
             log_level=log_level,
-            debug_mode=debug_mode
+            debug_mode=debug_mode,
+            async_logging=async_logging,
+            rate_limit_burst=rate_limit_burst,
+            rate_limit_window=rate_limit_window,
+            log_file=log_file,
+            log_file_max_bytes=log_file_max_bytes,
+            log_file_when=log_file_when,
+            log_file_retention_bytes=log_file_retention_bytes,
         )
+        config.validate()
         
         return config
     
@@ -302,23 +600,19 @@ class AppConfig:
         """
         return json.dumps(self.to_dict(), indent=2)
 
-def get_ptt_accounts() -> List[Tuple[str, str]]:
-    """Get PTT account information from environment variables
-    
+def get_ptt_accounts() -> "AccountStore":
+    """Get PTT account information from environment variables and the accounts file
+
+    See :func:`pttautosign.utils.accounts.load_accounts` for the sources.
+
     Returns:
-        List[Tuple[str, str]]: List of PTT username and password tuples
-        
+        AccountStore: Sequence of PTT username and password tuples
+
     Raises:
         ConfigValidationError: If no valid accounts are found
     """
-    accounts = []
-    
-    # 檢查標準格式的主帳號
-    ptt_username = os.getenv("PTT_USERNAME")
-    ptt_password = os.getenv("PTT_PASSWORD")
-    
-    if not ptt_username or not ptt_password:
-        raise ConfigValidationError("No PTT account found. Please set PTT_USERNAME and PTT_PASSWORD environment variables")
-    
-    accounts.append((ptt_username, ptt_password))
-    return accounts 
\ No newline at end of file
+    # Imported here: the accounts module imports ConfigValidationError from
+    # this one.
+    from pttautosign.utils.accounts import load_accounts
+
+    return load_accounts()
@@ -0,0 +1,219 @@
+"""
+Digest notifications: collect a batch's messages and send them together.
+"""
+
+import logging
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from pttautosign.utils.interfaces import NotificationService
+
+# Telegram rejects ``sendMessage`` texts longer than this many characters.
+TELEGRAM_MESSAGE_LIMIT = 4096
+
+# Placed between the collected messages inside one digest.
+_DIGEST_SEPARATOR = "\n\n"
+
+
+# One unit of an HTML message: a tag, an entity, or a run of plain text.
+_HTML_ATOM = re.compile(r"<[^<>]*>|&#?\w+;|[^<&]+|[<&]")
+_HTML_TAG = re.compile(r"<(/?)([a-zA-Z][\w-]*)[^<>]*>")
+
+
+def _split_lines(text: str, limit: int) -> List[str]:
+    """Split plain text on line breaks, hard-splitting long lines."""
+    parts: List[str] = []
+    current = ""
+    for line in text.split("\n"):
+        while len(line) > limit:
+            if current:
+                parts.append(current)
+                current = ""
+            parts.append(line[:limit])
+            line = line[limit:]
+        candidate = f"{current}\n{line}" if current else line
+        if len(candidate) > limit:
+            parts.append(current)
+            candidate = line
+        current = candidate
+    if current:
+        parts.append(current)
+    return parts
+
+
+def _track_tags(stack: List[Tuple[str, str]], atom: str) -> None:
+    """Update the ``(name, opening tag)`` stack of open tags for ``atom``."""
+    match = _HTML_TAG.fullmatch(atom)
+    if not match:
+        return
+    name = match.group(2).lower()
+    if not match.group(1):
+        stack.append((name, atom))
+        return
+    for index in range(len(stack) - 1, -1, -1):
+        if stack[index][0] == name:
+            del stack[index:]
+            return
+
+
+def _closing_tags(stack: List[Tuple[str, str]]) -> str:
+    """Closing tags for every open tag, innermost first."""
+    return "".join(f"</{name}>" for name, _ in reversed(stack))
+
+
+def _split_html(text: str, limit: int) -> List[str]:
+    """Split an HTML message on line breaks without cutting its markup.
+
+    Tags and entities are never cut. Every part closes the tags still open
+    at its end and the next part reopens them, so each part is valid HTML
+    on its own (e.g. a long ``<pre>`` traceback stays preformatted).
+    """
+    parts: List[str] = []
+    stack: List[Tuple[str, str]] = []
+    current = ""
+    fresh = True  # ``current`` holds only the tags reopened from the last part
+
+    def end_part() -> None:
+        nonlocal current, fresh
+        if not fresh:
+            parts.append(current + _closing_tags(stack))
+        current = "".join(tag for _, tag in stack)
+        fresh = True
+
+    for line in text.split("\n"):
+        atoms = _HTML_ATOM.findall(line)
+        after = list(stack)
+        for atom in atoms:
+            _track_tags(after, atom)
+        candidate = current + line if fresh else f"{current}\n{line}"
+        if len(candidate) + len(_closing_tags(after)) > limit and not fresh:
+            end_part()
+            candidate = current + line
+        if len(candidate) + len(_closing_tags(after)) <= limit:
+            current, stack[:], fresh = candidate, after, False
+            continue
+
+        # The line alone is too long: fill parts atom by atom.
+        for atom in atoms:
+            if atom[0] not in "<&":
+                while atom:
+                    room = limit - len(current) - len(_closing_tags(stack))
+                    if room <= 0 and not fresh:
+                        end_part()
+                        continue
+                    room = max(room, 1)
+                    current, atom, fresh = current + atom[:room], atom[room:], False
+                continue
+            after = list(stack)
+            _track_tags(after, atom)
+            if len(current) + len(atom) + len(_closing_tags(after)) > limit and not fresh:
+                end_part()
+                after = list(stack)
+                _track_tags(after, atom)
+            current, stack[:], fresh = current + atom, after, False
+    end_part()
+    return parts
+
+
+def _split_long(text: str, limit: int, parse_mode: str = "html") -> List[str]:
+    """Split one oversized message on line breaks, hard-splitting long lines."""
+    if parse_mode.lower() == "html":
+        return _split_html(text, limit)
+    return _split_lines(text, limit)
+
+
+def pack_messages(
+    messages: List[str], limit: int = TELEGRAM_MESSAGE_LIMIT, parse_mode: str = "html"
+) -> List[str]:
+    """Join ``messages`` into as few texts of at most ``limit`` characters as possible.
+
+    Messages are kept whole and in order; only a message that is longer than
+    ``limit`` by itself is split (on line breaks where possible, and never
+    inside an HTML tag or entity when ``parse_mode`` is ``html``).
+    """
+    chunks: List[str] = []
+    current = ""
+    for message in messages:
+        for part in _split_long(message, limit, parse_mode) if len(message) > limit else [message]:
+            candidate = f"{current}{_DIGEST_SEPARATOR}{part}" if current else part
+            if len(candidate) > limit:
+                chunks.append(current)
+                candidate = part
+            current = candidate
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class DigestNotifier(NotificationService):
+    """Collects messages and sends them as a few digests on :meth:`flush`.
+
+    ``send_message`` only buffers; ``flush`` (called at the end of every
+    login / batch) packs the buffer into texts within Telegram's 4096-character
+    limit and hands them to the delegate, so a batch of hundreds of accounts
+    costs a handful of ``sendMessage`` calls instead of one per account. With
+    ``urgent_errors`` failures skip the digest and go out immediately.
+    """
+
+    def __init__(self, delegate: NotificationService, urgent_errors: bool = True, limit: int = TELEGRAM_MESSAGE_LIMIT):
+        """Initialize the notifier.
+
+        Args:
+            delegate: Service that sends the digests
+            urgent_errors: Send :meth:`send_urgent` messages right away
+            limit: Maximum characters per digest message
+        """
+        self.delegate = delegate
+        self.urgent_errors = urgent_errors
+        self.limit = limit
+        self.logger = logging.getLogger(__name__)
+        self._buffer: List[Tuple[str, str]] = []
+        self._lock = threading.Lock()
+
+    def send_message(self, text: str, parse_mode: str = "html") -> bool:
+        """Add a message to the current digest."""
+        with self._lock:
+            self._buffer.append((text, parse_mode))
+        return True
+
+    def send_urgent(self, text: str, parse_mode: str = "html") -> bool:
+        """Send right away when ``urgent_errors`` is on, else add to the digest."""
+        if self.urgent_errors:
+            return self.delegate.send_urgent(text, parse_mode)
+        return self.send_message(text, parse_mode)
+
+    def send_error_notification(self, error: Exception, context: Optional[Dict[str, Any]] = None) -> bool:
+        """Send an error notification right away (it is never digested)."""
+        return self.delegate.send_error_notification(error, context)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Send the collected messages as digests, then flush the delegate.
+
+        Returns:
+            bool: Whether every digest was accepted and the delegate drained
+        """
+        ok = self._send_digests()
+        return self.delegate.flush(timeout) and ok
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """Send the collected messages as digests, then close the delegate."""
+        ok = self._send_digests()
+        return self.delegate.close(timeout) and ok
+
+    def _send_digests(self) -> bool:
+        """Pack the buffered messages and hand them to the delegate."""
+        with self._lock:
+            buffered, self._buffer = self._buffer, []
+
+        ok = True
+        # Messages are grouped by parse mode so a digest never mixes formats.
+        for parse_mode in dict.fromkeys(mode for _, mode in buffered):
+            texts = [text for text, mode in buffered if mode == parse_mode]
+            chunks = pack_messages(texts, self.limit, parse_mode)
+            self.logger.debug(f"將 {len(texts)} 則通知合併為 {len(chunks)} 則摘要")
+            for chunk in chunks:
+                if not self.delegate.send_message(chunk, parse_mode):
+                    self.logger.warning("摘要通知發送失敗")
+                    ok = False
+        return ok
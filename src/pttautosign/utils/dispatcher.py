@@ -0,0 +1,328 @@
+"""
+Background notification dispatcher.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from pttautosign.utils.config import QUEUE_POLICIES
+from pttautosign.utils.interfaces import NotificationService
+from pttautosign.utils.outbox import NotificationOutbox
+
+# Seconds ``close`` waits for each sender thread to exit.
+_SENDER_JOIN_TIMEOUT = 1.0
+
+
+class NotificationDispatcher(NotificationService):
+    """Queues messages and sends them from background threads.
+
+    ``send_message`` only enqueues, so a slow or retrying notification service
+    never holds a login worker. When the bounded queue is full the policy
+    decides: ``block`` waits for room (backpressure on the caller),
+    ``drop_oldest`` discards the oldest queued message, and ``spill`` appends
+    the message to a JSON-lines file that is fed back into the queue once it
+    drains (and on the next run, if the process exits first).
+    Messages still queued when :meth:`close` gives up are kept for the next
+    run the same way, or in the outbox when there is no spill file.
+    ``send_urgent`` messages go to a separate lane that senders always empty
+    first and that no policy applies to.
+
+    Error notifications are sent synchronously: they format the traceback of
+    the exception currently being handled, which only exists in the caller's
+    thread.
+    """
+
+    def __init__(
+        self,
+        delegate: NotificationService,
+        queue_size: int = 100,
+        policy: str = "block",
+        senders: int = 1,
+        flush_timeout: float = 30.0,
+        spill_path: str = "",
+        outbox: Optional[NotificationOutbox] = None,
+        drain_rate: float = 0.0,
+    ):
+        """Initialize the dispatcher; sender threads start on first use.
+
+        Args:
+            delegate: Service that actually sends the messages
+            queue_size: Maximum number of queued messages
+            policy: Full-queue policy, one of ``QUEUE_POLICIES``
+            senders: Number of sender threads (1 keeps messages in order)
+            flush_timeout: Default deadline (seconds) for :meth:`flush`
+            spill_path: JSON-lines file for the ``spill`` policy (also keeps
+                the messages left at :meth:`close`)
+            outbox: Keeps the messages left at :meth:`close` when there is
+                no spill file
+            drain_rate: Messages per second the delegate can send (0:
+                unlimited); the default flush deadline grows to fit the
+                queued messages at this rate
+
+        Raises:
+            ValueError: If the parameters are invalid
+        """
+        if queue_size < 1 or senders < 1:
+            raise ValueError("Queue size and sender count must be at least 1")
+        if policy not in QUEUE_POLICIES:
+            raise ValueError(f"Queue policy must be one of: {', '.join(QUEUE_POLICIES)}")
+        if policy == "spill" and not spill_path:
+            raise ValueError("The spill policy requires a spill path")
+
+        self.delegate = delegate
+        self.queue_size = queue_size
+        self.policy = policy
+        self.senders = senders
+        self.flush_timeout = flush_timeout
+        self.spill_path = spill_path
+        self.outbox = outbox
+        self.drain_rate = drain_rate
+        self.logger = logging.getLogger(__name__)
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+        self.spilled = 0
+        self._queue: Deque[Tuple[str, str]] = deque()
+        self._urgent: Deque[Tuple[str, str]] = deque()
+        self._in_flight = 0
+        self._closed = False
+        self._threads: List[threading.Thread] = []
+        self._cond = threading.Condition()
+        self._spill_pending = self._count_spilled()
+
+    def send_message(self, text: str, parse_mode: str = "html") -> bool:
+        """Queue a message for sending.
+
+        Returns:
+            bool: True once the message is queued (or spilled); False if it
+            could not be stored. Delivery failures are logged by the senders.
+        """
+        with self._cond:
+            if not self._closed:
+                self._start_senders()
+                if len(self._queue) >= self.queue_size:
+                    if self.policy == "block":
+                        self._cond.wait_for(lambda: len(self._queue) < self.queue_size or self._closed)
+                        # close() ran while this caller waited for room.
+                        if self._closed and (self.spill_path or self.outbox):
+                            return self._keep([(text, parse_mode)])
+                    elif self.policy == "drop_oldest":
+                        self._queue.popleft()
+                        self.dropped += 1
+                        self.logger.warning("通知佇列已滿，捨棄最舊的一則通知")
+                    else:
+                        return self._spill([(text, parse_mode)])
+            if not self._closed:
+                self._queue.append((text, parse_mode))
+                self._cond.notify_all()
+                return True
+        # No sender takes messages after close(); send it here, outside the
+        # lock so a slow send does not hold up other callers.
+        return self.delegate.send_message(text, parse_mode)
+
+    def send_urgent(self, text: str, parse_mode: str = "html") -> bool:
+        """Queue a message ahead of every routine one; never blocks or drops."""
+        with self._cond:
+            if not self._closed:
+                self._start_senders()
+                self._urgent.append((text, parse_mode))
+                self._cond.notify_all()
+                return True
+        return self.delegate.send_message(text, parse_mode)
+
+    def send_error_notification(self, error: Exception, context: Optional[Dict[str, Any]] = None) -> bool:
+        """Send an error notification synchronously (see class docstring)."""
+        return self.delegate.send_error_notification(error, context)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued and spilled message has been handled.
+
+        The delegate is flushed too, with whatever time is left.
+
+        Args:
+            timeout: Deadline in seconds; if None, ``flush_timeout`` or the
+                time the queued messages need at ``drain_rate``, whichever
+                is longer
+
+        Returns:
+            bool: True if nothing is left to send
+        """
+        timeout = self._flush_window(timeout)
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            if self._pending():
+                self._start_senders()
+            done = self._cond.wait_for(lambda: not self._pending() and not self._in_flight, timeout)
+            if not done:
+                self.logger.warning(f"通知佇列未在 {timeout} 秒內清空，尚有 {self._pending()} 則未送出")
+        self.logger.debug(
+            f"通知發送統計：成功 {self.sent}，失敗 {self.failed}，捨棄 {self.dropped}，暫存 {self.spilled}"
+        )
+        return self.delegate.flush(max(0.0, deadline - time.monotonic())) and done
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """Flush, stop the sender threads, then close the delegate.
+
+        Messages still queued after the deadline go to the spill file, or to
+        the outbox without one, so the next run sends them; with neither they
+        are lost (and logged as an error).
+
+        Args:
+            timeout: Deadline in seconds (see :meth:`flush`)
+
+        Returns:
+            bool: True if nothing was left unsent
+        """
+        timeout = self._flush_window(timeout)
+        deadline = time.monotonic() + timeout
+        done = self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            leftover = [*self._urgent, *self._queue]
+            self._urgent.clear()
+            self._queue.clear()
+            self._cond.notify_all()
+            if leftover:
+                self._keep(leftover)
+        for thread in self._threads:
+            thread.join(_SENDER_JOIN_TIMEOUT)
+        return self.delegate.close(max(0.0, deadline - time.monotonic())) and done
+
+    def _flush_window(self, timeout: Optional[float]) -> float:
+        """Seconds :meth:`flush` waits for ``timeout`` (see there)."""
+        if timeout is not None:
+            return timeout
+        if self.drain_rate <= 0:
+            return self.flush_timeout
+        # Spilled messages are not counted: they stay on disk if time runs out.
+        with self._cond:
+            backlog = len(self._urgent) + len(self._queue) + self._in_flight
+        return max(self.flush_timeout, backlog / self.drain_rate)
+
+    def _pending(self) -> int:
+        """Messages not yet taken by a sender (caller holds ``_cond``)."""
+        return len(self._urgent) + len(self._queue) + self._spill_pending
+
+    def _start_senders(self) -> None:
+        """Start the sender threads (caller holds ``_cond``)."""
+        if self._threads:
+            return
+        for index in range(self.senders):
+            thread = threading.Thread(target=self._sender, name=f"notify-sender-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _next_message(self) -> Optional[Tuple[str, str]]:
+        """Take the next message, waiting for one; None once closed and empty."""
+        with self._cond:
+            while True:
+                # Once closed, spilled messages stay on disk for the next run.
+                if not self._queue and self._spill_pending and not self._closed:
+                    self._refill_from_spill()
+                if self._urgent or self._queue:
+                    message = (self._urgent or self._queue).popleft()
+                    self._in_flight += 1
+                    self._cond.notify_all()
+                    return message
+                if self._closed:
+                    return None
+                self._cond.wait()
+
+    def _sender(self) -> None:
+        """Sender thread body."""
+        while True:
+            message = self._next_message()
+            if message is None:
+                return
+            text, parse_mode = message
+            try:
+                ok = self.delegate.send_message(text, parse_mode)
+            except Exception as e:
+                self.logger.error(f"背景發送通知時發生錯誤：{type(e).__name__}: {e}")
+                ok = False
+            with self._cond:
+                self._in_flight -= 1
+                if ok:
+                    self.sent += 1
+                else:
+                    self.failed += 1
+                self._cond.notify_all()
+            if not ok:
+                self.logger.warning("背景通知發送失敗")
+
+    def _keep(self, messages: List[Tuple[str, str]]) -> bool:
+        """Store unsent ``messages`` for the next run (caller holds ``_cond``).
+
+        Returns:
+            bool: False if there is nowhere to store them
+        """
+        if self.spill_path:
+            return self._spill(messages)
+        if self.outbox:
+            for text, parse_mode in messages:
+                self.outbox.add(text, parse_mode)
+            self.logger.warning(f"{len(messages)} 則通知未及送出，已存入待發送區，將於下次執行時補發")
+            return True
+        self.logger.error(f"關閉時仍有 {len(messages)} 則通知未送出，這些通知將遺失")
+        return False
+
+    def _count_spilled(self) -> int:
+        """Messages left in the spill file (e.g. by a previous run)."""
+        if not self.spill_path or not os.path.exists(self.spill_path):
+            return 0
+        try:
+            with open(self.spill_path, encoding="utf-8") as f:
+                return sum(1 for line in f if line.strip())
+        except OSError as e:
+            self.logger.warning(f"無法讀取通知暫存檔：{e}")
+            return 0
+
+    def _spill(self, messages: List[Tuple[str, str]]) -> bool:
+        """Append ``messages`` to the spill file (caller holds ``_cond``)."""
+        try:
+            directory = os.path.dirname(self.spill_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.spill_path, "a", encoding="utf-8") as f:
+                for text, parse_mode in messages:
+                    f.write(json.dumps({"text": text, "parse_mode": parse_mode}, ensure_ascii=False) + "\n")
+        except OSError as e:
+            self.logger.error(f"無法寫入通知暫存檔：{e}")
+            return False
+        self.spilled += len(messages)
+        self._spill_pending += len(messages)
+        self.logger.debug(f"{len(messages)} 則通知暫存至磁碟")
+        return True
+
+    def _refill_from_spill(self) -> None:
+        """Move spilled messages back into the queue (caller holds ``_cond``)."""
+        try:
+            with open(self.spill_path, encoding="utf-8") as f:
+                lines = [line for line in f if line.strip()]
+        except OSError as e:
+            self.logger.warning(f"無法讀取通知暫存檔：{e}")
+            self._spill_pending = 0
+            return
+
+        take, keep = lines[: self.queue_size], lines[self.queue_size:]
+        for line in take:
+            try:
+                item = json.loads(line)
+                self._queue.append((item["text"], item.get("parse_mode", "html")))
+            except (ValueError, KeyError, TypeError):
+                self.logger.warning("略過損毀的通知暫存紀錄")
+
+        try:
+            if keep:
+                with open(self.spill_path, "w", encoding="utf-8") as f:
+                    f.writelines(keep)
+            else:
+                os.remove(self.spill_path)
+        except OSError as e:
+            self.logger.warning(f"無法更新通知暫存檔：{e}")
+        self._spill_pending = len(keep)
@@ -0,0 +1,164 @@
+"""
+Fingerprinting and throttling of repeated error notifications.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+import traceback
+from typing import Any, Callable, Dict, List, Tuple
+
+# Numbers, hex addresses and whitespace runs vary between otherwise identical
+# errors (ports, PIDs, object ids, timeouts).
+_VOLATILE_RE = re.compile(r"0x[0-9a-fA-F]+|\d+")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Expired entries that still hold an unreported repeat count are kept this
+# long (seconds) so the count can go out with the next report.
+_SUPPRESSED_RETENTION = 7 * 24 * 3600
+
+
+def _normalize_message(message: str) -> str:
+    return _WHITESPACE_RE.sub(" ", _VOLATILE_RE.sub("#", message)).strip()[:200]
+
+
+def error_fingerprint(error: BaseException) -> str:
+    """Fingerprint of ``error``: its type, normalized message and raising frame.
+
+    Two errors with the same fingerprint would produce near-identical reports.
+    """
+    try:
+        message = str(error)
+    except Exception:
+        message = ""
+    frames = traceback.extract_tb(error.__traceback__) if error.__traceback__ else []
+    top = f"{os.path.basename(frames[-1].filename)}:{frames[-1].name}" if frames else ""
+    error_type = f"{type(error).__module__}.{type(error).__qualname__}"
+    key = "\0".join((error_type, _normalize_message(message), top))
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+def _valid_entry(entry: Any) -> bool:
+    """Whether a cache entry has the fields :class:`ErrorThrottle` reads."""
+    return (
+        isinstance(entry, dict)
+        and isinstance(entry.get("reported_at"), (int, float))
+        and isinstance(entry.get("suppressed"), int)
+    )
+
+
+class ErrorThrottle:
+    """Allows one report per error fingerprint per suppression window.
+
+    Repeats inside the window are counted instead of reported; the first
+    report after the window carries that count. If the error does not come
+    back, :meth:`take_due_summaries` hands the count out once the window
+    has ended (on any later check, or at shutdown). State is kept in a small JSON
+    file (when ``path`` is set) so the window spans cron runs, which is where
+    the repeats come from: every run hits the same outage.
+
+    Cache errors are logged and swallowed; the worst case is a duplicate
+    report.
+    """
+
+    def __init__(self, window: float, path: str = "", clock: Callable[[], float] = time.time):
+        """Initialize the throttle.
+
+        Args:
+            window: Suppression window in seconds
+            path: JSON cache file (in-memory only if empty)
+            clock: Wall clock (injectable for tests); must survive restarts
+        """
+        self.window = window
+        self.path = path
+        self.logger = logging.getLogger(__name__)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = self._load()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if not self.path or not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"無法讀取錯誤通知快取：{e}")
+            return {}
+        if not isinstance(entries, dict):
+            self.logger.warning("錯誤通知快取格式不正確，已忽略")
+            return {}
+        valid = {key: entry for key, entry in entries.items() if _valid_entry(entry)}
+        if len(valid) < len(entries):
+            self.logger.warning(f"略過 {len(entries) - len(valid)} 筆損毀的錯誤通知快取紀錄")
+        return valid
+
+    def _save(self) -> None:
+        """Write the cache atomically, dropping expired entries (caller holds ``_lock``)."""
+        if not self.path:
+            return
+        now = self._clock()
+        self._entries = {
+            key: entry
+            for key, entry in self._entries.items()
+            if now - entry["reported_at"] < (_SUPPRESSED_RETENTION if entry["suppressed"] else self.window)
+        }
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            self.logger.warning(f"無法寫入錯誤通知快取：{e}")
+
+    def check(self, fingerprint: str, label: str = "") -> Tuple[bool, int]:
+        """Decide whether an error with ``fingerprint`` should be reported now.
+
+        Args:
+            fingerprint: See :func:`error_fingerprint`
+            label: Short description of the error, used by
+                :meth:`take_due_summaries`
+
+        Returns:
+            Tuple[bool, int]: Whether to report, and how many repeats were
+            suppressed since the previous report (0 when suppressing)
+        """
+        with self._lock:
+            now = self._clock()
+            entry = self._entries.get(fingerprint)
+            if entry is not None and now - entry["reported_at"] < self.window:
+                entry["suppressed"] += 1
+                self._save()
+                return False, 0
+            suppressed = entry["suppressed"] if entry else 0
+            self._entries[fingerprint] = {"reported_at": now, "suppressed": 0, "label": label[:200]}
+            self._save()
+            return True, suppressed
+
+    def take_due_summaries(self) -> List[Tuple[str, int]]:
+        """Take the repeat counts of errors whose window ended unreported.
+
+        Each count is returned once and then cleared, so the caller must
+        report it.
+
+        Returns:
+            List[Tuple[str, int]]: ``(label, suppressed)`` pairs
+        """
+        with self._lock:
+            now = self._clock()
+            due = []
+            for entry in self._entries.values():
+                if entry["suppressed"] and now - entry["reported_at"] >= self.window:
+                    due.append((str(entry.get("label", "")), entry["suppressed"]))
+                    entry["suppressed"] = 0
+            if due:
+                self._save()
+            return due
+
@@ -2,12 +2,38 @@
 Factory module for creating service instances.
 """
 
+import importlib
 from datetime import timezone, timedelta
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Type
 from pttautosign.utils.config import AppConfig, TelegramConfig, PTTConfig
 from pttautosign.utils.interfaces import NotificationService, LoginService
 from pttautosign.utils.telegram import TelegramBot
-from pttautosign.utils.ptt import PTTAutoSign
+from pttautosign.utils.dispatcher import NotificationDispatcher
+from pttautosign.utils.digest import DigestNotifier
+from pttautosign.utils.outbox import NotificationOutbox
+from pttautosign.utils.error_throttle import ErrorThrottle
+
+# ``PTTConfig.login_engine`` -> (module, class) of its login service. Imported
+# on first use: every engine pulls in PyPtt, which callers that only need
+# notifications should not pay for.
+_LOGIN_SERVICES = {
+    "thread": ("pttautosign.utils.ptt", "PTTAutoSign"),
+    "async": ("pttautosign.utils.async_login", "AsyncLoginService"),
+    "process": ("pttautosign.utils.process_login", "ProcessLoginService"),
+}
+
+def login_service_class(engine: str) -> Type[LoginService]:
+    """Import and return the login service class for ``engine``.
+
+    Args:
+        engine: One of ``LOGIN_ENGINES``
+
+    Returns:
+        Type[LoginService]: The login service class
+    """
+    module_name, class_name = _LOGIN_SERVICES[engine]
+    return getattr(importlib.import_module(module_name), class_name)
+
 
 class ServiceFactory:
     """Factory class for creating service instances."""
@@ -20,6 +46,7 @@ class ServiceFactory:
         """
         self.app_config = app_config
         self._services: Dict[str, Any] = {}
+        self._outbox: Optional[NotificationOutbox] = None
     
     def get_notification_service(self) -> NotificationService:
         """Get notification service instance.
@@ -31,7 +58,41 @@ class ServiceFactory:
             # Share the PTT timezone so error-notification timestamps match the
             # login success messages.
             tz = timezone(timedelta(hours=self.app_config.ptt.timezone_hours))
-            self._services["notification"] = TelegramBot(self.app_config.telegram, tz=tz)
+            config = self.app_config.telegram
+            outbox = NotificationOutbox(config.outbox_path) if config.outbox_path else None
+            # Report each distinct error once per window, across runs.
+            error_throttle = (
+                ErrorThrottle(config.error_window, config.error_cache_path) if config.error_window > 0 else None
+            )
+            bot = TelegramBot(config, tz=tz, outbox=outbox, error_throttle=error_throttle)
+            # Messages a previous run could not deliver go out while this
+            # run logs in; flushing the service waits for them. With
+            # notifications disabled they stay stored.
+            if not config.disable_notification:
+                bot.start_outbox_replay()
+            service: NotificationService = bot
+            # Send from background threads so Telegram latency never holds a
+            # login worker; a queue size of 0 keeps sending synchronous.
+            if config.queue_size > 0:
+                # The bot sends no faster than the slower of its rate limits.
+                limits = [rate for rate in (config.rate_limit, config.chat_rate_limit) if rate > 0]
+                drain_rate = min(limits, default=0.0)
+                service = NotificationDispatcher(
+                    service,
+                    queue_size=config.queue_size,
+                    policy=config.queue_policy,
+                    senders=config.sender_threads,
+                    flush_timeout=config.flush_timeout,
+                    spill_path=config.spill_path,
+                    outbox=outbox,
+                    drain_rate=drain_rate,
+                )
+            # Digest mode collects a batch's messages and sends them together
+            # when the batch flushes.
+            if config.digest:
+                service = DigestNotifier(service, urgent_errors=config.urgent_errors)
+            self._services["notification"] = service
+            self._outbox = outbox
         return self._services["notification"]
     
     def get_login_service(self) -> LoginService:
@@ -42,9 +103,30 @@ class ServiceFactory:
         """
         if "login" not in self._services:
             notification_service = self.get_notification_service()
-            self._services["login"] = PTTAutoSign(
+            login_cls = login_service_class(self.app_config.ptt.login_engine)
+            self._services["login"] = login_cls(
                 notification_service, 
                 self.app_config.ptt,
                 self.app_config.telegram.disable_notification
             )
-        return self._services["login"] 
\ No newline at end of file
+        return self._services["login"] 
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """Shut down the notification service, if one was created.
+
+        Queued notifications are sent, or kept for the next run when the
+        deadline passes; then the outbox database is closed.
+
+        Args:
+            timeout: Maximum seconds to wait (``TELEGRAM_FLUSH_TIMEOUT`` if None)
+
+        Returns:
+            bool: Whether nothing was left unsent
+        """
+        service = self._services.get("notification")
+        if service is None:
+            return True
+        done = service.close(timeout)
+        if self._outbox:
+            self._outbox.close()
+        return done
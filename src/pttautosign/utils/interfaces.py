@@ -34,6 +34,46 @@ class NotificationService(ABC):
         """
         pass
 
+    def send_urgent(self, text: str, parse_mode: str = "html") -> bool:
+        """Send a message that should not wait behind routine ones (e.g. errors).
+
+        Services without a separate lane send it like any other message.
+
+        Args:
+            text: Message content
+            parse_mode: Message format
+
+        Returns:
+            bool: Whether the message was sent (or accepted) successfully
+        """
+        return self.send_message(text, parse_mode)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until queued messages have been sent.
+
+        Services that send synchronously have nothing to wait for.
+
+        Args:
+            timeout: Maximum seconds to wait (implementation default if None)
+
+        Returns:
+            bool: Whether nothing is left to send
+        """
+        return True
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """Send what is still queued and release the service's resources.
+
+        Called once at shutdown; services without resources just flush.
+
+        Args:
+            timeout: Maximum seconds to wait (implementation default if None)
+
+        Returns:
+            bool: Whether nothing was left unsent
+        """
+        return self.flush(timeout)
+
 class LoginService(ABC):
     """Abstract base class for login services."""
     
@@ -51,13 +91,16 @@ class LoginService(ABC):
         pass
     
     @abstractmethod
-    def batch_login(self, accounts: List[Tuple[str, str]]) -> Dict[str, bool]:
+    def batch_login(self, accounts: List[Tuple[str, str]], force: bool = False) -> Dict[str, bool]:
         """Perform batch login.
         
         Args:
             accounts: List of (username, password) tuples
+            force: Log in even accounts already signed in today
             
         Returns:
             Dict[str, bool]: Dictionary mapping usernames to login success status
+            (implementations may return a ``dict`` subclass carrying extra
+            data, such as ``BatchResult`` timings)
         """
         pass
\ No newline at end of file
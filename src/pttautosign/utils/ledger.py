@@ -0,0 +1,96 @@
+"""
+Persistent daily sign-in ledger.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime, tzinfo
+from typing import Iterable, Optional, Set
+
+
+class SignInLedger:
+    """Records the last successful sign-in day of each account in SQLite.
+
+    A "day" is the calendar date in the configured PTT timezone, so a rerun
+    (cron retry, container restart, ``--test-login`` verification) can skip
+    accounts that PTT has already counted today. Each success is committed
+    immediately, which lets a crashed batch resume with only the pending
+    accounts.
+
+    Ledger errors are logged and swallowed: a broken ledger must never stop
+    accounts from signing in.
+    """
+
+    def __init__(self, path: str, tz: Optional[tzinfo] = None):
+        """Initialize the ledger.
+
+        Args:
+            path: SQLite database file (parent directories are created)
+            tz: Timezone that defines the sign-in day (host local time if None)
+        """
+        self.path = path
+        self.tz = tz
+        self.logger = logging.getLogger(__name__)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Open the database on first use (caller holds ``_lock``)."""
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS signins ("
+                " account TEXT PRIMARY KEY,"
+                " day TEXT NOT NULL,"
+                " signed_at TEXT NOT NULL)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def today(self) -> str:
+        """Current sign-in day as an ISO date string."""
+        return datetime.now(self.tz).date().isoformat()
+
+    def record(self, account: str) -> None:
+        """Record a successful sign-in for ``account`` now."""
+        now = datetime.now(self.tz)
+        try:
+            with self._lock:
+                conn = self._connection()
+                conn.execute(
+                    "INSERT INTO signins (account, day, signed_at) VALUES (?, ?, ?)"
+                    " ON CONFLICT(account) DO UPDATE SET day = excluded.day, signed_at = excluded.signed_at",
+                    (account, now.date().isoformat(), now.isoformat(timespec="seconds")),
+                )
+                conn.commit()
+        except sqlite3.Error as e:
+            self.logger.warning(f"無法寫入簽到紀錄（{account}）：{e}")
+
+    def signed_in_today(self, accounts: Iterable[str]) -> Set[str]:
+        """Return the subset of ``accounts`` already signed in today."""
+        wanted = set(accounts)
+        if not wanted:
+            return set()
+        try:
+            with self._lock:
+                rows = self._connection().execute(
+                    "SELECT account FROM signins WHERE day = ?", (self.today(),)
+                ).fetchall()
+        except sqlite3.Error as e:
+            self.logger.warning(f"無法讀取簽到紀錄：{e}")
+            return set()
+        return wanted.intersection(row[0] for row in rows)
+
+    def close(self) -> None:
+        """Close the database connection, if open."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
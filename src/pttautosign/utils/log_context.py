@@ -0,0 +1,90 @@
+"""
+Run and login-attempt context for structured log records.
+"""
+
+import hashlib
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, replace
+from typing import Iterator, Optional
+
+_run_id: Optional[str] = None
+_run_id_lock = threading.Lock()
+
+_RUN_STARTED = time.monotonic()
+
+
+def run_id() -> str:
+    """Id of this run in structured logs, created on first use."""
+    global _run_id
+    with _run_id_lock:
+        if _run_id is None:
+            _run_id = uuid.uuid4().hex[:12]
+        return _run_id
+
+
+def set_run_id(value: str) -> None:
+    """Log under ``value`` (a login worker process adopting its parent's id)."""
+    global _run_id
+    with _run_id_lock:
+        _run_id = value
+
+
+@dataclass(frozen=True)
+class LogContext:
+    """What the current thread or task is working on."""
+    account: Optional[str] = None
+    attempt: Optional[int] = None
+    phase: Optional[str] = None
+    started: float = _RUN_STARTED
+
+    @property
+    def elapsed_ms(self) -> float:
+        """Milliseconds since the attempt (or, outside one, the run) started."""
+        return (time.monotonic() - self.started) * 1000
+
+
+_current: ContextVar[LogContext] = ContextVar("pttautosign_log_context", default=LogContext())
+
+
+def current() -> LogContext:
+    """Context of the calling thread or task."""
+    return _current.get()
+
+
+@contextmanager
+def attempt(account: str, number: Optional[int] = None) -> Iterator[None]:
+    """Attribute records logged in the ``with`` block to a login attempt.
+
+    Args:
+        account: PTT username (only its :func:`account_id` is ever logged)
+        number: One-based attempt number, if known
+    """
+    token = _current.set(LogContext(account=account, attempt=number, started=time.monotonic()))
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Mark records logged in the ``with`` block with phase ``name``."""
+    token = _current.set(replace(_current.get(), phase=name))
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def account_id(username: str) -> str:
+    """Stable pseudonym of a PTT username for logs.
+
+    The same account maps to the same id in every record and run (PTT IDs
+    are case-insensitive), without the username itself reaching the logs.
+    """
+    digest = hashlib.blake2b(username.lower().encode("utf-8"), digest_size=6).hexdigest()
+    return f"acct-{digest}"
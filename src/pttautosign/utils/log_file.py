@@ -0,0 +1,200 @@
+"""
+Rotating log file with background compression of rotated segments.
+"""
+
+import glob
+import gzip
+import logging
+import os
+import queue
+import re
+import shutil
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from logging.handlers import BaseRotatingHandler
+from typing import List, Optional
+
+# Values of ``LOG_FILE_WHEN``: time-based rotation boundaries ("" for none).
+ROTATION_SCHEDULES = ("", "hourly", "daily")
+
+_STOP = object()
+
+# Suffix of a rotated segment: ``.<YYYYmmdd-HHMMSS>-<n>``.
+_SEGMENT_SUFFIX = r"\.\d{8}-\d{6}-\d{3,}"
+
+
+def _next_boundary(when: str, now: float) -> float:
+    """First rotation time after ``now`` (``inf`` without time-based rotation)."""
+    if when == "hourly":
+        start = datetime.fromtimestamp(now).replace(minute=0, second=0, microsecond=0)
+        return (start + timedelta(hours=1)).timestamp()
+    if when == "daily":
+        start = datetime.fromtimestamp(now).replace(hour=0, minute=0, second=0, microsecond=0)
+        return (start + timedelta(days=1)).timestamp()
+    return float("inf")
+
+
+class CompressingRotatingFileHandler(BaseRotatingHandler):
+    """File handler that rotates by size and time and gzips old segments.
+
+    Rotating only renames the file (``<file>.<YYYYmmdd-HHMMSS>-<n>``); a
+    background thread compresses the segment to ``.gz`` and then deletes the
+    oldest compressed segments until they total at most ``retention_bytes``.
+    Uncompressed segments count toward the cap too; the newest segment is
+    always kept. The thread that logs
+    never waits for gzip. Segments left uncompressed by an earlier run
+    (killed mid-compression) are picked up at start. Other files next to the
+    log (``app.log.bak``, ...) are never touched.
+
+    Compression errors go to stderr, as ``logging`` does for handler errors:
+    logging them could deadlock with :meth:`close` under ``logging.shutdown``.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        max_bytes: int = 0,
+        when: str = "",
+        retention_bytes: int = 0,
+        encoding: str = "utf-8",
+    ):
+        """Initialize the handler.
+
+        Args:
+            filename: Log file path (its directory is created if missing)
+            max_bytes: Rotate once the file reaches this size (0: never)
+            when: Also rotate at every ``"hourly"`` or ``"daily"`` boundary
+            retention_bytes: Keep at most this many bytes of rotated
+                segments (0: keep all)
+            encoding: File encoding
+        """
+        if when not in ROTATION_SCHEDULES:
+            raise ValueError(f"when must be one of {ROTATION_SCHEDULES}")
+        filename = os.path.abspath(filename)
+        directory = os.path.dirname(filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        super().__init__(filename, "a", encoding=encoding, delay=True)
+        self.max_bytes = max_bytes
+        self.when = when
+        self.retention_bytes = retention_bytes
+        # A file left by the previous run rotates at the first boundary after
+        # it was last written, e.g. yesterday's log on today's first record.
+        started = os.path.getmtime(filename) if os.path.exists(filename) else time.time()
+        self._rollover_at = _next_boundary(when, started)
+        self._segment_re = re.compile(
+            re.escape(os.path.basename(filename)) + f"({_SEGMENT_SUFFIX})(?:\\.gz|\\.gz\\.tmp)?"
+        )
+
+        self._pending: queue.SimpleQueue = queue.SimpleQueue()
+        self._compressor = threading.Thread(target=self._compress_loop, name="log-compressor", daemon=True)
+        self._compressor.start()
+        for segment in self._uncompressed_segments():
+            self._pending.put(segment)
+
+    def _segments(self) -> List[str]:
+        """Rotated segments (compressed or not) and partial ``.gz.tmp`` files, oldest first."""
+        matches = []
+        for path in glob.glob(glob.escape(self.baseFilename) + ".*"):
+            match = self._segment_re.fullmatch(os.path.basename(path))
+            if match:
+                matches.append((len(match.group(1)), match.group(1), path))
+        # Suffixes embed the rotation time, so they sort oldest first (a
+        # longer sequence number comes later within the same second).
+        return [path for _, _, path in sorted(matches)]
+
+    def _uncompressed_segments(self) -> List[str]:
+        segments = []
+        for path in self._segments():
+            if path.endswith(".gz.tmp"):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            elif not path.endswith(".gz"):
+                segments.append(path)
+        return segments
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if record.created >= self._rollover_at:
+            return True
+        if self.max_bytes > 0:
+            if self.stream is None:
+                self.stream = self._open()
+            # Checked before the write, so a segment can end one record
+            # past max_bytes; that saves formatting each record twice.
+            return self.stream.tell() >= self.max_bytes
+        return False
+
+    def doRollover(self) -> None:
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        now = time.time()
+        if os.path.exists(self.baseFilename) and os.path.getsize(self.baseFilename) > 0:
+            # Fixed-width sequence so segments of the same second sort in order.
+            stamp = time.strftime('%Y%m%d-%H%M%S', time.localtime(now))
+            sequence = 0
+            segment = f"{self.baseFilename}.{stamp}-{sequence:03d}"
+            while os.path.exists(segment) or os.path.exists(f"{segment}.gz"):
+                sequence += 1
+                segment = f"{self.baseFilename}.{stamp}-{sequence:03d}"
+            os.replace(self.baseFilename, segment)
+            self._pending.put(segment)
+        self._rollover_at = _next_boundary(self.when, now)
+
+    def _compress_loop(self) -> None:
+        while True:
+            segment = self._pending.get()
+            if segment is _STOP:
+                return
+            if isinstance(segment, threading.Event):
+                segment.set()
+                continue
+            if not os.path.exists(segment):
+                continue  # Pruned before its turn came.
+            try:
+                self._compress(segment)
+                self._prune()
+            except OSError as e:
+                sys.stderr.write(f"--- Logging error ---\n無法壓縮 Log 檔 {segment}：{e}\n")
+
+    @staticmethod
+    def _compress(segment: str) -> None:
+        tmp_path = f"{segment}.gz.tmp"
+        with open(segment, "rb") as source, gzip.open(tmp_path, "wb") as target:
+            shutil.copyfileobj(source, target)
+        os.replace(tmp_path, f"{segment}.gz")
+        os.remove(segment)
+
+    def _prune(self) -> None:
+        """Delete the oldest segments beyond ``retention_bytes``, keeping the newest."""
+        if self.retention_bytes <= 0:
+            return
+        segments = [path for path in self._segments() if not path.endswith(".tmp")]
+        sizes = {path: os.path.getsize(path) for path in segments}
+        total = sum(sizes.values())
+        for path in segments[:-1]:
+            if total <= self.retention_bytes:
+                break
+            os.remove(path)
+            total -= sizes[path]
+
+    def close(self) -> None:
+        """Close the file and wait for pending compression to finish."""
+        super().close()
+        if self._compressor.is_alive():
+            self._pending.put(_STOP)
+            self._compressor.join()
+
+    def wait_for_compression(self, timeout: Optional[float] = None) -> bool:
+        """Block until the segments rotated so far are compressed.
+
+        Returns:
+            bool: False if ``timeout`` expired first
+        """
+        done = threading.Event()
+        self._pending.put(done)
+        return done.wait(timeout)
@@ -2,10 +2,23 @@
 Logging configuration module.
 """
 
+import atexit
+import functools
+import json
 import logging
 import platform
-from typing import Optional
+import os
+import queue
+import re
+import sys
+import threading
+import time
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from pttautosign.utils import log_context
 from pttautosign.utils.config import LogConfig
+from pttautosign.utils.log_file import CompressingRotatingFileHandler
 
 # Add TRACE level
 TRACE = 5
@@ -19,6 +32,291 @@ def trace(self, message, *args, **kwargs):
 # Add method to Logger class
 logging.Logger.trace = trace
 
+# Listener thread of the queue-based mode (``LogConfig.async_logging``); None
+# while logging is synchronous.
+_listener: Optional[QueueListener] = None
+
+# Rate limiter of the console output (``LogConfig.rate_limit_burst``); None
+# while rate limiting is off.
+_rate_limiter: Optional["RateLimitFilter"] = None
+
+# File sink (``LogConfig.log_file``); None without one.
+_file_handler: Optional[CompressingRotatingFileHandler] = None
+
+# Failed accounts listed by name in a batch summary; the rest are counted.
+MAX_LISTED_ACCOUNTS = 20
+
+def shutdown_logging() -> None:
+    """Write out every queued record and stop the listener thread.
+
+    Pending "suppressed" summaries of the rate limiter are logged first.
+    Registered with ``atexit`` (ahead of ``logging.shutdown``, which then
+    flushes the console handler); safe to call when logging is synchronous.
+    """
+    global _listener
+    if _rate_limiter is not None:
+        _rate_limiter.flush()
+    if _listener is not None:
+        # stop() enqueues a sentinel and joins the thread, so records queued
+        # before it are still written.
+        _listener.stop()
+        _listener = None
+
+atexit.register(shutdown_logging)
+
+# Attributes every LogRecord has; anything else was passed via ``extra=`` and
+# is copied into JSON output.
+_RECORD_ATTRS = frozenset(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+class ContextFilter(logging.Filter):
+    """Stamp records with the caller's run/attempt context.
+
+    Runs in the logging thread itself (handler filters do), so the context is
+    captured before a queue hands the record to the listener thread.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if "_log_context" in record.__dict__:  # stamped for another handler
+            return True
+        context = log_context.current()
+        record._log_context = context
+        record._elapsed_ms = round(context.elapsed_ms, 1)
+        return True
+
+class RateLimitFilter(logging.Filter):
+    """Let through at most ``burst`` records per template in each ``window``.
+
+    Messages are f-strings, so a record's template is its call site: logger,
+    line and level. Records beyond the burst are dropped and counted; once
+    the template's window is over a summary record ("已略過 N 筆類似 Log")
+    goes out in their place, and :meth:`flush` writes any summaries still
+    pending at exit.
+    """
+
+    def __init__(self, burst: int, window: float, clock: Callable[[], float] = time.monotonic):
+        """Initialize the filter.
+
+        Args:
+            burst: Records let through per template and window
+            window: Window length in seconds
+            clock: Monotonic clock (injectable for tests)
+        """
+        super().__init__()
+        self.burst = burst
+        self.window = window
+        self._clock = clock
+        self._lock = threading.Lock()
+        # template -> [window start, records in window, suppressed in window]
+        self._windows: Dict[Tuple[str, int, int], list] = {}
+        self._next_sweep = float("inf")
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, "_rate_limit_summary", False):
+            return True
+        decided = record.__dict__.get("_rate_limited")
+        if decided is not None:  # counted for another handler already
+            return not decided
+        now = self._clock()
+        key = (record.name, record.lineno, record.levelno)
+        with self._lock:
+            summaries = self._sweep(now) if now >= self._next_sweep else []
+            state = self._windows.get(key)
+            if state is None or now - state[0] >= self.window:
+                state = self._windows[key] = [now, 0, 0]
+            state[1] += 1
+            allowed = state[1] <= self.burst
+            if not allowed:
+                state[2] += 1
+                self._next_sweep = min(self._next_sweep, state[0] + self.window)
+        record._rate_limited = not allowed
+        self._emit(summaries)
+        return allowed
+
+    def _sweep(self, now: float) -> List[Tuple[Tuple[str, int, int], int]]:
+        """Collect and reset the counts of finished windows (caller holds ``_lock``)."""
+        summaries = []
+        self._next_sweep = float("inf")
+        for key, state in list(self._windows.items()):
+            if now - state[0] >= self.window:
+                if state[2]:
+                    summaries.append((key, state[2]))
+                del self._windows[key]
+            elif state[2]:
+                self._next_sweep = min(self._next_sweep, state[0] + self.window)
+        return summaries
+
+    def _emit(self, summaries: List[Tuple[Tuple[str, int, int], int]]) -> None:
+        for (name, lineno, levelno), count in summaries:
+            logging.getLogger(name).log(
+                levelno,
+                f"已略過 {count} 筆類似 Log（第 {lineno} 行，{self.window:g} 秒內超過 {self.burst} 筆）",
+                extra={"_rate_limit_summary": True, "event": "log_suppressed", "suppressed": count},
+            )
+
+    def flush(self) -> None:
+        """Log the summaries of every window that suppressed records."""
+        with self._lock:
+            summaries = [(key, state[2]) for key, state in self._windows.items() if state[2]]
+            self._windows.clear()
+            self._next_sweep = float("inf")
+        self._emit(summaries)
+
+def format_accounts(accounts: List[str], limit: int = MAX_LISTED_ACCOUNTS) -> str:
+    """Comma-separated ``accounts``, the ones beyond ``limit`` only counted."""
+    listed = ", ".join(accounts[:limit])
+    if len(accounts) > limit:
+        return f"{listed} 等 {len(accounts)} 個帳號"
+    return listed
+
+def _json_dumps() -> Callable[[Dict[str, Any]], str]:
+    """Compact JSON serializer: orjson when installed, else the json module."""
+    def dumps(entry: Dict[str, Any]) -> str:
+        return json.dumps(entry, ensure_ascii=False, separators=(",", ":"), default=str)
+
+    try:
+        import orjson
+    except ImportError:
+        return dumps
+
+    def fast_dumps(entry: Dict[str, Any]) -> str:
+        try:
+            return orjson.dumps(entry, default=str).decode("utf-8")
+        except TypeError:  # e.g. integers beyond 64 bits
+            return dumps(entry)
+
+    return fast_dumps
+
+@functools.lru_cache(maxsize=1024)
+def _username_pattern(username: str) -> "re.Pattern[str]":
+    """Matches ``username`` as a whole PTT ID, not inside a longer word."""
+    return re.compile(rf"(?<![A-Za-z0-9_-]){re.escape(username)}(?![A-Za-z0-9_-])")
+
+class JsonFormatter(logging.Formatter):
+    """One compact JSON object per record, without colors (``LOG_FORMAT=json``).
+
+    Fields: ``ts``, ``level``, ``logger``, ``msg``, ``run_id``,
+    ``elapsed_ms`` and, inside a login attempt, ``account`` (a pseudonym from
+    :func:`~pttautosign.utils.log_context.account_id`, which also replaces the
+    username in ``msg``), ``attempt`` and ``phase``. ``extra=`` fields are
+    copied as-is, except underscore-prefixed ones; ``_accounts`` lists further
+    usernames to redact from ``msg``. Needs :class:`ContextFilter` on the
+    handler.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._dumps = _json_dumps()
+
+    def format(self, record: logging.LogRecord) -> str:
+        context = getattr(record, "_log_context", None) or log_context.current()
+        message = record.getMessage()
+        if record.exc_info:
+            message = f"{message}\n{self.formatException(record.exc_info)}"
+
+        entry: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created).astimezone().isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": message,
+            "run_id": log_context.run_id(),
+            "elapsed_ms": getattr(record, "_elapsed_ms", None),
+        }
+        if context.account:
+            entry["account"] = log_context.account_id(context.account)
+        # Usernames in the message: the attempt's own and any listed by the
+        # caller via ``extra={"_accounts": [...]}``.
+        for username in filter(None, (context.account, *getattr(record, "_accounts", ()))):
+            message = _username_pattern(username).sub(log_context.account_id(username), message)
+        entry["msg"] = message
+        if context.attempt is not None:
+            entry["attempt"] = context.attempt
+        if context.phase:
+            entry["phase"] = context.phase
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        return self._dumps(entry)
+
+# ANSI color codes for the level names of the console output
+COLORS = {
+    'DEBUG': '\033[36m',     # Cyan
+    'INFO': '\033[32m',      # Green
+    'WARNING': '\033[33m',   # Yellow
+    'ERROR': '\033[31m',     # Red
+    'CRITICAL': '\033[41m',  # Red background
+    'TRACE': '\033[35m',     # Magenta
+    'RESET': '\033[0m',      # Reset to default
+}
+
+def _use_color(stream) -> bool:
+    """Whether to colorize output to ``stream``: a TTY, unless ``NO_COLOR`` is set."""
+    if os.environ.get("NO_COLOR"):
+        return False
+    isatty = getattr(stream, "isatty", None)
+    try:
+        return bool(isatty and isatty())
+    except ValueError:  # closed stream
+        return False
+
+class ColorShortNameFormatter(logging.Formatter):
+    """Shortens logger names to their last two parts and colors level names.
+
+    Shortened names, colored level names and the timestamp of the current
+    second are rendered once and cached, so formatting a record does no
+    string splitting or joining.
+    """
+
+    def __init__(self, fmt=None, datefmt=None, use_color: bool = True):
+        super().__init__(fmt, datefmt)
+        self.use_color = use_color
+        self._names: Dict[str, str] = {}
+        self._levelnames: Dict[str, str] = {}
+        self._time_cache: Tuple[int, str] = (-1, "")
+
+    def _short_name(self, name: str) -> str:
+        short = self._names.get(name)
+        if short is None:
+            parts = name.split('.')
+            # For deeply nested modules, show only the last two parts
+            short = self._names[name] = '.'.join(parts[-2:]) if len(parts) > 2 else name
+        return short
+
+    def _levelname(self, levelname: str) -> str:
+        rendered = self._levelnames.get(levelname)
+        if rendered is None:
+            if self.use_color and levelname in COLORS:
+                rendered = f"{COLORS[levelname]}{levelname}{COLORS['RESET']}"
+            else:
+                rendered = levelname
+            self._levelnames[levelname] = rendered
+        return rendered
+
+    def formatTime(self, record, datefmt=None):
+        if datefmt is None:
+            # The default format appends milliseconds; nothing to cache.
+            return super().formatTime(record, datefmt)
+        second = int(record.created)
+        # One tuple, swapped atomically, so threads never mix second and text.
+        cached_second, text = self._time_cache
+        if cached_second != second:
+            text = time.strftime(datefmt, self.converter(record.created))
+            self._time_cache = (second, text)
+        return text
+
+    def format(self, record):
+        # LogRecord is shared across handlers/formatters, so any field we
+        # change must be restored afterwards (the original code leaked the
+        # shortened name onto the record). Save → mutate → format → restore.
+        original_name = record.name
+        original_levelname = record.levelname
+        record.name = self._short_name(original_name)
+        record.levelname = self._levelname(original_levelname)
+        try:
+            return super().format(record)
+        finally:
+            record.name = original_name
+            record.levelname = original_levelname
+
 def setup_logging(config: Optional[LogConfig] = None) -> logging.Logger:
     """Setup logging configuration
     
@@ -28,65 +326,83 @@ def setup_logging(config: Optional[LogConfig] = None) -> logging.Logger:
     Returns:
         logging.Logger: Configured logger instance
     """
+    global _listener, _rate_limiter, _file_handler
     if config is None:
         config = LogConfig()
 
-    # Configure logging format
-    # Define ANSI color codes for different log levels
-    COLORS = {
-        'DEBUG': '\033[36m',     # Cyan
-        'INFO': '\033[32m',      # Green
-        'WARNING': '\033[33m',   # Yellow
-        'ERROR': '\033[31m',     # Red
-        'CRITICAL': '\033[41m',  # Red background
-        'TRACE': '\033[35m',     # Magenta
-        'RESET': '\033[0m',      # Reset to default
-    }
-    
     # Use a more consistent format with shorter module name
     log_format = config.log_format
     
-    # Create a custom formatter that shortens the logger name and adds colors
-    class ColorShortNameFormatter(logging.Formatter):
-        def format(self, record):
-            # LogRecord is shared across handlers/formatters, so any field we
-            # change must be restored afterwards (the original code leaked the
-            # shortened name onto the record). Save → mutate → format → restore.
-            original_name = record.name
-            original_levelname = record.levelname
-            try:
-                parts = original_name.split('.')
-                if len(parts) > 2:
-                    # For deeply nested modules, show only the last two parts
-                    record.name = '.'.join(parts[-2:])
-
-                if original_levelname in COLORS:
-                    record.levelname = (
-                        f"{COLORS[original_levelname]}{original_levelname}{COLORS['RESET']}"
-                    )
-
-                return super().format(record)
-            finally:
-                record.name = original_name
-                record.levelname = original_levelname
-    
-    log_formatter = ColorShortNameFormatter(log_format, datefmt="%Y-%m-%d %H:%M:%S")
+    if config.json_format:
+        log_formatter: logging.Formatter = JsonFormatter()
+    else:
+        log_formatter = ColorShortNameFormatter(
+            log_format, datefmt="%Y-%m-%d %H:%M:%S", use_color=_use_color(sys.stderr)
+        )
 
     # Setup console handler
-    console_handler = logging.StreamHandler()
+    console_handler = logging.StreamHandler(sys.stderr)
     console_handler.setFormatter(log_formatter)
     console_handler.setLevel(config.log_level)
 
     # Setup root logger
     root_logger = logging.getLogger()
     root_logger.setLevel(config.log_level)
+
+    # Drain the previous listener (if any) before its handler is replaced.
+    shutdown_logging()
     
     # Remove existing handlers to avoid duplicates
     for handler in root_logger.handlers[:]:
         root_logger.removeHandler(handler)
+    if _file_handler is not None:
+        _file_handler.close()
+        _file_handler = None
+
+    handlers: List[logging.Handler] = [console_handler]
+    if config.log_file:
+        _file_handler = CompressingRotatingFileHandler(
+            config.log_file,
+            max_bytes=config.log_file_max_bytes,
+            when=config.log_file_when,
+            retention_bytes=config.log_file_retention_bytes,
+        )
+        _file_handler.setFormatter(
+            JsonFormatter() if config.json_format
+            else ColorShortNameFormatter(log_format, datefmt="%Y-%m-%d %H:%M:%S", use_color=False)
+        )
+        _file_handler.setLevel(config.log_level)
+        handlers.append(_file_handler)
+
+    _rate_limiter = (
+        RateLimitFilter(config.rate_limit_burst, config.rate_limit_window)
+        if config.rate_limit_burst > 0 else None
+    )
     
-    # Add console handler only
-    root_logger.addHandler(console_handler)
+    if config.async_logging:
+        # Loggers only put records on an unbounded, lock-free SimpleQueue; a
+        # single listener thread formats and writes them, so a slow consumer
+        # of the console pipe never blocks the login workers.
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        queue_handler = QueueHandler(log_queue)
+        # Filters run in the logging thread: drop excess records before
+        # they are queued and capture the caller's context.
+        if _rate_limiter is not None:
+            queue_handler.addFilter(_rate_limiter)
+        if config.json_format:
+            queue_handler.addFilter(ContextFilter())
+        root_logger.addHandler(queue_handler)
+        _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+    else:
+        context_filter = ContextFilter()
+        for handler in handlers:
+            # Shared filters decide once per record, whichever handler sees it first.
+            if _rate_limiter is not None:
+                handler.addFilter(_rate_limiter)
+            if config.json_format:
+                handler.addFilter(context_filter)
+            root_logger.addHandler(handler)
     
     # Set PyPtt logger to a higher level to suppress its logs
     logging.getLogger('PyPtt').setLevel(logging.ERROR)
@@ -101,7 +417,10 @@ def setup_logging(config: Optional[LogConfig] = None) -> logging.Logger:
     
     # Log system information
     logger = logging.getLogger(__name__)
-    logger.debug(f"Logging initialized: level={logging.getLevelName(config.log_level)}")
+    logger.debug(
+        f"Logging initialized: level={logging.getLevelName(config.log_level)}, "
+        f"mode={'async' if config.async_logging else 'sync'}, file={config.log_file or '-'}"
+    )
     logger.debug(f"System: {platform.system()} {platform.release()}, Python: {platform.python_version()}")
 
     return logger
@@ -0,0 +1,141 @@
+"""
+Latency instrumentation for login attempts and batches.
+"""
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional
+
+from pttautosign.utils import log_context
+
+# Phases of a login attempt, in the order they happen.
+PHASES = ("init", "connect", "auth", "get_user", "logout", "notify")
+
+
+class PhaseTimer:
+    """Monotonic stopwatch for the phases of one login attempt."""
+
+    def __init__(self):
+        """Initialize an empty timer."""
+        self.phases: Dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time the ``with`` block and add it to ``name`` (milliseconds).
+
+        Records logged inside the block carry ``name`` as their phase.
+        """
+        start = time.perf_counter()
+        try:
+            with log_context.phase(name):
+                yield
+        finally:
+            self.add(name, (time.perf_counter() - start) * 1000)
+
+    def add(self, name: str, elapsed_ms: float) -> None:
+        """Add ``elapsed_ms`` to phase ``name``."""
+        self.phases[name] = self.phases.get(name, 0.0) + elapsed_ms
+
+    @property
+    def total_ms(self) -> float:
+        """Sum of all recorded phases."""
+        return sum(self.phases.values())
+
+
+@dataclass
+class AttemptTiming:
+    """Phase timings of a single login attempt."""
+    account: str
+    attempt: int
+    outcome: str
+    phases: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def total_ms(self) -> float:
+        """Sum of all phases of this attempt."""
+        return sum(self.phases.values())
+
+
+class LatencyHistogram:
+    """Collects latency samples (milliseconds) and reports percentiles."""
+
+    def __init__(self):
+        """Initialize an empty histogram."""
+        self._samples: List[float] = []
+        self._sorted = True
+
+    def add(self, value_ms: float) -> None:
+        """Add one sample."""
+        self._samples.append(value_ms)
+        self._sorted = False
+
+    @property
+    def count(self) -> int:
+        """Number of samples."""
+        return len(self._samples)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Nearest-rank percentile, or None when empty."""
+        if not self._samples:
+            return None
+        if not self._sorted:
+            self._samples.sort()
+            self._sorted = True
+        rank = max(1, math.ceil(pct / 100 * len(self._samples)))
+        return self._samples[rank - 1]
+
+    def summary(self) -> Dict[str, float]:
+        """Count, p50/p95/p99 and max of the samples."""
+        if not self._samples:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": self.percentile(100),
+        }
+
+
+class BatchResult(Dict[str, bool]):
+    """Result of ``batch_login``: username -> success, plus timings.
+
+    Behaves exactly like the plain ``dict`` returned before, so existing
+    callers are unaffected; the timing data is available on top of it.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """Initialize like a ``dict``."""
+        super().__init__(*args, **kwargs)
+        self.attempts: List[AttemptTiming] = []
+        self.elapsed_ms: float = 0.0
+        self._lock = threading.Lock()
+
+    def record_attempt(self, timing: AttemptTiming) -> None:
+        """Store one attempt's timings (thread-safe)."""
+        with self._lock:
+            self.attempts.append(timing)
+
+    def histograms(self) -> Dict[str, LatencyHistogram]:
+        """Per-phase histograms over every attempt, plus ``attempt`` totals."""
+        histograms: Dict[str, LatencyHistogram] = {}
+        with self._lock:
+            attempts = list(self.attempts)
+        for timing in attempts:
+            for name, elapsed in timing.phases.items():
+                histograms.setdefault(name, LatencyHistogram()).add(elapsed)
+            histograms.setdefault("attempt", LatencyHistogram()).add(timing.total_ms)
+        ordered = {name: histograms[name] for name in PHASES if name in histograms}
+        ordered.update({name: h for name, h in histograms.items() if name not in ordered})
+        return ordered
+
+    def account_totals(self) -> Dict[str, float]:
+        """Total time (milliseconds) spent on each account across attempts."""
+        totals: Dict[str, float] = {}
+        with self._lock:
+            for timing in self.attempts:
+                totals[timing.account] = totals.get(timing.account, 0.0) + timing.total_ms
+        return totals
@@ -0,0 +1,107 @@
+"""
+Persistent outbox for notifications that could not be delivered.
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+
+def message_key(text: str, parse_mode: str = "html") -> str:
+    """Deduplication key of a message: identical messages share one entry."""
+    return hashlib.sha256(f"{parse_mode}\0{text}".encode("utf-8")).hexdigest()
+
+
+class NotificationOutbox:
+    """Stores undelivered notifications in SQLite until they are sent.
+
+    ``TelegramBot`` adds a message here once it has exhausted its retries
+    (e.g. during a Telegram outage) and replays the outbox, oldest first, at
+    the start of the next run, so login results are not lost with the
+    process. Messages are keyed by :func:`message_key`; storing the same
+    message twice keeps one entry.
+
+    Outbox errors are logged and swallowed, like the sign-in ledger's.
+    """
+
+    def __init__(self, path: str):
+        """Initialize the outbox.
+
+        Args:
+            path: SQLite database file (parent directories are created)
+        """
+        self.path = path
+        self.logger = logging.getLogger(__name__)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Open the database on first use (caller holds ``_lock``)."""
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS outbox ("
+                " key TEXT PRIMARY KEY,"
+                " text TEXT NOT NULL,"
+                " parse_mode TEXT NOT NULL,"
+                " created_at TEXT NOT NULL)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def add(self, text: str, parse_mode: str = "html") -> bool:
+        """Store a message for later delivery.
+
+        Returns:
+            bool: True if the message was stored, False if it was already
+            there (or could not be written)
+        """
+        try:
+            with self._lock:
+                conn = self._connection()
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO outbox (key, text, parse_mode, created_at) VALUES (?, ?, ?, ?)",
+                    (message_key(text, parse_mode), text, parse_mode, datetime.now().isoformat(timespec="seconds")),
+                )
+                conn.commit()
+                return cursor.rowcount == 1
+        except (sqlite3.Error, OSError) as e:
+            self.logger.warning(f"無法寫入通知待發送區：{e}")
+            return False
+
+    def pending(self) -> List[Tuple[str, str, str]]:
+        """Stored messages as ``(key, text, parse_mode)``, oldest first."""
+        try:
+            with self._lock:
+                return self._connection().execute(
+                    "SELECT key, text, parse_mode FROM outbox ORDER BY created_at, rowid"
+                ).fetchall()
+        except (sqlite3.Error, OSError) as e:
+            self.logger.warning(f"無法讀取通知待發送區：{e}")
+            return []
+
+    def remove(self, key: str) -> None:
+        """Delete a delivered message."""
+        try:
+            with self._lock:
+                conn = self._connection()
+                conn.execute("DELETE FROM outbox WHERE key = ?", (key,))
+                conn.commit()
+        except (sqlite3.Error, OSError) as e:
+            self.logger.warning(f"無法更新通知待發送區：{e}")
+
+    def close(self) -> None:
+        """Close the database connection, if open."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,369 @@
+"""
+Process-isolated login engine with hard per-attempt deadlines.
+"""
+
+import functools
+import importlib
+import logging
+import multiprocessing
+import pickle
+import threading
+import time
+from typing import Any, Dict, List, Set, Tuple
+
+from pttautosign.utils import log_context
+from pttautosign.utils.config import PTTConfig
+from pttautosign.utils.interfaces import NotificationService
+from pttautosign.utils.metrics import BatchResult, PhaseTimer
+from pttautosign.utils.ptt import PTTAutoSign
+
+# Seconds a retiring worker gets to exit on its own before it is killed.
+_WORKER_EXIT_GRACE = 2.0
+
+
+def _picklable(value: Any) -> bool:
+    try:
+        pickle.dumps(value)
+        return True
+    except Exception:
+        return False
+
+
+def _describe_exception(error: Exception, secret: str) -> Tuple[str, str, tuple, Dict[str, Any], str]:
+    """Turn ``error`` into plain data that can cross the process boundary.
+
+    PyPtt exceptions cannot always be pickled (their ``__init__`` needs i18n
+    state), so the class path, ``args`` and instance attributes are sent and
+    the exception is rebuilt with ``__new__`` on the other side.
+    """
+    try:
+        text = str(error)
+    except Exception:
+        text = type(error).__name__
+    state = {key: value for key, value in vars(error).items() if _picklable(value)}
+    args = tuple(arg for arg in error.args if _picklable(arg))
+    return type(error).__module__, type(error).__qualname__, args, state, text.replace(secret, "***")
+
+
+def _rebuild_exception(description: Tuple[str, str, tuple, Dict[str, Any], str]) -> Exception:
+    """Inverse of :func:`_describe_exception`."""
+    module, qualname, args, state, text = description
+    try:
+        cls = functools.reduce(getattr, qualname.split("."), importlib.import_module(module))
+        if not (isinstance(cls, type) and issubclass(cls, Exception)):
+            raise TypeError(qualname)
+        error = cls.__new__(cls)
+        error.args = args
+        error.__dict__.update(state)
+        return error
+    except Exception:
+        return RuntimeError(f"{qualname}: {text}")
+
+
+def _worker_main(conn, config: PTTConfig, disable_notifications: bool, log_level: int, run_id: str) -> None:
+    """Worker process: run login sessions sent over ``conn`` until told to stop.
+
+    Each request is ``(ptt_id, ptt_passwd, send_notification)``; the reply is
+    ``("ok", user_info, phases)`` or ``("error", exception_description, phases)``.
+    ``None`` (or a closed pipe) ends the worker.
+    """
+    from dataclasses import replace
+
+    from pttautosign.patches.pyptt_patch import apply_patches
+    from pttautosign.utils.config import LogConfig
+    from pttautosign.utils.logger import setup_logging
+
+    # Same output format as the parent (the environment is inherited), at the
+    # parent's effective level and under its run id. The log file stays the
+    # parent's alone: several processes rotating one file would race.
+    log_context.set_run_id(run_id)
+    setup_logging(replace(LogConfig.from_env(), log_level=log_level, log_file=""))
+    apply_patches()
+    # Only the session half of the service runs here; notifications, retries
+    # and the ledger stay in the parent process.
+    session = PTTAutoSign(None, config, disable_notifications)
+
+    while True:
+        try:
+            task = conn.recv()
+        except (EOFError, OSError):
+            return
+        if task is None:
+            return
+
+        ptt_id, ptt_passwd, send_notification = task
+        timer = PhaseTimer()
+        try:
+            with log_context.attempt(ptt_id):
+                user_info = session._run_session(ptt_id, ptt_passwd, send_notification, timer)
+            reply = ("ok", user_info, timer.phases)
+        except Exception as e:
+            reply = ("error", _describe_exception(e, ptt_passwd), timer.phases)
+        conn.send(reply)
+
+
+class _Worker:
+    """One worker process and the parent end of its pipe."""
+
+    def __init__(self, process, conn):
+        self.process = process
+        self.conn = conn
+        self.logins = 0
+
+    def stop(self, grace: float = _WORKER_EXIT_GRACE) -> None:
+        """Ask the process to exit; kill it if it does not within ``grace``."""
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(grace)
+        if self.process.is_alive():
+            self.kill()
+        self.conn.close()
+
+    def kill(self) -> None:
+        """Kill the process immediately."""
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class LoginWorkerPool:
+    """Pool of login worker processes with hard deadlines.
+
+    At most ``size`` workers exist; a caller waits for an idle one. A worker
+    that misses its deadline (or dies) is killed and replaced on demand, and a
+    healthy worker is retired after ``max_logins`` sessions so memory held by
+    PyPtt is returned to the OS. Workers are started with the ``spawn`` method:
+    the parent runs threads, which makes ``fork`` unsafe.
+    """
+
+    def __init__(self, size: int, max_logins: int, config: PTTConfig, disable_notifications: bool = False):
+        """Initialize the pool; workers are started lazily.
+
+        Args:
+            size: Maximum number of worker processes
+            max_logins: Sessions a worker runs before it is replaced
+            config: PTT configuration for the workers
+            disable_notifications: Passed to the workers' session handler
+        """
+        self.size = size
+        self.max_logins = max_logins
+        self.config = config
+        self.disable_notifications = disable_notifications
+        self.logger = logging.getLogger(__name__)
+        self.spawned = 0
+        self.killed = 0
+        self.recycled = 0
+        self._context = multiprocessing.get_context("spawn")
+        self._idle: List[_Worker] = []
+        self._busy: Set[_Worker] = set()
+        self._count = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    @property
+    def closed(self) -> bool:
+        """Whether :meth:`close` was called."""
+        return self._closed
+
+    def worker_pids(self) -> List[int]:
+        """PIDs of the live worker processes."""
+        with self._cond:
+            return [worker.process.pid for worker in [*self._idle, *self._busy]]
+
+    def _spawn(self) -> _Worker:
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(
+                child_conn,
+                self.config,
+                self.disable_notifications,
+                logging.getLogger().getEffectiveLevel(),
+                log_context.run_id(),
+            ),
+            name="ptt-login-worker",
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        self.spawned += 1
+        self.logger.debug(f"已啟動登入工作程序 {process.pid}")
+        return _Worker(process, parent_conn)
+
+    def _acquire(self) -> _Worker:
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Login worker pool is closed")
+                if self._idle:
+                    worker = self._idle.pop()
+                    self._busy.add(worker)
+                    return worker
+                if self._count < self.size:
+                    self._count += 1
+                    break
+                self._cond.wait()
+        try:
+            worker = self._spawn()
+        except Exception:
+            with self._cond:
+                self._count -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._busy.add(worker)
+        return worker
+
+    def _release(self, worker: _Worker, healthy: bool) -> None:
+        with self._cond:
+            self._busy.discard(worker)
+            keep = healthy and not self._closed and worker.logins < self.max_logins
+            if keep:
+                self._idle.append(worker)
+            else:
+                self._count -= 1
+            self._cond.notify()
+        if keep:
+            return
+        if not healthy:
+            worker.kill()
+            return
+        if worker.logins >= self.max_logins:
+            self.recycled += 1
+            self.logger.debug(f"登入工作程序 {worker.process.pid} 已處理 {worker.logins} 次登入，回收")
+        worker.stop()
+
+    def run(self, ptt_id: str, ptt_passwd: str, send_notification: bool, timeout: float) -> Tuple[str, Any, Dict[str, float]]:
+        """Run one login session in a worker, killing it after ``timeout`` seconds.
+
+        Returns:
+            Tuple[str, Any, Dict[str, float]]: The worker's reply (see
+            :func:`_worker_main`)
+
+        Raises:
+            TimeoutError: If the session missed its deadline (the worker is killed)
+            RuntimeError: If the worker died or the pool was closed
+        """
+        worker = self._acquire()
+        healthy = False
+        try:
+            worker.conn.send((ptt_id, ptt_passwd, send_notification))
+            if not worker.conn.poll(timeout):
+                self.killed += 1
+                self.logger.warning(f"帳號 {ptt_id} 登入超過 {timeout} 秒，終止登入工作程序 {worker.process.pid}")
+                raise TimeoutError(f"登入超過 {timeout} 秒未完成")
+            reply = worker.conn.recv()
+            worker.logins += 1
+            healthy = True
+            return reply
+        except (EOFError, OSError) as e:
+            raise RuntimeError(f"登入工作程序 {worker.process.pid} 異常結束") from e
+        finally:
+            self._release(worker, healthy)
+
+    def close(self) -> None:
+        """Stop idle workers and kill busy ones; the pool cannot be reused."""
+        with self._cond:
+            self._closed = True
+            idle, busy = self._idle, list(self._busy)
+            self._idle = []
+            self._cond.notify_all()
+        for worker in idle:
+            worker.stop()
+        for worker in busy:
+            # The caller blocked in run() sees the closed pipe and fails fast.
+            worker.process.kill()
+
+
+class ProcessLoginService(PTTAutoSign):
+    """PTT auto sign-in handler that isolates every session in a worker process.
+
+    Batching, retries, rate limiting, notifications and the ledger work exactly
+    as in the thread engine; only the PyPtt session itself (``_run_session``)
+    runs in a pooled child process. Each attempt must finish within
+    ``connection_timeout`` seconds or its worker is killed, which frees the
+    socket and memory a hung PyPtt session would otherwise hold until exit.
+    Workers are replaced after ``worker_max_logins`` sessions.
+    """
+
+    def __init__(self, telegram_bot: NotificationService, config: PTTConfig | None = None, disable_notifications: bool = False):
+        """Initialize the handler; see :class:`PTTAutoSign`."""
+        super().__init__(telegram_bot, config, disable_notifications)
+        self.pool: LoginWorkerPool | None = None
+        self._pool_lock = threading.Lock()
+
+    def _worker_pool(self) -> LoginWorkerPool:
+        """The current pool, started on first use."""
+        with self._pool_lock:
+            if self.pool is None or self.pool.closed:
+                self.pool = LoginWorkerPool(
+                    self.config.max_concurrency,
+                    self.config.worker_max_logins,
+                    self.config,
+                    self.disable_notifications,
+                )
+            return self.pool
+
+    def _close_pool(self) -> None:
+        """Shut the worker processes down and log what happened to them."""
+        with self._pool_lock:
+            pool, self.pool = self.pool, None
+        if pool is None:
+            return
+        pool.close()
+        self.logger.info(
+            f"登入工作程序：啟動 {pool.spawned} 個，逾時終止 {pool.killed} 個，回收 {pool.recycled} 個"
+        )
+
+    def _run_session(
+        self,
+        ptt_id: str,
+        ptt_passwd: str,
+        send_notification: bool = True,
+        timer: PhaseTimer | None = None,
+    ) -> Dict[str, Any]:
+        """Run the session in a worker process under a hard deadline.
+
+        The worker's phase timings are merged into ``timer``; the remaining
+        time (waiting for a worker, IPC) is recorded as ``dispatch``.
+
+        Raises:
+            TimeoutError: If the worker missed the ``connection_timeout`` deadline
+            Exception: Whatever the session raised in the worker (rebuilt here)
+        """
+        timer = timer or PhaseTimer()
+        started = time.perf_counter()
+        try:
+            status, payload, phases = self._worker_pool().run(
+                ptt_id, ptt_passwd, send_notification, self.config.connection_timeout
+            )
+        finally:
+            timer.add("dispatch", (time.perf_counter() - started) * 1000)
+
+        for name, elapsed in phases.items():
+            timer.add(name, elapsed)
+        timer.add("dispatch", -sum(phases.values()))
+
+        if status == "error":
+            raise _rebuild_exception(payload)
+        return payload
+
+    def login(self, ptt_id: str, ptt_passwd: str, send_notification: bool = True) -> bool:
+        """Perform login with retries, then stop the worker processes."""
+        try:
+            return super().login(ptt_id, ptt_passwd, send_notification)
+        finally:
+            self._close_pool()
+
+    def batch_login(self, accounts: List[Tuple[str, str]], force: bool = False) -> BatchResult:
+        """Batch login as in the thread engine, then stop the worker processes.
+
+        Closing the pool also kills workers still running after a batch
+        timeout, so no hung session outlives the batch.
+        """
+        try:
+            return super().batch_login(accounts, force)
+        finally:
+            self._close_pool()
@@ -5,14 +5,22 @@ PTT auto sign-in module for handling PTT login operations.
 import re
 import time
 import logging
+import threading
 import traceback
 import concurrent.futures
+from contextlib import nullcontext
 from datetime import datetime, timezone, timedelta
 from typing import Dict, Any, Tuple, List
 from PyPtt import PTT
 from PyPtt import exceptions as PTT_exceptions
+from pttautosign.utils.concurrency import AIMDController
 from pttautosign.utils.config import PTTConfig
+from pttautosign.utils import log_context
 from pttautosign.utils.interfaces import LoginService, NotificationService
+from pttautosign.utils.ledger import SignInLedger
+from pttautosign.utils.metrics import AttemptTiming, BatchResult, PhaseTimer
+from pttautosign.utils.rate_limit import TokenBucket
+from pttautosign.utils.scheduler import RetryScheduler
 
 # Upper bound for the exponential retry backoff so a misconfigured
 # ``ptt_retry_delay`` / ``ptt_max_retries`` cannot produce multi-minute sleeps.
@@ -21,6 +29,16 @@ MAX_BACKOFF_SECONDS = 60
 # Matches PTT's English "You have N new mails" status line.
 _NEW_MAIL_RE = re.compile(r"(\d+)\s+new mails", re.IGNORECASE)
 
+# New-mail hint shown in the title bar of PTT's main menu after login.
+_NEW_MAIL_HINT = "新信件"
+
+# ``PTTConfig.host`` names understood by PyPtt.
+_PTT_HOSTS = {
+    "ptt1": PTT.data_type.HOST.PTT1,
+    "ptt2": PTT.data_type.HOST.PTT2,
+    "localhost": PTT.data_type.HOST.LOCALHOST,
+}
+
 
 class PTTAutoSign(LoginService):
     """PTT auto sign-in handler class"""
@@ -39,6 +57,23 @@ class PTTAutoSign(LoginService):
         self.logger = logging.getLogger(__name__)
         self.max_retries = self.config.max_retries
         self.disable_notifications = disable_notifications
+        # Adaptive concurrency window, shared by every login of this service.
+        self.concurrency: AIMDController | None = None
+        if self.config.adaptive_concurrency:
+            self.concurrency = AIMDController(
+                initial=self.config.min_concurrency,
+                minimum=self.config.min_concurrency,
+                maximum=self.config.max_concurrency,
+            )
+        # Connection-attempt throttle; every account and every retry of this
+        # service goes through it (the factory keeps one service per process).
+        self.rate_limiter: TokenBucket | None = None
+        if self.config.login_rate > 0:
+            self.rate_limiter = TokenBucket(self.config.login_rate, self.config.login_burst)
+        # Daily sign-in ledger, so reruns skip accounts already signed in.
+        self.ledger: SignInLedger | None = None
+        if self.config.ledger_path:
+            self.ledger = SignInLedger(self.config.ledger_path, self.tz)
 
     def _format_success_message(self, ptt_id: str, user_info: Dict[str, Any]) -> str:
         """Format successful login message
@@ -62,12 +97,14 @@ class PTTAutoSign(LoginService):
             if match:
                 mail_msg = f'您有 {match.group(1)} 封新信件'
 
-        return (
-            f"✅ PTT {ptt_id} 登入成功\n"
-            f"📆 登入天數: {user_info.get('login_count')} 天\n"
-            f"📫 {mail_msg}\n"
-            f"#ptt #{now.strftime('%Y%m%d')}"
-        )
+        # Lean logins (no get_user) may lack either field; omit those lines.
+        lines = [f"✅ PTT {ptt_id} 登入成功"]
+        if user_info.get('login_count') is not None:
+            lines.append(f"📆 登入天數: {user_info.get('login_count')} 天")
+        if mail_msg:
+            lines.append(f"📫 {mail_msg}")
+        lines.append(f"#ptt #{now.strftime('%Y%m%d')}")
+        return "\n".join(lines)
     
     def _format_error_message(self, ptt_id: str, error: Exception) -> str:
         """Format error message
@@ -97,148 +134,465 @@ class PTTAutoSign(LoginService):
         except Exception as e:
             self.logger.warning(f"帳號 {ptt_id} 登出時發生錯誤：{e}")
 
-    def _notify(self, message: str, ptt_id: str, send_notification: bool) -> None:
+    def _notify(self, message: str, ptt_id: str, send_notification: bool, urgent: bool = False) -> None:
         """Send a notification, honouring the disable flags and surfacing failures.
 
         Args:
             message: Message body to send
             ptt_id: Account the notification relates to (for log context)
             send_notification: Per-call gate from the caller
+            urgent: Use the notifier's priority lane (login failures)
         """
-        if not send_notification or self.disable_notifications:
+        if not self._will_notify(send_notification):
             return
-        if not self.telegram.send_message(message):
+        send = self.telegram.send_urgent if urgent else self.telegram.send_message
+        if not send(message):
             self.logger.warning(f"帳號 {ptt_id} 的通知發送失敗")
 
-    def login(self, ptt_id: str, ptt_passwd: str, send_notification: bool = True) -> bool:
-        """Perform login with retries.
+    def _flush_notifications(self) -> None:
+        """Wait (up to the notifier's deadline) for queued notifications to go out."""
+        if self.disable_notifications:
+            return
+        if not self.telegram.flush():
+            self.logger.warning("部分通知未能在期限內送出")
+
+    def _is_retryable(self, error: Exception) -> bool:
+        """Whether ``error`` is a temporary PTT throttling error worth retrying."""
+        return isinstance(error, (PTT_exceptions.LoginTooOften, PTT_exceptions.UseTooManyResources))
+
+    def _is_throttle_signal(self, error: Exception) -> bool:
+        """Whether ``error`` means PTT wants us to slow down."""
+        return self._is_retryable(error) or isinstance(error, TimeoutError)
+
+    def _wait_for_login_token(self, ptt_id: str) -> None:
+        """Block until the shared rate limiter admits another login attempt.
+
+        Called with the concurrency slot already held: a token reserved while
+        still waiting for a slot would be spent late, together with others,
+        and connection starts would bunch up past ``login_burst``.
+        """
+        if not self.rate_limiter:
+            return
+        waited = self.rate_limiter.acquire()
+        if waited > 0:
+            self.logger.debug(f"帳號 {ptt_id} 等待登入速率限制 {waited:.2f} 秒")
+
+    def _concurrency_slot(self):
+        """Context manager holding an adaptive concurrency slot, if enabled."""
+        return self.concurrency.slot() if self.concurrency else nullcontext()
+
+    def _backoff(self, attempt: int) -> float:
+        """Capped exponential backoff (seconds) before retrying ``attempt``."""
+        return min(self.config.retry_delay * (2 ** attempt), MAX_BACKOFF_SECONDS)
+
+    def _will_notify(self, send_notification: bool) -> bool:
+        """Whether a per-account notification will actually be sent."""
+        return send_notification and not self.disable_notifications
+
+    def _api_kwargs(self) -> Dict[str, Any]:
+        """Keyword arguments for ``PTT.API``, honouring ``host``/``port``.
+
+        ``ptt1``, ``ptt2`` and ``localhost`` map to PyPtt's ``HOST`` values;
+        any other host is passed through as a websocket address.
+        """
+        kwargs: Dict[str, Any] = {"log_level": PTT.log.SILENT}
+        if self.config.host:
+            host = self.config.host
+            kwargs["host"] = _PTT_HOSTS.get(host.lower(), host)
+        if self.config.port:
+            kwargs["port"] = self.config.port
+        return kwargs
+
+    def _post_login_info(self, ptt_bot) -> Dict[str, Any]:
+        """Best-effort user info read from the screen PTT showed after login.
+
+        Used by lean logins instead of a ``get_user`` round trip; only the
+        new-mail hint in the main menu title bar is available there.
+        """
+        try:
+            screen = ptt_bot.connect_core.get_screen_queue()[-1]
+        except Exception:
+            return {}
+        if isinstance(screen, str) and _NEW_MAIL_HINT in screen:
+            return {'mail': '您有新信件'}
+        return {}
+
+    def _timed_login(self, ptt_bot, ptt_id: str, ptt_passwd: str, timer: PhaseTimer) -> None:
+        """Log in, timing the connection and authentication phases separately.
+
+        PyPtt connects inside ``login()``; its ``connect_core.connect`` is
+        wrapped on this instance so that the connect time is recorded on its
+        own and excluded from ``auth``.
+        """
+        core = getattr(ptt_bot, "connect_core", None)
+        original_connect = getattr(core, "connect", None)
+        if callable(original_connect):
+            def timed_connect(*args, **kwargs):
+                with timer.phase("connect"):
+                    return original_connect(*args, **kwargs)
+
+            core.connect = timed_connect
+
+        connect_before = timer.phases.get("connect", 0.0)
+        try:
+            with timer.phase("auth"):
+                ptt_bot.login(
+                    ptt_id,
+                    ptt_passwd,
+                    kick_other_session=self.config.kick_other_session,
+                )
+        finally:
+            timer.add("auth", -(timer.phases.get("connect", 0.0) - connect_before))
+
+    def _run_session(
+        self,
+        ptt_id: str,
+        ptt_passwd: str,
+        send_notification: bool = True,
+        timer: PhaseTimer | None = None,
+    ) -> Dict[str, Any]:
+        """Open a PTT session, log in and fetch the user info.
+
+        In lean mode (``PTTConfig.lean_login``) the ``get_user`` screen round
+        trip is skipped: nothing is fetched when no notification will be sent,
+        otherwise the mail status is taken from the post-login screen. The
+        session is always logged out before returning, so the server
+        connection is released before any notification is sent.
+
+        Raises:
+            Exception: Whatever PyPtt raised during login or ``get_user``
+        """
+        timer = timer or PhaseTimer()
+        ptt_bot = None
+        try:
+            with timer.phase("init"):
+                ptt_bot = PTT.API(**self._api_kwargs())
+            self._timed_login(ptt_bot, ptt_id, ptt_passwd, timer)
+            if not self.config.lean_login:
+                with timer.phase("get_user"):
+                    return ptt_bot.get_user(ptt_id)
+            if not self._will_notify(send_notification):
+                return {}
+            return self._post_login_info(ptt_bot)
+        finally:
+            if ptt_bot:
+                with timer.phase("logout"):
+                    self._safe_logout(ptt_bot, ptt_id)
+
+    def _attempt_login(
+        self,
+        ptt_id: str,
+        ptt_passwd: str,
+        attempt: int,
+        send_notification: bool = True,
+        timings: BatchResult | None = None,
+    ) -> bool | None:
+        """Run a single login attempt and handle its outcome.
+
+        Each phase of the attempt is timed; the timings are stored on
+        ``timings`` (when given) and logged at debug level.
 
         Args:
             ptt_id: PTT username
             ptt_passwd: PTT password
+            attempt: Zero-based attempt number
             send_notification: Whether to send notification on success/failure
+            timings: Batch result that collects per-attempt timings
 
         Returns:
-            bool: Whether login was successful
+            bool | None: True/False when the account is finished, or None when
+            the attempt hit a temporary error and should be retried after
+            ``_backoff(attempt)`` seconds.
         """
-        exceptions_to_catch = tuple(self.config.error_messages.keys())
-
-        for attempt in range(self.max_retries + 1):
-            ptt_bot = None
+        timer = PhaseTimer()
+        result: bool | None = False
+        with log_context.attempt(ptt_id, attempt + 1):
             try:
-                ptt_bot = PTT.API(log_level=PTT.log.SILENT)
-                ptt_bot.login(
-                    ptt_id,
-                    ptt_passwd,
-                    kick_other_session=self.config.kick_other_session,
+                result = self._run_attempt(ptt_id, ptt_passwd, attempt, send_notification, timer)
+                return result
+            finally:
+                outcome = "retry" if result is None else ("success" if result else "failure")
+                timing = AttemptTiming(ptt_id, attempt, outcome, dict(timer.phases))
+                if timings is not None:
+                    timings.record_attempt(timing)
+                self.logger.debug(
+                    f"帳號 {ptt_id} 第 {attempt + 1} 次嘗試耗時 {timing.total_ms:.0f} ms（"
+                    + "，".join(f"{name} {elapsed:.0f} ms" for name, elapsed in timing.phases.items())
+                    + "）"
                 )
-                user_info = ptt_bot.get_user(ptt_id)
-                success_message = self._format_success_message(ptt_id, user_info)
 
-                self._notify(success_message, ptt_id, send_notification)
+    def _run_attempt(
+        self,
+        ptt_id: str,
+        ptt_passwd: str,
+        attempt: int,
+        send_notification: bool,
+        timer: PhaseTimer,
+    ) -> bool | None:
+        """Body of :meth:`_attempt_login`; see there for the return value."""
+        exceptions_to_catch = tuple(self.config.error_messages.keys())
+        started_at = time.monotonic()
+
+        try:
+            user_info = self._run_session(ptt_id, ptt_passwd, send_notification, timer)
 
-                return True
+        except exceptions_to_catch as e:
+            if self.concurrency and self._is_throttle_signal(e):
+                self.concurrency.record_throttle(type(e).__name__, started_at)
 
-            except exceptions_to_catch as e:
-                # Known auth/PTT errors — log message only, not the full
-                # traceback (avoid leaking sensitive frame locals into logs).
-                error_message = self._format_error_message(ptt_id, e)
-                self.logger.error(f"帳號 {ptt_id} 登入失敗：{error_message}")
+            # Known auth/PTT errors — log message only, not the full
+            # traceback (avoid leaking sensitive frame locals into logs).
+            error_message = self._format_error_message(ptt_id, e)
+            self.logger.error(f"帳號 {ptt_id} 登入失敗：{error_message}")
 
-                # Retry for temporary errors, with a capped exponential backoff.
-                if isinstance(e, (PTT_exceptions.LoginTooOften, PTT_exceptions.UseTooManyResources)) and attempt < self.max_retries:
-                    self.logger.debug(f"正在重試帳號 {ptt_id} 的登入（第 {attempt + 1}/{self.max_retries} 次嘗試）")
-                    backoff = min(self.config.retry_delay * (2 ** attempt), MAX_BACKOFF_SECONDS)
-                    time.sleep(backoff)
-                    continue
+            # Temporary errors are retried by the caller, with a capped
+            # exponential backoff.
+            if self._is_retryable(e) and attempt < self.max_retries:
+                self.logger.debug(f"正在重試帳號 {ptt_id} 的登入（第 {attempt + 1}/{self.max_retries} 次嘗試）")
+                return None
 
-                self._notify(error_message, ptt_id, send_notification)
+            with timer.phase("notify"):
+                self._notify(error_message, ptt_id, send_notification, urgent=True)
 
-                return False
+            return False
 
-            except Exception as e:
-                # Do NOT use exc_info here: the traceback's frame locals include
-                # ``ptt_passwd``. Log type + message, plus a password-sanitised
-                # traceback at debug level only.
-                self.logger.error(f"帳號 {ptt_id} 登入時發生未預期的錯誤：{type(e).__name__}: {e}")
-                sanitized_tb = traceback.format_exc().replace(ptt_passwd, "***")
-                self.logger.debug(f"未預期錯誤詳細追蹤：\n{sanitized_tb}")
+        except Exception as e:
+            if self.concurrency and self._is_throttle_signal(e):
+                self.concurrency.record_throttle("timeout", started_at)
 
-                self._notify(f"❌ 發生未預期的錯誤: {e}", ptt_id, send_notification)
+            # Do NOT use exc_info here: the traceback's frame locals include
+            # ``ptt_passwd``. Log type + message, plus a password-sanitised
+            # traceback at debug level only.
+            self.logger.error(f"帳號 {ptt_id} 登入時發生未預期的錯誤：{type(e).__name__}: {e}")
+            sanitized_tb = traceback.format_exc().replace(ptt_passwd, "***")
+            self.logger.debug(f"未預期錯誤詳細追蹤：\n{sanitized_tb}")
 
-                return False
+            with timer.phase("notify"):
+                self._notify(f"❌ 發生未預期的錯誤: {e}", ptt_id, send_notification, urgent=True)
 
-            finally:
-                if ptt_bot:
-                    self._safe_logout(ptt_bot, ptt_id)
+            return False
 
+        if self.concurrency:
+            self.concurrency.record_success()
+        if self.ledger:
+            self.ledger.record(ptt_id)
+
+        success_message = self._format_success_message(ptt_id, user_info)
+        with timer.phase("notify"):
+            self._notify(success_message, ptt_id, send_notification)
+
+        return True
+
+    def login(self, ptt_id: str, ptt_passwd: str, send_notification: bool = True) -> bool:
+        """Perform login with retries.
+
+        Args:
+            ptt_id: PTT username
+            ptt_passwd: PTT password
+            send_notification: Whether to send notification on success/failure
+
+        Returns:
+            bool: Whether login was successful
+        """
+        for attempt in range(self.max_retries + 1):
+            with self._concurrency_slot(), log_context.attempt(ptt_id, attempt + 1):
+                self._wait_for_login_token(ptt_id)
+                result = self._attempt_login(ptt_id, ptt_passwd, attempt, send_notification)
+            if result is not None:
+                self._flush_notifications()
+                return result
+            time.sleep(self._backoff(attempt))
+
+        self._flush_notifications()
         return False
+
+    def _log_latency_summary(self, results: BatchResult) -> None:
+        """Log per-phase latency percentiles of the batch."""
+        self.logger.info(f"批次耗時 {results.elapsed_ms / 1000:.1f} 秒，共 {len(results.attempts)} 次登入嘗試")
+        for name, histogram in results.histograms().items():
+            summary = histogram.summary()
+            self.logger.info(
+                f"階段延遲 {name}：p50 {summary['p50']:.0f} ms / p95 {summary['p95']:.0f} ms"
+                f" / p99 {summary['p99']:.0f} ms（{summary['count']} 筆）"
+            )
+
+    def _log_concurrency_summary(self) -> None:
+        """Log how the adaptive concurrency window moved during the batch."""
+        if not self.concurrency:
+            return
+        snapshot = self.concurrency.snapshot()
+        self.logger.info(
+            f"並行視窗：目前 {snapshot['window']}，最高 {snapshot['peak']}"
+            f"（上限 {snapshot['maximum']}），下修 {snapshot['decreases']} 次"
+        )
+        for change in snapshot["history"]:
+            self.logger.debug(f"並行視窗變化：{change['window']:.2f}（{change['reason']}）")
+
+    def _batch_timeout(self, account_count: int) -> float:
+        """Overall wall-clock budget for a batch of ``account_count`` logins.
+
+        A single account's worst case (all retries + capped backoff) is
+        multiplied by the number of waves needed at ``max_concurrency``, and
+        capped at ``max_batch_timeout`` so a hung PyPtt call cannot hold a
+        large batch (and the cron run) for hours.
+        """
+        per_account = (self.config.connection_timeout + MAX_BACKOFF_SECONDS) * (self.max_retries + 1)
+        waves = -(-account_count // self.config.max_concurrency)
+        timeout = per_account * max(1, waves)
+        if self.config.max_batch_timeout > 0:
+            timeout = min(timeout, self.config.max_batch_timeout)
+        return timeout
     
-    def batch_login(self, accounts: List[Tuple[str, str]]) -> Dict[str, bool]:
+    def _login_worker(
+        self,
+        scheduler: RetryScheduler[Tuple[str, str, int]],
+        results: BatchResult,
+        results_lock: threading.Lock,
+    ) -> None:
+        """Pull due accounts from ``scheduler`` until the batch is finished.
+
+        A retryable failure is re-queued with its backoff as the ready time
+        instead of sleeping here, so this worker moves straight on to the next
+        account that is ready.
+        """
+        while True:
+            item = scheduler.get()
+            if item is None:
+                return
+
+            username, password, attempt = item
+            # Everything logged for the account runs in its context, so JSON
+            # logs show its pseudonym instead of the username.
+            with log_context.attempt(username, attempt + 1):
+                if attempt == 0:
+                    self.logger.debug(f"正在嘗試登入 PTT 帳號：{username}")
+                try:
+                    with self._concurrency_slot():
+                        self._wait_for_login_token(username)
+                        success = self._attempt_login(username, password, attempt, timings=results)
+                except Exception as e:
+                    # Log type+message only (no exc_info — the frames hold the
+                    # password) and record the account as failed.
+                    self.logger.error(f"PTT 帳號 {username} 登入時發生錯誤：{type(e).__name__}: {e}")
+                    success = False
+
+                # Re-queue / record BEFORE task_done() so join() never returns
+                # while a result is still missing.
+                if success is None:
+                    scheduler.put((username, password, attempt + 1), delay=self._backoff(attempt))
+                else:
+                    self._record_result(results, results_lock, username, success)
+            scheduler.task_done()
+
+    def _record_result(self, results: BatchResult, results_lock: threading.Lock, username: str, success: bool) -> None:
+        """Store one account's final result and log it."""
+        with results_lock:
+            # A late finisher after a batch timeout must not overwrite the
+            # already-reported result.
+            if username in results:
+                return
+            results[username] = success
+
+        if success:
+            self.logger.debug(f"PTT 帳號 {username} 登入成功")
+        else:
+            self.logger.error(f"PTT 帳號 {username} 登入失敗")
+
+    def _skip_signed_in(self, accounts: List[Tuple[str, str]], force: bool, results: BatchResult) -> List[Tuple[str, str]]:
+        """Drop accounts the ledger says already signed in today.
+
+        Skipped accounts are reported as successful in ``results``.
+
+        Args:
+            accounts: List of (username, password) tuples
+            force: Ignore the ledger and log in every account
+            results: Batch results to pre-fill for skipped accounts
+
+        Returns:
+            List[Tuple[str, str]]: Accounts that still need to log in
+        """
+        if force or not self.ledger:
+            return list(accounts)
+
+        done = self.ledger.signed_in_today(username for username, _ in accounts)
+        if not done:
+            return list(accounts)
+
+        for username in done:
+            results[username] = True
+        self.logger.info(f"略過 {len(done)} 個今日已簽到的帳號（使用 --force 可強制重新登入）")
+        return [(username, password) for username, password in accounts if username not in done]
+
+    def batch_login(self, accounts: List[Tuple[str, str]], force: bool = False) -> BatchResult:
         """Batch login to PTT accounts using concurrent threads.
 
+        Accounts and their retries flow through a deadline-ordered
+        ``RetryScheduler``; workers only ever run attempts that are due, so
+        batch wall-clock time is driven by actual PTT work, not by backoff.
+
         Args:
             accounts: List of (username, password) tuples
+            force: Log in even accounts the ledger says already signed in today
 
         Returns:
-            Dict[str, bool]: Dictionary of login results (username -> success)
+            BatchResult: Login results (username -> success) with per-phase timings
         """
-        results = {}
+        results = BatchResult()
         
         if not accounts:
             self.logger.warning("未設定 PTT 帳號")
             return results
+
+        accounts = self._skip_signed_in(accounts, force, results)
+        if not accounts:
+            self.logger.info("所有帳號今日皆已簽到")
+            return results
         
         self.logger.info(f"開始批次登入 {len(accounts)} 個帳號")
+        batch_started = time.perf_counter()
 
         # Bound the total wait so an unresponsive PTT server cannot hang the
-        # process forever. Logins run concurrently, so a single-account worst
-        # case (all retries + capped backoff) is a sufficient overall budget.
-        batch_timeout = (self.config.connection_timeout + MAX_BACKOFF_SECONDS) * (self.max_retries + 1)
-
-        # Use ThreadPoolExecutor for concurrent logins; this prevents one
-        # account's retry delay from blocking others. The executor is managed
-        # manually (not via ``with``) so that on timeout we can shut down with
-        # ``wait=False`` instead of blocking on a hung worker thread.
-        executor = concurrent.futures.ThreadPoolExecutor(max_workers=min(len(accounts), 5))
-        future_to_account = {
-            executor.submit(self.login, username, password): username
-            for username, password in accounts
-        }
+        # process forever.
+        batch_timeout = self._batch_timeout(len(accounts))
+
+        scheduler: RetryScheduler[Tuple[str, str, int]] = RetryScheduler()
+        for username, password in accounts:
+            scheduler.put((username, password, 0))
+
+        # The executor is managed manually (not via ``with``) so that on
+        # timeout we can shut down with ``wait=False`` instead of blocking on
+        # a hung worker thread.
+        results_lock = threading.Lock()
+        worker_count = min(len(accounts), self.config.max_concurrency)
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=worker_count, thread_name_prefix="ptt-login")
+        for _ in range(worker_count):
+            executor.submit(self._login_worker, scheduler, results, results_lock)
+
         timed_out = False
         try:
-            for future in concurrent.futures.as_completed(future_to_account, timeout=batch_timeout):
-                username = future_to_account[future]
-                try:
-                    self.logger.debug(f"正在嘗試登入 PTT 帳號：{username}")
-                    success = future.result()
-                    results[username] = success
-
-                    if success:
-                        self.logger.debug(f"PTT 帳號 {username} 登入成功")
-                    else:
-                        self.logger.error(f"PTT 帳號 {username} 登入失敗")
-
-                except Exception as e:
-                    # future.result() may surface a worker-thread exception;
-                    # log type+message (no exc_info — its frames hold the
-                    # password) and record the account as failed.
-                    self.logger.error(f"PTT 帳號 {username} 登入時發生錯誤：{type(e).__name__}: {e}")
-                    results[username] = False
-        except concurrent.futures.TimeoutError:
-            # Mark any account that did not finish within the budget as failed
-            # instead of blocking indefinitely.
-            timed_out = True
-            for username in future_to_account.values():
-                if username not in results:
-                    results[username] = False
-                    self.logger.error(f"PTT 帳號 {username} 登入逾時（超過 {batch_timeout} 秒）")
+            timed_out = not scheduler.join(timeout=batch_timeout)
         finally:
+            if timed_out:
+                # Mark any account that did not finish within the budget as
+                # failed instead of blocking indefinitely.
+                scheduler.close()
+                if self.concurrency:
+                    self.concurrency.record_throttle("timeout")
+                with results_lock:
+                    for username, _ in accounts:
+                        if username not in results:
+                            results[username] = False
+                            with log_context.attempt(username):
+                                self.logger.error(f"PTT 帳號 {username} 登入逾時（超過 {batch_timeout} 秒）")
             # On timeout, do not block on the (possibly hung) worker threads.
             executor.shutdown(wait=not timed_out, cancel_futures=True)
+        results.elapsed_ms = (time.perf_counter() - batch_started) * 1000
 
         # Log summary
         success_count = sum(1 for success in results.values() if success)
         self.logger.info(f"批次登入完成：{success_count}/{len(results)} 個帳號成功")
+        self._log_latency_summary(results)
+        self._log_concurrency_summary()
+        self._flush_notifications()
         
-        return results 
\ No newline at end of file
+        return results
@@ -0,0 +1,91 @@
+"""
+Token-bucket rate limiting shared by threads and coroutines.
+"""
+
+import threading
+import time
+from typing import Callable
+
+
+class TokenBucket:
+    """Thread-safe token bucket with first-come, first-served reservations.
+
+    Implemented as a GCRA (virtual scheduling) limiter: each call reserves the
+    next free slot under a lock and is told how long to wait for it. Callers
+    are therefore served strictly in the order they asked, whether they then
+    wait with ``time.sleep`` (:meth:`acquire`) or ``asyncio.sleep``
+    (:meth:`acquire_async`), and nobody can jump the queue after a wait.
+    """
+
+    def __init__(self, rate: float, burst: int = 1, clock: Callable[[], float] = time.monotonic):
+        """Initialize the bucket.
+
+        Args:
+            rate: Sustained tokens per second
+            burst: Tokens that may be taken back-to-back from a full bucket
+            clock: Monotonic clock (injectable for tests)
+
+        Raises:
+            ValueError: If rate or burst is not positive
+        """
+        if rate <= 0:
+            raise ValueError("Token bucket rate must be positive")
+        if burst < 1:
+            raise ValueError("Token bucket burst must be at least 1")
+
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._interval = 1.0 / rate
+        self._tolerance = (burst - 1) * self._interval
+        # Theoretical arrival time of the next conforming request.
+        self._tat = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Reserve one token.
+
+        Returns:
+            float: Seconds the caller must wait before using the token
+        """
+        with self._lock:
+            now = self._clock()
+            tat = max(self._tat, now)
+            delay = max(0.0, tat - self._tolerance - now)
+            self._tat = tat + self._interval
+            return delay
+
+    def defer(self, seconds: float) -> None:
+        """Hold every caller back for at least ``seconds`` from now.
+
+        Used when the server imposes a pause (e.g. a 429 ``retry_after``):
+        tokens already reserved further out are unaffected.
+        """
+        with self._lock:
+            self._tat = max(self._tat, self._clock() + seconds + self._tolerance)
+
+    def acquire(self) -> float:
+        """Take one token, sleeping until it is available.
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    async def acquire_async(self) -> float:
+        """Take one token without blocking the event loop.
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        # Imported here: the thread engine and the Telegram bot never need
+        # asyncio, and it is one of the costlier stdlib imports.
+        import asyncio
+
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
@@ -0,0 +1,106 @@
+"""
+Deadline-ordered work queue for retrying logins without sleeping in workers.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from typing import Generic, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class RetryScheduler(Generic[T]):
+    """Thread-safe queue that hands out items once their ready time is reached.
+
+    Items live in a heap of ``(ready_at, seq, item)``. Workers call
+    :meth:`get`, which returns the earliest item that is already due (FIFO
+    among equal deadlines) and otherwise waits only until the earliest
+    deadline — so a backed-off item never pins a worker while other items are
+    ready.
+
+    Every :meth:`put` must be balanced by a :meth:`task_done` once the item
+    taken by :meth:`get` has been handled (re-queueing a retry counts as a new
+    ``put``). When nothing is left unfinished, :meth:`get` returns ``None`` and
+    :meth:`join` returns ``True``.
+    """
+
+    def __init__(self):
+        """Initialize an empty scheduler."""
+        self._heap: List[Tuple[float, int, T]] = []
+        self._seq = itertools.count()
+        self._unfinished = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def __len__(self) -> int:
+        """Number of items waiting in the heap (due or not)."""
+        with self._cond:
+            return len(self._heap)
+
+    def put(self, item: T, delay: float = 0.0) -> None:
+        """Schedule ``item`` to become available after ``delay`` seconds."""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("RetryScheduler is closed")
+            ready_at = time.monotonic() + max(0.0, delay)
+            heapq.heappush(self._heap, (ready_at, next(self._seq), item))
+            self._unfinished += 1
+            self._cond.notify_all()
+
+    def get(self, timeout: Optional[float] = None) -> Optional[T]:
+        """Take the next due item, waiting for one if necessary.
+
+        Args:
+            timeout: Maximum seconds to wait; None waits until work is done
+
+        Returns:
+            Optional[T]: The item, or None when the scheduler is closed, all
+            work is finished, or ``timeout`` expired
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                if self._closed or self._unfinished == 0:
+                    return None
+
+                now = time.monotonic()
+                if self._heap and self._heap[0][0] <= now:
+                    return heapq.heappop(self._heap)[2]
+
+                # Sleep until the earliest deadline, new work, or our timeout.
+                wait = None
+                if self._heap:
+                    wait = self._heap[0][0] - now
+                if deadline is not None:
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        return None
+                    wait = remaining if wait is None else min(wait, remaining)
+                self._cond.wait(wait)
+
+    def task_done(self) -> None:
+        """Mark one item previously returned by :meth:`get` as handled."""
+        with self._cond:
+            if self._unfinished <= 0:
+                raise ValueError("task_done() called too many times")
+            self._unfinished -= 1
+            if self._unfinished == 0:
+                self._cond.notify_all()
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every scheduled item is handled.
+
+        Returns:
+            bool: True if all work finished, False on timeout or close
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._unfinished == 0 or self._closed, timeout)
+            return self._unfinished == 0
+
+    def close(self) -> None:
+        """Stop handing out items and wake every waiter."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
@@ -5,17 +5,40 @@ Telegram bot module for sending notifications.
 import html
 import logging
 import platform
+import random
 import re
 import socket
+import threading
 import time
 import traceback
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Any, Dict, Optional
-
-import requests
+from typing import TYPE_CHECKING, Any, Dict, Optional
 
 from pttautosign.utils.config import TelegramConfig
+from pttautosign.utils.error_throttle import ErrorThrottle, error_fingerprint
 from pttautosign.utils.interfaces import NotificationService
+from pttautosign.utils.outbox import NotificationOutbox
+from pttautosign.utils.rate_limit import TokenBucket
+
+if TYPE_CHECKING:
+    import requests
+    from requests.adapters import HTTPAdapter
+
+
+def __getattr__(name: str) -> Any:
+    """Resolve ``requests`` on first access (PEP 562).
+
+    ``requests`` costs more to import than the rest of this module and is only
+    needed for the first send, which comes after the logins; methods import it
+    locally. Keeps ``pttautosign.utils.telegram.requests`` working for callers
+    and patch targets.
+    """
+    if name == "requests":
+        import requests
+
+        return requests
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 _SENSITIVE_CONTEXT_KEYS = (
     "password",
@@ -41,19 +64,66 @@ def _redact_context(context: Optional[Dict[str, Any]]) -> Dict[str, Any]:
     return safe
 
 
+def _error_label(error: BaseException) -> str:
+    """``Type: message`` of ``error``, for repeat-count summaries."""
+    try:
+        message = str(error)
+    except Exception:
+        message = ""
+    return f"{type(error).__name__}: {message}" if message else type(error).__name__
+
+
 _TOKEN_RE = re.compile(r"^\d+:[A-Za-z0-9_-]+$")
 
+# Upper bound (seconds) of the random delay added to every retry wait, so
+# parallel senders do not retry in lockstep.
+_RETRY_JITTER = 0.5
+
+
+@dataclass
+class _SendAttempt:
+    """Outcome of one ``sendMessage`` request."""
+    ok: bool
+    retryable: bool = True
+    retry_after: Optional[float] = None
+
+
+def _retry_after(response: Optional["requests.Response"]) -> Optional[float]:
+    """Server-requested wait of a 429 response, in seconds (None if absent)."""
+    if response is None:
+        return None
+    try:
+        value = response.json().get("parameters", {}).get("retry_after")
+    except Exception:
+        value = None
+    if value is None:
+        value = response.headers.get("Retry-After")
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
 
 class TelegramBot(NotificationService):
     """Telegram Bot handler class for sending notifications"""
 
-    def __init__(self, config: TelegramConfig, tz: Optional[timezone] = None):
+    def __init__(
+        self,
+        config: TelegramConfig,
+        tz: Optional[timezone] = None,
+        outbox: Optional[NotificationOutbox] = None,
+        error_throttle: Optional[ErrorThrottle] = None,
+    ):
         """Initialize the Telegram bot with configuration
 
         Args:
             config: Telegram configuration containing token and chat_id
             tz: Timezone for error-notification timestamps (defaults to the
                 host's local time when None)
+            outbox: Where messages go once every retry failed (they are
+                replayed by :meth:`start_outbox_replay`); None drops them
+            error_throttle: Suppresses repeated error reports; None reports
+                every error
 
         Raises:
             ValueError: If the bot token is missing or malformed
@@ -62,17 +132,50 @@ class TelegramBot(NotificationService):
             raise ValueError("Invalid Telegram bot token format")
 
         self.config = config
-        self.api_url = f"https://api.telegram.org/bot{config.token}"
+        # ``api_base`` is configurable so a local stub or Bot API server can
+        # stand in for api.telegram.org.
+        self.api_url = f"{config.api_base.rstrip('/')}/bot{config.token}"
         self.logger = logging.getLogger(__name__)
         self.hostname = socket.gethostname()
         # At least one attempt; honour the documented TELEGRAM_RETRY_COUNT.
         self.max_retries = max(1, config.retry_count)
         self.retry_delay = 2  # base seconds for exponential backoff
         self.tz = tz
+        self.outbox = outbox
+        self.error_throttle = error_throttle
+        self._replay_thread: Optional[threading.Thread] = None
+        self._session: Optional["requests.Session"] = None
+        self._adapter: Optional["HTTPAdapter"] = None
+        self._session_lock = threading.Lock()
 
         bot_id = config.token.partition(":")[0]
         self._masked_token = f"{bot_id}:***"
 
+        # Telegram allows about 30 messages/s per bot and 1 message/s per
+        # chat; pace sends below that instead of collecting 429s.
+        self.global_limiter = TokenBucket(config.rate_limit) if config.rate_limit > 0 else None
+        self.chat_limiter = TokenBucket(config.chat_rate_limit) if config.chat_rate_limit > 0 else None
+
+    @property
+    def session(self) -> "requests.Session":
+        """Keep-alive session shared by every sender thread, created on first use.
+
+        urllib3's connection pool is thread-safe; ``pool_size`` caps the
+        number of sockets kept open to the API host.
+        """
+        with self._session_lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.config.pool_size)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._adapter = adapter
+                self._session = session
+            return self._session
+
     def _redact(self, text: str) -> str:
         """Strip the bot token out of a string before it is logged.
 
@@ -83,10 +186,71 @@ class TelegramBot(NotificationService):
             return text.replace(self.config.token, self._masked_token)
         return text
 
+    def connection_stats(self) -> Dict[str, int]:
+        """Requests sent and TCP connections opened by the session's pool.
+
+        ``requests - connections`` is the number of requests that reused a
+        kept-alive connection.
+        """
+        stats = {"requests": 0, "connections": 0}
+        if self._adapter is None:
+            return stats
+        pools = self._adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            stats["requests"] += getattr(pool, "num_requests", 0)
+            stats["connections"] += getattr(pool, "num_connections", 0)
+        return stats
+
+    def _log_connection_stats(self) -> None:
+        """Log connection reuse at debug level."""
+        if not self.logger.isEnabledFor(logging.DEBUG):
+            return
+        stats = self.connection_stats()
+        self.logger.debug(
+            f"Telegram 連線重用：{stats['requests']} 次請求使用 {stats['connections']} 條連線"
+        )
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """Report pending repeat counts, wait for the outbox replay, then
+        close the pooled connections.
+
+        Args:
+            timeout: Maximum seconds to wait (``TELEGRAM_FLUSH_TIMEOUT`` if None)
+
+        Returns:
+            bool: Whether the replay had finished
+        """
+        if not self.config.disable_notification:
+            self._send_repeat_summaries()
+        done = self.flush(timeout)
+        if self._session is not None:
+            self._session.close()
+        return done
+
+    def _throttle(self) -> None:
+        """Wait for both rate limiters to allow one more message."""
+        waited = 0.0
+        for limiter in (self.chat_limiter, self.global_limiter):
+            if limiter:
+                waited += limiter.acquire()
+        if waited > 0:
+            self.logger.debug(f"Telegram 速率限制等待 {waited:.2f} 秒")
+
+    def _defer(self, seconds: float) -> None:
+        """Hold back every sender of this bot for ``seconds`` (after a 429)."""
+        for limiter in (self.chat_limiter, self.global_limiter):
+            if limiter:
+                limiter.defer(seconds)
+
     def send_message(self, text: str, parse_mode: str = "html") -> bool:
         """Send a message to Telegram, retrying transient failures.
 
-        Retries up to ``TELEGRAM_RETRY_COUNT`` times with exponential backoff.
+        Sends are paced by the global and per-chat rate limiters. Up to
+        ``TELEGRAM_RETRY_COUNT`` attempts are made: a 429 waits exactly the
+        server's ``retry_after`` (plus jitter), network errors and 5xx back off
+        exponentially, and other 4xx responses (bad chat id, blocked bot, ...)
+        fail immediately since retrying cannot help.
 
         Args:
             text: Message content to send
@@ -98,24 +262,99 @@ class TelegramBot(NotificationService):
         masked_text = text[:100] + "..." if len(text) > 100 else text
         self.logger.debug(f"正在發送 Telegram 訊息：{masked_text}")
 
+        delay = 0.0
         for attempt in range(self.max_retries):
             if attempt > 0:
-                delay = self.retry_delay * (2 ** (attempt - 1))
                 self.logger.debug(
-                    f"正在重試發送 Telegram 訊息（第 {attempt + 1}/{self.max_retries} 次嘗試）"
+                    f"{delay:.1f} 秒後重試發送 Telegram 訊息（第 {attempt + 1}/{self.max_retries} 次嘗試）"
                 )
                 time.sleep(delay)
 
-            if self._post_message(text, parse_mode):
+            self._throttle()
+            result = self._post_message(text, parse_mode)
+            if result.ok:
+                self._log_connection_stats()
                 return True
+            if not result.retryable:
+                self.logger.error("Telegram 拒絕此訊息且無法重試，放棄發送")
+                return False
+            if attempt == self.max_retries - 1:
+                break  # Nothing follows to wait for: go straight to the outbox.
+
+            jitter = random.uniform(0, _RETRY_JITTER)
+            if result.retry_after is not None:
+                delay = result.retry_after + jitter
+                self._defer(delay)
+            else:
+                delay = self.retry_delay * (2 ** attempt) + jitter
 
         self.logger.error(f"Telegram 訊息發送失敗，已嘗試 {self.max_retries} 次")
+        if self.outbox and self.outbox.add(text, parse_mode):
+            self.logger.info("訊息已存入待發送區，將於下次執行時補發")
         return False
 
-    def _post_message(self, text: str, parse_mode: str) -> bool:
-        """Perform a single send attempt. Returns True on success."""
+    def replay_outbox(self) -> int:
+        """Send the messages stored in the outbox, oldest first.
+
+        Stops at the first message that still cannot be sent (Telegram is
+        presumably still unreachable); it and the rest stay stored.
+
+        Returns:
+            int: Number of messages delivered
+        """
+        if not self.outbox:
+            return 0
+        pending = self.outbox.pending()
+        if not pending:
+            return 0
+        self.logger.info(f"正在補發 {len(pending)} 則先前未送出的通知")
+        delivered = 0
+        for key, text, parse_mode in pending:
+            if not self.send_message(text, parse_mode):
+                break
+            self.outbox.remove(key)
+            delivered += 1
+        self.logger.info(f"已補發 {delivered}/{len(pending)} 則通知")
+        return delivered
+
+    def start_outbox_replay(self) -> None:
+        """Replay the outbox in a background thread (see :meth:`flush`)."""
+        if not self.outbox or self._replay_thread is not None:
+            return
+        self._replay_thread = threading.Thread(target=self.replay_outbox, name="telegram-outbox", daemon=True)
+        self._replay_thread.start()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait for the outbox replay, if one is running.
+
+        Args:
+            timeout: Maximum seconds to wait (``TELEGRAM_FLUSH_TIMEOUT`` if None)
+
+        Returns:
+            bool: Whether the replay has finished
+        """
+        if self._replay_thread is None:
+            return True
+        self._replay_thread.join(self.config.flush_timeout if timeout is None else timeout)
+        return not self._replay_thread.is_alive()
+
+    def _send_repeat_summaries(self) -> None:
+        """Send the repeat counts the error throttle has due (see :class:`ErrorThrottle`)."""
+        if not self.error_throttle:
+            return
+        for label, suppressed in self.error_throttle.take_due_summaries():
+            self.send_message(
+                "🔁 <b>Repeated Error</b>\n"
+                f"<b>Error:</b> {html.escape(label)}\n"
+                f"<b>Occurrences:</b> {suppressed} more after the last report"
+            )
+
+    def _post_message(self, text: str, parse_mode: str) -> _SendAttempt:
+        """Perform a single send attempt and classify its outcome."""
+        import requests
+
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{self.api_url}/sendMessage",
                 json={
                     "chat_id": self.config.chat_id,
@@ -127,18 +366,27 @@ class TelegramBot(NotificationService):
             )
             response.raise_for_status()
             self.logger.debug("Telegram 訊息發送成功")
-            return True
+            return _SendAttempt(ok=True)
 
+        except requests.exceptions.HTTPError as e:
+            self.logger.warning(f"Telegram 訊息發送失敗：{self._redact(str(e))}")
+            status = e.response.status_code if e.response is not None else None
+            if status == 429:
+                retry_after = _retry_after(e.response)
+                if retry_after is not None:
+                    self.logger.warning(f"Telegram 要求 {retry_after:.0f} 秒後再試")
+                return _SendAttempt(ok=False, retry_after=retry_after)
+            return _SendAttempt(ok=False, retryable=status is None or status >= 500)
         except requests.exceptions.RequestException as e:
             # Avoid exc_info — the request URL/exception text contains the bot
             # token; redact it before logging.
             self.logger.warning(f"Telegram 訊息發送失敗：{self._redact(str(e))}")
-            return False
+            return _SendAttempt(ok=False)
         except Exception as e:
             self.logger.error(
                 f"發送 Telegram 訊息時發生未預期的錯誤：{self._redact(str(e))}"
             )
-            return False
+            return _SendAttempt(ok=False)
 
     def send_error_notification(
         self,
@@ -147,14 +395,29 @@ class TelegramBot(NotificationService):
     ) -> bool:
         """Send an error notification to Telegram.
 
+        With an error throttle, an error whose fingerprint was already
+        reported within the suppression window is only counted; the next
+        report of it states how many repeats were suppressed. Counts of
+        errors that did not come back are sent as a short summary once
+        their window has ended.
+
         Args:
             error: Exception that occurred
             context: Additional context information (sensitive keys masked)
 
         Returns:
-            bool: Whether the message was sent successfully
+            bool: Whether the message was sent successfully (True when it was
+            deliberately suppressed)
         """
         try:
+            suppressed = 0
+            if self.error_throttle:
+                report, suppressed = self.error_throttle.check(error_fingerprint(error), _error_label(error))
+                self._send_repeat_summaries()
+                if not report:
+                    self.logger.info(f"相同的錯誤已於 {self.error_throttle.window:.0f} 秒內通知過，不再重複發送")
+                    return True
+
             now = datetime.now(self.tz).strftime("%Y-%m-%d %H:%M:%S")
             error_type = html.escape(type(error).__name__)
             error_message = html.escape(str(error))
@@ -166,6 +429,8 @@ class TelegramBot(NotificationService):
                 f"<b>Error Type:</b> {error_type}",
                 f"<b>Error Message:</b> {error_message}",
             ]
+            if suppressed:
+                parts.append(f"<b>Occurrences:</b> {suppressed + 1} since the last report")
 
             safe_context = _redact_context(context)
             if safe_context:
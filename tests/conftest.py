@@ -1,5 +1,6 @@
 """Shared pytest fixtures for the pttautosign test suite."""
 
+import os
 from unittest.mock import MagicMock
 
 import pytest
@@ -9,20 +10,56 @@ import pytest
 _APP_ENV_VARS = (
     "PTT_USERNAME",
     "PTT_PASSWORD",
+    "PTT_ACCOUNTS_FILE",
     "TELEGRAM_BOT_TOKEN",
     "TELEGRAM_CHAT_ID",
     "DISABLE_NOTIFICATIONS",
     "TELEGRAM_RETRY_COUNT",
     "TELEGRAM_TIMEOUT",
+    "TELEGRAM_POOL_SIZE",
+    "TELEGRAM_QUEUE_SIZE",
+    "TELEGRAM_QUEUE_POLICY",
+    "TELEGRAM_SENDER_THREADS",
+    "TELEGRAM_FLUSH_TIMEOUT",
+    "TELEGRAM_SPILL_PATH",
+    "TELEGRAM_DIGEST",
+    "TELEGRAM_URGENT_ERRORS",
+    "TELEGRAM_RATE_LIMIT",
+    "TELEGRAM_CHAT_RATE_LIMIT",
+    "TELEGRAM_OUTBOX_PATH",
+    "TELEGRAM_API_BASE",
+    "TELEGRAM_ERROR_WINDOW",
+    "TELEGRAM_ERROR_CACHE_PATH",
     "timezone_hours",
     "ptt_timezone_hours",
     "ptt_max_retries",
     "ptt_retry_delay",
     "ptt_connection_timeout",
     "ptt_kick_other_session",
+    "ptt_max_concurrency",
+    "ptt_login_engine",
+    "ptt_adaptive_concurrency",
+    "ptt_min_concurrency",
+    "ptt_login_rate",
+    "ptt_login_burst",
+    "ptt_ledger_path",
+    "ptt_lean_login",
+    "ptt_host",
+    "ptt_port",
+    "ptt_worker_max_logins",
+    "ptt_max_batch_timeout",
+    "CRON_DATA_DIR",
     "LOG_FORMAT",
     "DEBUG_MODE",
     "LOG_LEVEL",
+    "LOG_ASYNC",
+    "LOG_RATE_LIMIT_BURST",
+    "LOG_RATE_LIMIT_WINDOW",
+    "LOG_FILE",
+    "LOG_FILE_MAX_BYTES",
+    "LOG_FILE_WHEN",
+    "LOG_FILE_RETENTION_BYTES",
+    "NO_COLOR",
     "TEST_MODE",
 )
 
@@ -32,6 +69,23 @@ def clean_app_env(monkeypatch):
     """Remove all app env vars so each test controls its own environment."""
     for var in _APP_ENV_VARS:
         monkeypatch.delenv(var, raising=False)
+    # Indexed accounts: PTT_USERNAME_1, PTT_PASSWORD_1, ...
+    for var in list(os.environ):
+        if var.startswith(("PTT_USERNAME_", "PTT_PASSWORD_")):
+            monkeypatch.delenv(var, raising=False)
+
+
+@pytest.fixture(autouse=True)
+def drop_log_rate_limiter():
+    """Forget rate-limited log counts after each test.
+
+    Otherwise their summaries are flushed at exit to a capture stream pytest
+    has already closed.
+    """
+    yield
+    from pttautosign.utils import logger
+
+    logger._rate_limiter = None
 
 
 @pytest.fixture
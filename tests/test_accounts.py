@@ -0,0 +1,114 @@
+"""Tests for PTT account loading and the account store."""
+
+import json
+
+import pytest
+
+from pttautosign.utils.accounts import AccountStore, load_accounts
+from pttautosign.utils.config import ConfigValidationError
+
+
+class TestAccountStore:
+    def test_behaves_like_a_sequence_of_tuples(self):
+        store = AccountStore([("alice", "pw1"), ("bob", "密碼")])
+        assert len(store) == 2
+        assert list(store) == [("alice", "pw1"), ("bob", "密碼")]
+        assert store[1] == ("bob", "密碼")
+        assert store[-2] == ("alice", "pw1")
+        assert store[1:] == [("bob", "密碼")]
+        assert list(store.usernames()) == ["alice", "bob"]
+        with pytest.raises(IndexError):
+            store[2]
+
+    def test_equality(self):
+        store = AccountStore([("a", "1")])
+        assert store == [("a", "1")]
+        assert store == AccountStore([("a", "1")])
+        assert store != [("a", "2")]
+
+    def test_repr_hides_passwords(self):
+        assert "secret" not in repr(AccountStore([("a", "secret")]))
+
+    def test_empty_store_is_falsy(self):
+        assert not AccountStore()
+
+
+class TestLoadAccounts:
+    def test_single_env_account(self):
+        assert load_accounts({"PTT_USERNAME": "u", "PTT_PASSWORD": "p"}) == [("u", "p")]
+
+    def test_indexed_env_accounts_in_numeric_order(self):
+        environ = {
+            "PTT_USERNAME_10": "ten", "PTT_PASSWORD_10": "p10",
+            "PTT_USERNAME_2": "two", "PTT_PASSWORD_2": "p2",
+            "PTT_USERNAME": "main", "PTT_PASSWORD": "p",
+        }
+        assert load_accounts(environ) == [("main", "p"), ("two", "p2"), ("ten", "p10")]
+
+    def test_indexed_username_without_password_raises(self):
+        with pytest.raises(ConfigValidationError, match="PTT_PASSWORD_1"):
+            load_accounts({"PTT_USERNAME_1": "u"})
+
+    def test_half_configured_main_account_raises(self):
+        with pytest.raises(ConfigValidationError, match="together"):
+            load_accounts({"PTT_USERNAME": "u"})
+
+    def test_csv_file_with_header_and_comments(self, tmp_path):
+        path = tmp_path / "accounts.csv"
+        path.write_text("username,password\n# disabled\nalice,pw,1\n\nbob,\"p,w\"\n", encoding="utf-8")
+        assert load_accounts({"PTT_ACCOUNTS_FILE": str(path)}) == [("alice", "pw"), ("bob", "p,w")]
+
+    def test_jsonl_file(self, tmp_path):
+        path = tmp_path / "accounts.jsonl"
+        path.write_text(
+            "\n".join(json.dumps({"username": f"user{i}", "password": f"pw{i}"}) for i in range(3)) + "\n",
+            encoding="utf-8",
+        )
+        assert len(load_accounts({"PTT_ACCOUNTS_FILE": str(path)})) == 3
+
+    def test_toml_file(self, tmp_path):
+        path = tmp_path / "accounts.toml"
+        path.write_text(
+            '[[accounts]]\nusername = "alice"\npassword = "pw"\n\n[[accounts]]\nusername = "bob"\npassword = "pw2"\n',
+            encoding="utf-8",
+        )
+        assert load_accounts({"PTT_ACCOUNTS_FILE": str(path)}) == [("alice", "pw"), ("bob", "pw2")]
+
+    def test_duplicates_are_dropped_case_insensitively(self, tmp_path):
+        path = tmp_path / "accounts.csv"
+        path.write_text("Alice,file\nbob,pw\n", encoding="utf-8")
+        environ = {"PTT_USERNAME": "alice", "PTT_PASSWORD": "env", "PTT_ACCOUNTS_FILE": str(path)}
+        assert load_accounts(environ) == [("alice", "env"), ("bob", "pw")]
+
+    def test_invalid_row_names_line_but_not_password(self, tmp_path):
+        path = tmp_path / "accounts.csv"
+        path.write_text("alice,pw\nbad user,hunter2\n", encoding="utf-8")
+        with pytest.raises(ConfigValidationError, match="line 2") as excinfo:
+            load_accounts({"PTT_ACCOUNTS_FILE": str(path)})
+        assert "hunter2" not in str(excinfo.value)
+
+    def test_invalid_json_does_not_leak_line(self, tmp_path):
+        path = tmp_path / "accounts.jsonl"
+        path.write_text('{"username": "a", "password": "hunter2"\n', encoding="utf-8")
+        with pytest.raises(ConfigValidationError, match="invalid JSON") as excinfo:
+            load_accounts({"PTT_ACCOUNTS_FILE": str(path)})
+        assert "hunter2" not in str(excinfo.value)
+
+    def test_unknown_extension_raises(self, tmp_path):
+        with pytest.raises(ConfigValidationError, match="must end in"):
+            load_accounts({"PTT_ACCOUNTS_FILE": str(tmp_path / "accounts.txt")})
+
+    def test_missing_file_raises(self, tmp_path):
+        with pytest.raises(ConfigValidationError, match="not found"):
+            load_accounts({"PTT_ACCOUNTS_FILE": str(tmp_path / "missing.csv")})
+
+    def test_no_accounts_raises(self):
+        with pytest.raises(ConfigValidationError, match="No PTT account"):
+            load_accounts({})
+
+    def test_large_file_loads(self, tmp_path):
+        path = tmp_path / "accounts.csv"
+        path.write_text("".join(f"user{i:05d},pw{i}\n" for i in range(10000)), encoding="utf-8")
+        store = load_accounts({"PTT_ACCOUNTS_FILE": str(path)})
+        assert len(store) == 10000
+        assert store[9999] == ("user09999", "pw9999")
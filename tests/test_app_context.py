@@ -41,6 +41,9 @@ class TestServiceGuards:
         with pytest.raises(RuntimeError, match="not initialized"):
             AppContext().run()
 
+    def test_close_before_init_is_a_no_op(self):
+        AppContext().close()
+
 
 class TestInitializeAndRun:
     def _full_env(self, monkeypatch):
@@ -71,7 +74,7 @@ class TestInitializeAndRun:
         login.batch_login.return_value = {"u": True}
         monkeypatch.setattr(ctx, "get_login_service", lambda: login)
         ctx.run()
-        login.batch_login.assert_called_once_with([("u", "p")])
+        login.batch_login.assert_called_once_with([("u", "p")], force=False)
 
     def test_run_sends_error_notification_on_failure(self, monkeypatch):
         self._full_env(monkeypatch)
@@ -0,0 +1,101 @@
+"""Tests for the asyncio batch login engine."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from PyPtt import exceptions as PTT_exceptions
+
+from pttautosign.utils.async_login import AsyncLoginService
+from pttautosign.utils.config import PTTConfig
+
+
+def _exc(cls, message="error"):
+    exc = cls.__new__(cls)
+    exc.message = message
+    return exc
+
+
+@pytest.fixture
+def notifier():
+    n = MagicMock()
+    n.send_message.return_value = True
+    return n
+
+
+class TestAsyncLogin:
+    @patch("pttautosign.utils.ptt.PTT")
+    def test_successful_login(self, mock_ptt, notifier):
+        api = mock_ptt.API.return_value
+        api.get_user.return_value = {"login_count": 1, "mail": "No new mails"}
+        service = AsyncLoginService(notifier, PTTConfig(retry_delay=1))
+        assert service.login("alice", "pw") is True
+        notifier.send_message.assert_called_once()
+
+    @patch("pttautosign.utils.async_login.asyncio.sleep")
+    @patch("pttautosign.utils.ptt.PTT")
+    def test_retry_uses_non_blocking_backoff(self, mock_ptt, mock_sleep, notifier):
+        mock_sleep.return_value = None
+        api = mock_ptt.API.return_value
+        api.login.side_effect = _exc(PTT_exceptions.LoginTooOften)
+        service = AsyncLoginService(notifier, PTTConfig(max_retries=2, retry_delay=1))
+        with patch("pttautosign.utils.ptt.time.sleep") as blocking_sleep:
+            assert service.login("alice", "pw") is False
+        assert api.login.call_count == 3
+        assert mock_sleep.call_count == 2
+        blocking_sleep.assert_not_called()
+
+
+class TestAsyncBatchLogin:
+    def test_empty_accounts_returns_empty(self, notifier):
+        assert AsyncLoginService(notifier).batch_login([]) == {}
+
+    @patch.object(AsyncLoginService, "_attempt_login")
+    def test_mixed_results(self, mock_attempt, notifier):
+        mock_attempt.side_effect = lambda u, p, attempt, send, **kw: u.startswith("good")
+        accounts = [(f"good{i}", "1") for i in range(20)] + [("bad", "2")]
+        results = AsyncLoginService(notifier, PTTConfig(max_concurrency=3)).batch_login(accounts)
+        assert len(results) == 21
+        assert results["bad"] is False
+        assert all(results[f"good{i}"] for i in range(20))
+
+    @patch.object(AsyncLoginService, "_batch_timeout", return_value=0.05)
+    @patch.object(AsyncLoginService, "_attempt_login")
+    def test_batch_timeout_marks_pending_failed(self, mock_attempt, _timeout, notifier):
+        import time
+
+        mock_attempt.side_effect = lambda u, p, attempt, send, **kw: time.sleep(0.3) or True
+        results = AsyncLoginService(notifier).batch_login([("slow", "1")])
+        assert results == {"slow": False}
+
+    @patch.object(AsyncLoginService, "_attempt_login", return_value=True)
+    def test_adaptive_gate_completes_batch(self, _mock_attempt, notifier):
+        config = PTTConfig(adaptive_concurrency=True, max_concurrency=4)
+        service = AsyncLoginService(notifier, config)
+        results = service.batch_login([(f"u{i}", "p") for i in range(10)])
+        assert len(results) == 10 and all(results.values())
+        assert service.concurrency.in_flight == 0
+
+
+class TestAsyncLoginRateLimit:
+    def test_starts_stay_within_limit(self, notifier):
+        import time
+
+        config = PTTConfig(max_concurrency=4, login_rate=20, login_burst=1, retry_delay=0)
+        service = AsyncLoginService(notifier, config)
+        t0 = time.monotonic()
+        starts = []
+
+        def attempt(username, password, attempt, send_notification=True, timings=None):
+            starts.append(time.monotonic())
+            # The first wave ends together; accounts must not start on tokens
+            # they reserved while waiting for a slot.
+            time.sleep(max(0.0, t0 + 0.5 - time.monotonic()))
+            return True
+
+        with patch.object(service, "_attempt_login", side_effect=attempt):
+            results = service.batch_login([(f"u{i}", "p") for i in range(8)])
+        assert all(results.values())
+        starts.sort()
+        for i in range(len(starts)):
+            for j in range(i + 1, len(starts)):
+                assert j - i + 1 <= 1 + 20 * (starts[j] - starts[i] + 0.02), starts
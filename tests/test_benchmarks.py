@@ -0,0 +1,130 @@
+"""Tests for the benchmark harness and ``pttautosign bench``."""
+
+import json
+
+import pytest
+
+from pttautosign.benchmarks import cli
+from pttautosign.benchmarks.harness import (
+    compare,
+    load_results,
+    measure,
+    sample_mismatches,
+    summarize,
+    write_results,
+)
+from pttautosign.benchmarks.startup import StartupProfile, format_profile, parse_importtime, profile_startup
+from pttautosign.benchmarks.suites import BenchOptions, bench_batch_login
+
+
+class TestHarness:
+    def test_measure_counts_every_call(self):
+        calls = []
+        result = measure("noop", lambda: calls.append(1), repeat=3, number=4, warmup=2)
+        assert len(calls) == 2 + 3 * 4
+        assert result.repeat == 3 and result.number == 4
+        assert result.min_ms <= result.median_ms <= result.max_ms
+
+    def test_summarize_statistics(self):
+        result = summarize("case", [3.0, 1.0, 2.0], accounts=10)
+        assert (result.min_ms, result.median_ms, result.max_ms) == (1.0, 2.0, 3.0)
+        assert result.mean_ms == pytest.approx(2.0)
+        assert result.to_dict()["accounts"] == 10
+
+    def test_results_round_trip(self, tmp_path):
+        path = tmp_path / "bench.json"
+        write_results(str(path), [summarize("case", [1.0])])
+        document = json.loads(path.read_text(encoding="utf-8"))
+        assert "python" in document["environment"]
+        assert load_results(str(path))["case"]["median_ms"] == 1.0
+
+    def test_compare_flags_only_slowdowns_beyond_threshold(self):
+        baseline = {"slow": {"median_ms": 10.0}, "ok": {"median_ms": 10.0}, "gone": {"median_ms": 1.0}}
+        current = {"slow": {"median_ms": 13.0}, "ok": {"median_ms": 11.0}, "new": {"median_ms": 5.0}}
+        regressions = compare(current, baseline, threshold=0.2)
+        assert [r.name for r in regressions] == ["slow"]
+        assert regressions[0].ratio == pytest.approx(1.3)
+
+    def test_compare_skips_cases_sampled_differently(self):
+        baseline = {"quick": {"median_ms": 1.0, "repeat": 1, "number": 100}, "same": {"median_ms": 1.0, "repeat": 5}}
+        current = {"quick": {"median_ms": 9.0, "repeat": 5, "number": 1000}, "same": {"median_ms": 9.0, "repeat": 5}}
+        assert sample_mismatches(current, baseline) == ["quick"]
+        assert [r.name for r in compare(current, baseline)] == ["same"]
+
+    def test_note_is_stored(self, tmp_path):
+        path = tmp_path / "bench.json"
+        write_results(str(path), [summarize("case", [1.0])], note="host-specific")
+        assert json.loads(path.read_text(encoding="utf-8"))["note"] == "host-specific"
+
+
+def test_batch_login_suite_uses_stubbed_ptt():
+    options = BenchOptions(sizes=(3,), engines=("thread", "async"), ptt_latency_ms=0, quick=True)
+    results = bench_batch_login(options)
+    assert [r.name for r in results] == ["batch_login[thread,n=3]", "batch_login[async,n=3]"]
+    assert all(r.extra["accounts_per_sec"] > 0 for r in results)
+
+
+def test_batch_login_suite_runs_process_engine_against_fake_server():
+    options = BenchOptions(sizes=(2,), engines=("process",), ptt_latency_ms=0, concurrency=2, quick=True)
+    (result,) = bench_batch_login(options)
+    assert result.name == "batch_login[process,n=2]"
+    assert result.extra["ptt"] == "fake_server"
+    assert result.extra["accounts_per_sec"] > 0
+
+
+_IMPORTTIME = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     _io
+import time:      2000 |       5000 |   requests.compat
+import time:       900 |       6000 | requests
+some unrelated line
+import time:      3000 |       3000 | PyPtt._uao.u2b
+"""
+
+
+class TestStartupProfile:
+    def test_parse_importtime(self):
+        records = parse_importtime(_IMPORTTIME)
+        assert [(r.module, r.self_us, r.cumulative_us, r.depth) for r in records] == [
+            ("_io", 120, 120, 2),
+            ("requests.compat", 2000, 5000, 1),
+            ("requests", 900, 6000, 0),
+            ("PyPtt._uao.u2b", 3000, 3000, 0),
+        ]
+
+    def test_breakdown(self):
+        profile = StartupProfile(cold_start_ms=50.0, imports=parse_importtime(_IMPORTTIME))
+        assert profile.import_ms == pytest.approx(6.02)
+        assert list(profile.by_package()) == ["PyPtt", "requests", "_io"]
+        assert profile.by_package()["requests"] == pytest.approx(2.9)
+        assert [r.module for r in profile.slowest(2)] == ["PyPtt._uao.u2b", "requests.compat"]
+        report = format_profile(profile, top=2, budget_ms=100)
+        assert "Cold start: 50.0 ms (budget 100 ms)" in report
+        assert "_io" not in report
+
+    def test_profiles_a_fresh_interpreter(self):
+        profile = profile_startup()
+        assert profile.cold_start_ms > 0
+        assert any(r.module == "pttautosign.utils.app_context" for r in profile.imports)
+
+
+class TestCli:
+    def test_writes_json(self, tmp_path, capsys):
+        output = tmp_path / "out.json"
+        assert cli.main(["--only", "patches", "--quick", "-o", str(output)]) == 0
+        assert set(load_results(str(output))) == {"patches.get_data[ansi]", "patches.get_data[plain]"}
+        assert "patches.get_data[ansi]" in capsys.readouterr().out
+
+    def test_regression_against_baseline_fails(self, tmp_path, capsys):
+        baseline = tmp_path / "baseline.json"
+        baseline.write_text(
+            json.dumps({"results": {"patches.get_data[plain]": {"median_ms": 1e-9}}}), encoding="utf-8"
+        )
+        assert cli.main(["--only", "patches", "--quick", "--baseline", str(baseline)]) == 1
+        assert "regression" in capsys.readouterr().out
+
+    def test_unknown_suite_is_rejected(self):
+        assert cli.main(["--only", "nope"]) == 2
+
+    def test_unknown_engine_is_rejected(self, capsys):
+        assert cli.main(["--only", "batch_login", "--engines", "thread,nope"]) == 2
+        assert "Unknown engine(s): nope" in capsys.readouterr().err
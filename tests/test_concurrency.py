@@ -0,0 +1,71 @@
+"""Tests for the adaptive (AIMD) concurrency controller."""
+
+import time
+
+import pytest
+
+from pttautosign.utils.concurrency import AIMDController
+
+
+class TestAIMDController:
+    def test_invalid_bounds_raise(self):
+        with pytest.raises(ValueError):
+            AIMDController(minimum=3, maximum=2)
+        with pytest.raises(ValueError):
+            AIMDController(decrease=1.0)
+
+    def test_successes_grow_window_additively_up_to_maximum(self):
+        controller = AIMDController(initial=1, maximum=4)
+        for _ in range(50):
+            controller.record_success()
+        assert controller.window == 4
+
+    def test_one_full_window_of_successes_adds_about_one(self):
+        controller = AIMDController(initial=1, maximum=10)
+        controller.record_success()
+        assert controller.window == 2
+        controller.record_success()
+        controller.record_success()
+        assert controller.window == 2
+        controller.record_success()
+        assert controller.window == 3
+
+    def test_throttle_halves_window_but_not_below_minimum(self):
+        controller = AIMDController(initial=8, minimum=2, maximum=8)
+        assert controller.record_throttle("LoginTooOften") is True
+        assert controller.window == 4
+        controller.record_throttle("LoginTooOften")
+        controller.record_throttle("LoginTooOften")
+        assert controller.window == 2
+
+    def test_stale_throttle_signal_is_ignored(self):
+        controller = AIMDController(initial=8, maximum=8)
+        started_at = time.monotonic()
+        controller.record_throttle("UseTooManyResources", started_at)
+        # A second failure from an attempt that began before the cut must not
+        # cut the window again.
+        assert controller.record_throttle("UseTooManyResources", started_at) is False
+        assert controller.window == 4
+
+    def test_try_acquire_respects_window(self):
+        controller = AIMDController(initial=2, maximum=2)
+        assert controller.try_acquire() is True
+        assert controller.try_acquire() is True
+        assert controller.try_acquire() is False
+        controller.release()
+        assert controller.try_acquire() is True
+
+    def test_acquire_times_out_when_window_full(self):
+        controller = AIMDController(initial=1, maximum=1)
+        with controller.slot():
+            assert controller.acquire(timeout=0.01) is False
+        assert controller.in_flight == 0
+
+    def test_snapshot_exposes_history(self):
+        controller = AIMDController(initial=4, maximum=4)
+        controller.record_throttle("timeout")
+        snapshot = controller.snapshot()
+        assert snapshot["window"] == 2
+        assert snapshot["peak"] == 4
+        assert snapshot["decreases"] == 1
+        assert [c["reason"] for c in snapshot["history"]] == ["initial", "timeout"]
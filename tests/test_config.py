@@ -1,9 +1,13 @@
 """Tests for configuration loading, validation, and secret redaction."""
 
 import logging
+import os
+import subprocess
+import sys
 
 import pytest
 
+import pttautosign
 from pttautosign.utils.config import (
     AppConfig,
     ConfigValidationError,
@@ -56,6 +60,74 @@ class TestTelegramConfig:
         assert cfg.token == "123456789:ABCdef_GHI-jkl"
         assert cfg.chat_id == "987654321"
 
+    def test_from_env_reads_pool_size(self, telegram_env, monkeypatch):
+        monkeypatch.setenv("TELEGRAM_POOL_SIZE", "4")
+        assert TelegramConfig.from_env().pool_size == 4
+
+    def test_non_positive_pool_size_raises(self):
+        with pytest.raises(ConfigValidationError, match="Pool size"):
+            TelegramConfig(token="123456789:ABCdef_GHI-jkl", chat_id="42", pool_size=0).validate()
+
+    def test_from_env_reads_queue_settings(self, telegram_env, monkeypatch):
+        monkeypatch.setenv("TELEGRAM_QUEUE_SIZE", "5")
+        monkeypatch.setenv("TELEGRAM_QUEUE_POLICY", "DROP_OLDEST")
+        monkeypatch.setenv("TELEGRAM_SENDER_THREADS", "2")
+        monkeypatch.setenv("TELEGRAM_FLUSH_TIMEOUT", "7")
+        cfg = TelegramConfig.from_env()
+        assert (cfg.queue_size, cfg.queue_policy, cfg.sender_threads, cfg.flush_timeout) == (5, "drop_oldest", 2, 7)
+
+    def test_spill_and_outbox_paths_default_to_cron_data_dir(self, telegram_env, monkeypatch, tmp_path):
+        monkeypatch.setenv("CRON_DATA_DIR", str(tmp_path))
+        cfg = TelegramConfig.from_env()
+        assert cfg.spill_path == str(tmp_path / "notification_spill.jsonl")
+        assert cfg.outbox_path == str(tmp_path / "notification_outbox.sqlite3")
+
+    def test_outbox_disabled_without_data_dir(self, telegram_env):
+        assert TelegramConfig.from_env().outbox_path == ""
+
+    def test_from_env_reads_digest_settings(self, telegram_env, monkeypatch):
+        monkeypatch.setenv("TELEGRAM_DIGEST", "true")
+        monkeypatch.setenv("TELEGRAM_URGENT_ERRORS", "false")
+        cfg = TelegramConfig.from_env()
+        assert cfg.digest is True and cfg.urgent_errors is False
+
+    def test_from_env_reads_rate_limits(self, telegram_env, monkeypatch):
+        monkeypatch.setenv("TELEGRAM_RATE_LIMIT", "20")
+        monkeypatch.setenv("TELEGRAM_CHAT_RATE_LIMIT", "0.5")
+        cfg = TelegramConfig.from_env()
+        assert (cfg.rate_limit, cfg.chat_rate_limit) == (20.0, 0.5)
+
+    def test_negative_rate_limit_raises(self):
+        with pytest.raises(ConfigValidationError, match="Rate limits"):
+            TelegramConfig(token="123456789:ABCdef_GHI-jkl", chat_id="42", chat_rate_limit=-1).validate()
+
+    def test_from_env_reads_api_base(self, telegram_env, monkeypatch):
+        monkeypatch.setenv("TELEGRAM_API_BASE", "http://127.0.0.1:8898")
+        assert TelegramConfig.from_env().api_base == "http://127.0.0.1:8898"
+
+    def test_invalid_api_base_raises(self):
+        with pytest.raises(ConfigValidationError, match="API base"):
+            TelegramConfig(token="123456789:ABCdef_GHI-jkl", chat_id="42", api_base="api.telegram.org").validate()
+
+    def test_from_env_reads_error_throttle_settings(self, telegram_env, monkeypatch, tmp_path):
+        monkeypatch.setenv("CRON_DATA_DIR", str(tmp_path))
+        monkeypatch.setenv("TELEGRAM_ERROR_WINDOW", "600")
+        cfg = TelegramConfig.from_env()
+        assert cfg.error_window == 600
+        assert cfg.error_cache_path == str(tmp_path / "error_throttle.json")
+
+    def test_negative_error_window_raises(self):
+        with pytest.raises(ConfigValidationError, match="Error window"):
+            TelegramConfig(token="123456789:ABCdef_GHI-jkl", chat_id="42", error_window=-1).validate()
+
+    def test_unknown_queue_policy_raises(self):
+        with pytest.raises(ConfigValidationError, match="Queue policy"):
+            TelegramConfig(token="123456789:ABCdef_GHI-jkl", chat_id="42", queue_policy="lifo").validate()
+
+    def test_spill_policy_without_path_raises(self):
+        with pytest.raises(ConfigValidationError, match="spill"):
+            TelegramConfig(token="123456789:ABCdef_GHI-jkl", chat_id="42", queue_policy="spill").validate()
+
     def test_from_env_missing_raises(self):
         with pytest.raises(ConfigValidationError):
             TelegramConfig.from_env()
@@ -65,6 +137,22 @@ class TestTelegramConfig:
         with pytest.raises(ConfigValidationError, match="TELEGRAM_RETRY_COUNT"):
             TelegramConfig.from_env()
 
+    @pytest.mark.parametrize(
+        "name",
+        [
+            "TELEGRAM_ERROR_WINDOW",
+            "TELEGRAM_QUEUE_SIZE",
+            "TELEGRAM_SENDER_THREADS",
+            "TELEGRAM_FLUSH_TIMEOUT",
+            "TELEGRAM_RATE_LIMIT",
+            "TELEGRAM_CHAT_RATE_LIMIT",
+        ],
+    )
+    def test_from_env_invalid_number_names_variable(self, telegram_env, monkeypatch, name):
+        monkeypatch.setenv(name, "abc")
+        with pytest.raises(ConfigValidationError, match=rf"^{name} must be"):
+            TelegramConfig.from_env()
+
 
 class TestPTTConfig:
     def test_defaults_are_valid(self):
@@ -96,9 +184,91 @@ class TestPTTConfig:
         with pytest.raises(ConfigValidationError, match="ptt_max_retries"):
             PTTConfig.from_env()
 
+    def test_non_positive_max_concurrency_raises(self):
+        with pytest.raises(ConfigValidationError, match="Max concurrency"):
+            PTTConfig(max_concurrency=0).validate()
+
+    def test_unknown_login_engine_raises(self):
+        with pytest.raises(ConfigValidationError, match="Login engine"):
+            PTTConfig(login_engine="fibers").validate()
+
+    def test_from_env_reads_login_engine(self, monkeypatch):
+        monkeypatch.setenv("ptt_login_engine", "ASYNC")
+        monkeypatch.setenv("ptt_max_concurrency", "50")
+        config = PTTConfig.from_env()
+        assert config.login_engine == "async"
+        assert config.max_concurrency == 50
+
+    def test_negative_login_rate_raises(self):
+        with pytest.raises(ConfigValidationError, match="Login rate"):
+            PTTConfig(login_rate=-1).validate()
+
+    def test_from_env_non_numeric_login_rate_raises(self, monkeypatch):
+        monkeypatch.setenv("ptt_login_rate", "fast")
+        with pytest.raises(ConfigValidationError, match="ptt_login_rate"):
+            PTTConfig.from_env()
+
+    def test_ledger_disabled_without_data_dir(self):
+        assert PTTConfig.from_env().ledger_path == ""
+
+    def test_ledger_defaults_to_cron_data_dir(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("CRON_DATA_DIR", str(tmp_path))
+        assert PTTConfig.from_env().ledger_path == str(tmp_path / "signin_ledger.sqlite3")
+
+    def test_from_env_reads_host_and_port(self, monkeypatch):
+        monkeypatch.setenv("ptt_host", "localhost")
+        monkeypatch.setenv("ptt_port", "8899")
+        config = PTTConfig.from_env()
+        assert (config.host, config.port) == ("localhost", 8899)
+
+    def test_worker_max_logins_must_be_positive(self):
+        with pytest.raises(ConfigValidationError, match="Worker max logins"):
+            PTTConfig(worker_max_logins=0).validate()
+
+    def test_max_batch_timeout_from_env(self, monkeypatch):
+        monkeypatch.setenv("ptt_max_batch_timeout", "900")
+        assert PTTConfig.from_env().max_batch_timeout == 900
+        with pytest.raises(ConfigValidationError, match="Max batch timeout"):
+            PTTConfig(max_batch_timeout=-1).validate()
+
+    def test_out_of_range_port_raises(self):
+        with pytest.raises(ConfigValidationError, match="Port"):
+            PTTConfig(port=70000).validate()
+
     def test_to_dict_drops_unserializable_error_messages(self):
         assert "error_messages" not in PTTConfig().to_dict()
 
+    def test_error_messages_resolved_on_first_use(self):
+        config = PTTConfig()
+        assert "unresolved" in repr(config.error_messages)
+        config.to_json()
+        assert "unresolved" in repr(config.error_messages)
+        from PyPtt import exceptions as PTT_exceptions
+
+        assert config.error_messages[PTT_exceptions.WrongPassword] == "PTT 登入失敗！\n密碼錯誤"
+
+    def test_explicit_error_messages_are_kept(self):
+        assert PTTConfig(error_messages={ValueError: "x"}).error_messages == {ValueError: "x"}
+
+    @pytest.mark.parametrize(
+        "code",
+        [
+            "from pttautosign.utils.config import AppConfig; AppConfig.from_env()",
+            "from pttautosign.utils.config import AppConfig;"
+            "from pttautosign.utils.factory import ServiceFactory;"
+            "ServiceFactory(AppConfig.from_env()).get_notification_service()",
+        ],
+        ids=["config", "notification"],
+    )
+    def test_config_and_notification_paths_do_not_import_pyptt(self, code, telegram_env):
+        src_dir = os.path.dirname(os.path.dirname(pttautosign.__file__))
+        env = dict(os.environ, PYTHONPATH=src_dir)
+        completed = subprocess.run(
+            [sys.executable, "-c", f"import sys; {code}; print('PyPtt' in sys.modules)"],
+            capture_output=True, text=True, check=True, env=env,
+        )
+        assert completed.stdout.strip().splitlines()[-1] == "False"
+
 
 class TestLogConfig:
     def test_debug_mode_sets_debug_level(self, monkeypatch):
@@ -112,6 +282,31 @@ class TestLogConfig:
     def test_to_dict_stringifies_level(self):
         assert LogConfig(log_level=logging.WARNING).to_dict()["log_level"] == "WARNING"
 
+    def test_rate_limit_from_env(self, monkeypatch):
+        monkeypatch.setenv("LOG_RATE_LIMIT_BURST", "0")
+        monkeypatch.setenv("LOG_RATE_LIMIT_WINDOW", "5")
+        config = LogConfig.from_env()
+        assert (config.rate_limit_burst, config.rate_limit_window) == (0, 5.0)
+
+    def test_log_file_from_env(self, monkeypatch):
+        assert LogConfig.from_env().log_file == ""
+        monkeypatch.setenv("LOG_FILE", "/app/data/logs/pttautosign.log")
+        monkeypatch.setenv("LOG_FILE_WHEN", "Hourly")
+        monkeypatch.setenv("LOG_FILE_MAX_BYTES", "0")
+        config = LogConfig.from_env()
+        assert config.log_file == "/app/data/logs/pttautosign.log"
+        assert (config.log_file_when, config.log_file_max_bytes) == ("hourly", 0)
+
+    def test_invalid_log_file_rotation_rejected(self, monkeypatch):
+        monkeypatch.setenv("LOG_FILE_WHEN", "weekly")
+        with pytest.raises(ConfigValidationError):
+            LogConfig.from_env()
+
+    def test_invalid_rate_limit_rejected(self, monkeypatch):
+        monkeypatch.setenv("LOG_RATE_LIMIT_WINDOW", "0")
+        with pytest.raises(ConfigValidationError):
+            LogConfig.from_env()
+
 
 class TestAppConfig:
     def test_to_dict_has_no_test_mode(self, telegram_env):
@@ -130,3 +325,10 @@ class TestGetPttAccounts:
     def test_missing_credentials_raises(self):
         with pytest.raises(ConfigValidationError, match="No PTT account"):
             get_ptt_accounts()
+
+    def test_reads_indexed_accounts(self, monkeypatch):
+        monkeypatch.setenv("PTT_USERNAME_1", "user1")
+        monkeypatch.setenv("PTT_PASSWORD_1", "pass1")
+        monkeypatch.setenv("PTT_USERNAME_2", "user2")
+        monkeypatch.setenv("PTT_PASSWORD_2", "pass2")
+        assert get_ptt_accounts() == [("user1", "pass1"), ("user2", "pass2")]
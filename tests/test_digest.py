@@ -0,0 +1,107 @@
+"""Tests for digest notifications."""
+
+import re
+from unittest.mock import MagicMock
+
+from pttautosign.utils.digest import TELEGRAM_MESSAGE_LIMIT, DigestNotifier, pack_messages
+
+
+def _delegate():
+    delegate = MagicMock()
+    delegate.send_message.return_value = True
+    delegate.send_urgent.return_value = True
+    delegate.flush.return_value = True
+    delegate.close.return_value = True
+    return delegate
+
+
+class TestPackMessages:
+    def test_joins_messages_into_one_text(self):
+        assert pack_messages(["a", "b", "c"]) == ["a\n\nb\n\nc"]
+
+    def test_starts_new_chunk_at_limit(self):
+        chunks = pack_messages(["x" * 6, "y" * 6, "z" * 6], limit=14)
+        assert chunks == ["x" * 6 + "\n\n" + "y" * 6, "z" * 6]
+
+    def test_splits_oversized_message_on_lines(self):
+        message = "\n".join(["a" * 8, "b" * 8, "c" * 8])
+        chunks = pack_messages([message], limit=17)
+        assert chunks == ["a" * 8 + "\n" + "b" * 8, "c" * 8]
+
+    def test_hard_splits_oversized_line(self):
+        assert pack_messages(["x" * 25], limit=10) == ["x" * 10, "x" * 10, "x" * 5]
+
+    def test_long_html_message_is_split_outside_markup(self):
+        trace = "\n".join(f'File "ptt.py", line {i}, in login &lt;module&gt;' for i in range(40))
+        message = f"❌ <b>Error Notification</b>\n<b>Trace:</b>\n<pre>{trace}</pre>\n<i>{'x' * 300}</i>"
+        chunks = pack_messages([message], limit=200)
+
+        assert len(chunks) > 1
+        for chunk in chunks:
+            assert len(chunk) <= 200
+            for tag in ("b", "i", "pre"):
+                assert chunk.count(f"<{tag}>") == chunk.count(f"</{tag}>")
+            assert re.fullmatch(r"([^<&]|<[^<>]*>|&\w+;)*", chunk, re.S)
+        strip = lambda text: re.sub(r"<[^<>]*>|\n", "", text)
+        assert "".join(strip(chunk) for chunk in chunks) == strip(message)
+        # Tags open at a split are closed and reopened in the next chunk.
+        assert all(chunk.startswith("<pre>") for chunk in chunks if "File" in chunk and "Trace" not in chunk)
+        assert chunks[-1].startswith("<i>") and chunks[-2].startswith("<i>")
+
+    def test_non_html_messages_split_on_length_only(self):
+        assert pack_messages(["<b>" + "x" * 10], limit=5, parse_mode="markdown") == ["<b>xx", "xxxxx", "xxx"]
+
+    def test_chunks_respect_telegram_limit(self):
+        messages = [f"✅ PTT user{i:04d} 登入成功\n📆 登入天數: {i} 天\n#ptt #20261016" for i in range(500)]
+        chunks = pack_messages(messages)
+        assert all(len(chunk) <= TELEGRAM_MESSAGE_LIMIT for chunk in chunks)
+        assert sum(chunk.count("登入成功") for chunk in chunks) == 500
+        assert len(chunks) < 20
+
+
+class TestDigestNotifier:
+    def test_buffers_until_flush(self):
+        delegate = _delegate()
+        notifier = DigestNotifier(delegate)
+        notifier.send_message("one")
+        notifier.send_message("two")
+        delegate.send_message.assert_not_called()
+
+        assert notifier.flush(5) is True
+        delegate.send_message.assert_called_once_with("one\n\ntwo", "html")
+        delegate.flush.assert_called_once_with(5)
+
+    def test_flush_with_nothing_buffered_sends_nothing(self):
+        delegate = _delegate()
+        assert DigestNotifier(delegate).flush() is True
+        delegate.send_message.assert_not_called()
+
+    def test_urgent_messages_bypass_digest(self):
+        delegate = _delegate()
+        notifier = DigestNotifier(delegate)
+        notifier.send_urgent("❌ 密碼錯誤")
+        delegate.send_urgent.assert_called_once_with("❌ 密碼錯誤", "html")
+
+    def test_urgent_messages_digested_when_disabled(self):
+        delegate = _delegate()
+        notifier = DigestNotifier(delegate, urgent_errors=False)
+        notifier.send_urgent("❌ 密碼錯誤")
+        notifier.send_message("✅ ok")
+        notifier.flush()
+        delegate.send_urgent.assert_not_called()
+        delegate.send_message.assert_called_once_with("❌ 密碼錯誤\n\n✅ ok", "html")
+
+    def test_failed_digest_is_reported(self):
+        delegate = _delegate()
+        delegate.send_message.return_value = False
+        notifier = DigestNotifier(delegate)
+        notifier.send_message("one")
+        assert notifier.flush() is False
+
+    def test_close_sends_digest_and_closes_delegate(self):
+        delegate = _delegate()
+        notifier = DigestNotifier(delegate)
+        notifier.send_message("one")
+        assert notifier.close(5) is True
+        delegate.send_message.assert_called_once_with("one", "html")
+        delegate.close.assert_called_once_with(5)
@@ -0,0 +1,263 @@
+"""Tests for the background notification dispatcher."""
+
+import json
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from pttautosign.utils.dispatcher import NotificationDispatcher
+from pttautosign.utils.interfaces import NotificationService
+
+
+class _RecordingNotifier(NotificationService):
+    """Notifier that records messages and can be held to simulate a slow API."""
+
+    def __init__(self, ok: bool = True):
+        self.ok = ok
+        self.sent: List[str] = []
+        self.threads: List[str] = []
+        self.gate = threading.Event()
+        self.gate.set()
+        self.errors: List[Exception] = []
+
+    def send_message(self, text: str, parse_mode: str = "html") -> bool:
+        self.gate.wait(5)
+        self.sent.append(text)
+        self.threads.append(threading.current_thread().name)
+        return self.ok
+
+    def send_error_notification(self, error: Exception, context: Optional[Dict[str, Any]] = None) -> bool:
+        self.errors.append(error)
+        return True
+
+
+def _wait_until(predicate, timeout: float = 2.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+class TestNotificationDispatcher:
+    def test_sends_from_background_thread_in_order(self):
+        notifier = _RecordingNotifier()
+        dispatcher = NotificationDispatcher(notifier)
+        for i in range(5):
+            assert dispatcher.send_message(f"m{i}") is True
+        assert dispatcher.flush(2) is True
+        assert notifier.sent == [f"m{i}" for i in range(5)]
+        assert all(name.startswith("notify-sender") for name in notifier.threads)
+        assert dispatcher.sent == 5
+        dispatcher.close()
+
+    def test_send_does_not_wait_for_slow_delegate(self):
+        notifier = _RecordingNotifier()
+        notifier.gate.clear()
+        dispatcher = NotificationDispatcher(notifier)
+        started = time.perf_counter()
+        dispatcher.send_message("slow")
+        assert time.perf_counter() - started < 0.5
+        notifier.gate.set()
+        assert dispatcher.flush(2) is True
+        dispatcher.close()
+
+    def test_flush_times_out_while_delegate_is_stuck(self):
+        notifier = _RecordingNotifier()
+        notifier.gate.clear()
+        dispatcher = NotificationDispatcher(notifier)
+        dispatcher.send_message("stuck")
+        assert dispatcher.flush(0.05) is False
+        notifier.gate.set()
+        dispatcher.close()
+
+    def test_failed_delivery_is_counted(self):
+        dispatcher = NotificationDispatcher(_RecordingNotifier(ok=False))
+        dispatcher.send_message("x")
+        dispatcher.flush(2)
+        assert dispatcher.failed == 1 and dispatcher.sent == 0
+        dispatcher.close()
+
+    def test_drop_oldest_discards_when_full(self):
+        notifier = _RecordingNotifier()
+        notifier.gate.clear()
+        dispatcher = NotificationDispatcher(notifier, queue_size=2, policy="drop_oldest")
+        dispatcher.send_message("first")
+        # Wait until the sender holds "first", so the queue itself is empty.
+        assert _wait_until(lambda: dispatcher._in_flight == 1)
+        for text in ("a", "b", "c"):
+            dispatcher.send_message(text)
+        notifier.gate.set()
+        dispatcher.flush(2)
+        assert notifier.sent == ["first", "b", "c"]
+        assert dispatcher.dropped == 1
+        dispatcher.close()
+
+    def test_block_waits_for_room(self):
+        notifier = _RecordingNotifier()
+        notifier.gate.clear()
+        dispatcher = NotificationDispatcher(notifier, queue_size=1, policy="block")
+        dispatcher.send_message("first")
+        assert _wait_until(lambda: dispatcher._in_flight == 1)
+        dispatcher.send_message("queued")
+
+        blocked = threading.Thread(target=dispatcher.send_message, args=("third",))
+        blocked.start()
+        blocked.join(0.1)
+        assert blocked.is_alive()
+
+        notifier.gate.set()
+        blocked.join(2)
+        assert not blocked.is_alive()
+        dispatcher.flush(2)
+        assert notifier.sent == ["first", "queued", "third"]
+        dispatcher.close()
+
+    def test_spill_writes_overflow_to_disk_and_drains_it(self, tmp_path):
+        spill = tmp_path / "spill.jsonl"
+        notifier = _RecordingNotifier()
+        notifier.gate.clear()
+        dispatcher = NotificationDispatcher(notifier, queue_size=1, policy="spill", spill_path=str(spill))
+        dispatcher.send_message("first")
+        assert _wait_until(lambda: dispatcher._in_flight == 1)
+        for text in ("a", "b", "c"):
+            dispatcher.send_message(text)
+        assert [json.loads(line)["text"] for line in spill.read_text(encoding="utf-8").splitlines()] == ["b", "c"]
+
+        notifier.gate.set()
+        assert dispatcher.flush(2) is True
+        assert notifier.sent == ["first", "a", "b", "c"]
+        assert dispatcher.spilled == 2
+        assert not spill.exists()
+        dispatcher.close()
+
+    def test_spilled_messages_from_previous_run_are_sent_on_flush(self, tmp_path):
+        spill = tmp_path / "spill.jsonl"
+        spill.write_text(json.dumps({"text": "left over", "parse_mode": "html"}) + "\n", encoding="utf-8")
+        notifier = _RecordingNotifier()
+        dispatcher = NotificationDispatcher(notifier, policy="spill", spill_path=str(spill))
+        assert dispatcher.flush(2) is True
+        assert notifier.sent == ["left over"]
+        dispatcher.close()
+
+    def test_close_spills_unsent_messages(self, tmp_path):
+        spill = tmp_path / "spill.jsonl"
+        notifier = _RecordingNotifier()
+        notifier.gate.clear()
+        dispatcher = NotificationDispatcher(notifier, spill_path=str(spill))
+        dispatcher.send_message("first")
+        assert _wait_until(lambda: dispatcher._in_flight == 1)
+        dispatcher.send_message("unsent")
+        assert dispatcher.close(0.05) is False
+        notifier.gate.set()
+        assert json.loads(spill.read_text(encoding="utf-8"))["text"] == "unsent"
+
+    def test_close_stores_unsent_messages_in_outbox(self, tmp_path):
+        from pttautosign.utils.outbox import NotificationOutbox
+
+        outbox = NotificationOutbox(str(tmp_path / "outbox.sqlite3"))
+        notifier = _RecordingNotifier()
+        notifier.gate.clear()
+        dispatcher = NotificationDispatcher(notifier, outbox=outbox)
+        dispatcher.send_message("first")
+        assert _wait_until(lambda: dispatcher._in_flight == 1)
+        dispatcher.send_message("unsent")
+        assert dispatcher.close(0.05) is False
+        notifier.gate.set()
+        assert [text for _, text, _ in outbox.pending()] == ["unsent"]
+        outbox.close()
+
+    def test_close_closes_delegate(self):
+        notifier = _RecordingNotifier()
+        notifier.close = lambda timeout=None: False
+        dispatcher = NotificationDispatcher(notifier)
+        assert dispatcher.close(1) is False
+
+    def test_send_after_close_goes_straight_to_delegate_without_lock(self):
+        notifier = _RecordingNotifier()
+        dispatcher = NotificationDispatcher(notifier)
+        dispatcher.close()
+        lock_free = []
+        original = notifier.send_message
+
+        def send(text, parse_mode="html"):
+            lock_free.append(dispatcher._cond.acquire(blocking=False))
+            if lock_free[-1]:
+                dispatcher._cond.release()
+            return original(text, parse_mode)
+
+        notifier.send_message = send
+        assert dispatcher.send_message("late") is True
+        assert dispatcher.send_urgent("late urgent") is True
+        assert notifier.sent == ["late", "late urgent"]
+        assert lock_free == [True, True]
+
+    def test_blocked_send_is_spilled_when_closed(self, tmp_path):
+        spill = tmp_path / "spill.jsonl"
+        notifier = _RecordingNotifier()
+        notifier.gate.clear()
+        dispatcher = NotificationDispatcher(notifier, queue_size=1, policy="block", spill_path=str(spill))
+        dispatcher.send_message("first")
+        assert _wait_until(lambda: dispatcher._in_flight == 1)
+        dispatcher.send_message("queued")
+
+        blocked = threading.Thread(target=dispatcher.send_message, args=("blocked",))
+        blocked.start()
+        blocked.join(0.1)
+        assert blocked.is_alive()
+
+        assert dispatcher.close(0.05) is False
+        blocked.join(2)
+        assert not blocked.is_alive()
+        notifier.gate.set()
+        texts = [json.loads(line)["text"] for line in spill.read_text(encoding="utf-8").splitlines()]
+        assert sorted(texts) == ["blocked", "queued"]
+        assert "blocked" not in notifier.sent
+
+    def test_default_flush_deadline_fits_backlog_at_drain_rate(self):
+        notifier = _RecordingNotifier()
+        notifier.gate.clear()
+        dispatcher = NotificationDispatcher(notifier, flush_timeout=1, drain_rate=2)
+        for i in range(10):
+            dispatcher.send_message(f"m{i}")
+        assert dispatcher._flush_window(None) == 5
+        assert dispatcher._flush_window(0.5) == 0.5
+        notifier.gate.set()
+        assert dispatcher.flush() is True
+        dispatcher.close()
+
+    def test_default_flush_deadline_without_drain_rate(self):
+        dispatcher = NotificationDispatcher(_RecordingNotifier(), flush_timeout=3)
+        for i in range(10):
+            dispatcher.send_message(f"m{i}")
+        assert dispatcher._flush_window(None) == 3
+        dispatcher.close()
+
+    def test_error_notification_is_sent_synchronously(self):
+        notifier = _RecordingNotifier()
+        dispatcher = NotificationDispatcher(notifier)
+        error = ValueError("boom")
+        assert dispatcher.send_error_notification(error) is True
+        assert notifier.errors == [error]
+
+    def test_spill_policy_requires_path(self):
+        with pytest.raises(ValueError, match="spill"):
+            NotificationDispatcher(_RecordingNotifier(), policy="spill")
+
+    def test_urgent_messages_jump_the_queue(self):
+        notifier = _RecordingNotifier()
+        notifier.gate.clear()
+        dispatcher = NotificationDispatcher(notifier, queue_size=1, policy="drop_oldest")
+        dispatcher.send_message("first")
+        assert _wait_until(lambda: dispatcher._in_flight == 1)
+        dispatcher.send_message("routine")
+        dispatcher.send_urgent("error 1")
+        dispatcher.send_urgent("error 2")
+        notifier.gate.set()
+        assert dispatcher.flush(2) is True
+        assert notifier.sent == ["first", "error 1", "error 2", "routine"]
+        assert dispatcher.dropped == 0
+        dispatcher.close()
@@ -0,0 +1,97 @@
+"""Tests for error fingerprinting and throttling."""
+
+import json
+
+from pttautosign.utils.error_throttle import ErrorThrottle, error_fingerprint
+
+
+def _raise(error: Exception) -> Exception:
+    try:
+        raise error
+    except Exception as e:
+        return e
+
+
+class _Clock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestErrorFingerprint:
+    def test_volatile_parts_of_message_are_ignored(self):
+        a = error_fingerprint(ConnectionError("port 23 closed after 30.5s at 0x7f3a"))
+        b = error_fingerprint(ConnectionError("port 22 closed after 12.0s at 0x10ff"))
+        assert a == b
+
+    def test_type_and_message_distinguish_errors(self):
+        assert error_fingerprint(ValueError("x")) != error_fingerprint(TypeError("x"))
+        assert error_fingerprint(ValueError("login failed")) != error_fingerprint(ValueError("timeout"))
+
+    def test_raising_frame_distinguishes_errors(self):
+        def elsewhere():
+            try:
+                raise ValueError("x")
+            except ValueError as e:
+                return e
+
+        assert error_fingerprint(_raise(ValueError("x"))) == error_fingerprint(_raise(ValueError("x")))
+        assert error_fingerprint(_raise(ValueError("x"))) != error_fingerprint(elsewhere())
+
+
+class TestErrorThrottle:
+    def test_repeats_within_window_are_suppressed_and_counted(self):
+        clock = _Clock()
+        throttle = ErrorThrottle(60, clock=clock)
+        assert throttle.check("fp") == (True, 0)
+        assert throttle.check("fp") == (False, 0)
+        assert throttle.check("fp") == (False, 0)
+        clock.now += 60
+        assert throttle.check("fp") == (True, 2)
+        assert throttle.check("other") == (True, 0)
+
+    def test_window_survives_restarts(self, tmp_path):
+        path = str(tmp_path / "data" / "errors.json")
+        clock = _Clock()
+        assert ErrorThrottle(60, path, clock=clock).check("fp") == (True, 0)
+        assert ErrorThrottle(60, path, clock=clock).check("fp") == (False, 0)
+        clock.now += 120
+        assert ErrorThrottle(60, path, clock=clock).check("fp") == (True, 1)
+
+    def test_expired_entries_are_pruned(self, tmp_path):
+        path = tmp_path / "errors.json"
+        clock = _Clock()
+        throttle = ErrorThrottle(60, str(path), clock=clock)
+        throttle.check("old")
+        clock.now += 120
+        throttle.check("new")
+        assert set(json.loads(path.read_text(encoding="utf-8"))) == {"new"}
+
+    def test_corrupt_cache_is_ignored(self, tmp_path):
+        path = tmp_path / "errors.json"
+        path.write_text("not json", encoding="utf-8")
+        assert ErrorThrottle(60, str(path)).check("fp") == (True, 0)
+
+    def test_entries_missing_fields_are_dropped(self, tmp_path):
+        path = tmp_path / "errors.json"
+        path.write_text(
+            json.dumps({"fp": {"reported_at": 1000.0}, "bad": "x", "ok": {"reported_at": 1000.0, "suppressed": 1}}),
+            encoding="utf-8",
+        )
+        throttle = ErrorThrottle(60, str(path), clock=_Clock())
+        assert throttle.check("fp") == (True, 0)
+        assert throttle.check("ok") == (False, 0)
+
+    def test_due_summaries_cover_errors_that_stopped(self):
+        clock = _Clock()
+        throttle = ErrorThrottle(60, clock=clock)
+        throttle.check("fp", "ConnectionError: timeout")
+        throttle.check("fp")
+        throttle.check("fp")
+        assert throttle.take_due_summaries() == []
+        clock.now += 60
+        assert throttle.take_due_summaries() == [("ConnectionError: timeout", 2)]
+        assert throttle.take_due_summaries() == []
+        assert throttle.check("fp") == (True, 0)
@@ -1,6 +1,7 @@
 """Tests for the service factory."""
 
 from pttautosign.utils.config import AppConfig, LogConfig, PTTConfig, TelegramConfig
+from pttautosign.utils.dispatcher import NotificationDispatcher
 from pttautosign.utils.factory import ServiceFactory
 from pttautosign.utils.ptt import PTTAutoSign
 from pttautosign.utils.telegram import TelegramBot
@@ -15,10 +16,24 @@ def _app_config() -> AppConfig:
 
 
 class TestServiceFactory:
-    def test_notification_service_is_telegram_bot(self):
-        assert isinstance(
-            ServiceFactory(_app_config()).get_notification_service(), TelegramBot
-        )
+    def test_notification_service_queues_for_telegram_bot(self):
+        service = ServiceFactory(_app_config()).get_notification_service()
+        assert isinstance(service, NotificationDispatcher)
+        assert isinstance(service.delegate, TelegramBot)
+
+    def test_digest_mode_wraps_dispatcher(self):
+        from pttautosign.utils.digest import DigestNotifier
+
+        config = _app_config()
+        config.telegram.digest = True
+        service = ServiceFactory(config).get_notification_service()
+        assert isinstance(service, DigestNotifier)
+        assert isinstance(service.delegate, NotificationDispatcher)
+
+    def test_zero_queue_size_sends_synchronously(self):
+        config = _app_config()
+        config.telegram.queue_size = 0
+        assert isinstance(ServiceFactory(config).get_notification_service(), TelegramBot)
 
     def test_notification_service_is_cached(self):
         factory = ServiceFactory(_app_config())
@@ -36,6 +51,64 @@ class TestServiceFactory:
     def test_notification_service_uses_ptt_timezone(self):
         config = _app_config()
         config.ptt.timezone_hours = 0
-        bot = ServiceFactory(config).get_notification_service()
+        bot = ServiceFactory(config).get_notification_service().delegate
         assert bot.tz is not None
         assert bot.tz.utcoffset(None).total_seconds() == 0
+
+    def test_async_engine_selects_async_login_service(self):
+        from pttautosign.utils.async_login import AsyncLoginService
+
+        config = _app_config()
+        config.ptt.login_engine = "async"
+        assert isinstance(ServiceFactory(config).get_login_service(), AsyncLoginService)
+
+    def test_process_engine_selects_process_login_service(self):
+        from pttautosign.utils.process_login import ProcessLoginService
+
+        config = _app_config()
+        config.ptt.login_engine = "process"
+        assert isinstance(ServiceFactory(config).get_login_service(), ProcessLoginService)
+
+    def test_dispatcher_drains_at_slowest_rate_limit(self):
+        config = _app_config()
+        config.telegram.rate_limit = 30
+        config.telegram.chat_rate_limit = 1
+        assert ServiceFactory(config).get_notification_service().drain_rate == 1
+        config.telegram.chat_rate_limit = 0
+        assert ServiceFactory(config).get_notification_service().drain_rate == 30
+
+    def test_outbox_replay_skipped_when_notifications_disabled(self, tmp_path):
+        config = _app_config()
+        config.telegram.outbox_path = str(tmp_path / "outbox.sqlite3")
+        config.telegram.disable_notification = True
+        bot = ServiceFactory(config).get_notification_service().delegate
+        assert bot.outbox is not None
+        assert bot._replay_thread is None
+
+    def test_outbox_replay_started(self, tmp_path):
+        config = _app_config()
+        config.telegram.outbox_path = str(tmp_path / "outbox.sqlite3")
+        bot = ServiceFactory(config).get_notification_service().delegate
+        assert bot._replay_thread is not None
+        assert bot.flush(5) is True
+
+    def test_close_without_notification_service_is_a_no_op(self):
+        assert ServiceFactory(_app_config()).close() is True
+
+    def test_close_keeps_unsent_notifications_in_outbox(self, tmp_path):
+        from pttautosign.utils.outbox import NotificationOutbox
+
+        config = _app_config()
+        config.telegram.outbox_path = str(tmp_path / "outbox.sqlite3")
+        factory = ServiceFactory(config)
+        service = factory.get_notification_service()
+        assert service.outbox is service.delegate.outbox
+        # Nothing can be sent: the deadline passes before the sender runs.
+        service.delegate.send_message = lambda text, parse_mode="html": False
+        service._start_senders = lambda: None
+        service.send_message("unsent")
+        assert factory.close(0) is False
+
+        outbox = NotificationOutbox(config.telegram.outbox_path)
+        assert [text for _, text, _ in outbox.pending()] == ["unsent"]
+        outbox.close()
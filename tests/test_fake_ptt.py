@@ -0,0 +1,97 @@
+"""Tests for the local PTT stand-in server, driven by the real PyPtt client."""
+
+import random
+
+import pytest
+from websockets.sync.client import connect
+
+from pttautosign.testing.fake_ptt import FakePTTScenario, FakePTTServer, Latency
+from pttautosign.utils.config import PTTConfig
+from pttautosign.utils.ptt import PTTAutoSign
+
+
+def _service(notifier, server, **overrides):
+    config = PTTConfig(host="localhost", port=server.port, max_retries=0, **overrides)
+    return PTTAutoSign(notifier, config)
+
+
+class TestLatency:
+    def test_fixed_returns_mean_in_seconds(self):
+        assert Latency("fixed", 50).sample(random.Random(0)) == pytest.approx(0.05)
+
+    def test_uniform_stays_within_spread(self):
+        rng = random.Random(1)
+        samples = [Latency("uniform", 100, 20).sample(rng) for _ in range(200)]
+        assert 0.08 <= min(samples) and max(samples) <= 0.12
+
+    def test_lognormal_matches_mean_and_is_non_negative(self):
+        rng = random.Random(2)
+        samples = [Latency("lognormal", 80, 40).sample(rng) for _ in range(5000)]
+        assert min(samples) >= 0
+        assert sum(samples) / len(samples) == pytest.approx(0.08, rel=0.05)
+
+    def test_invalid_parameters_raise(self):
+        with pytest.raises(ValueError):
+            Latency("pareto", 10)
+        with pytest.raises(ValueError):
+            Latency("fixed", -1)
+        with pytest.raises(ValueError):
+            FakePTTScenario(hang_rate=1.5)
+
+
+class TestFakePTTServer:
+    def test_login_get_user_and_logout(self, mock_notifier):
+        with FakePTTServer(FakePTTScenario(new_mail=True)) as server:
+            assert _service(mock_notifier, server).login("alice", "secret") is True
+            stats = server.stats.snapshot()
+
+        message = mock_notifier.send_message.call_args[0][0]
+        assert "alice 登入成功" in message
+        assert "登入天數: 1 天" in message
+        assert stats["outcomes"]["success"] == 1
+        assert stats["get_user_calls"] == 1
+        assert stats["logouts"] == 1
+
+    def test_wrong_password(self, mock_notifier):
+        with FakePTTServer(FakePTTScenario(passwords={"alice": "secret"})) as server:
+            assert _service(mock_notifier, server).login("alice", "wrong") is False
+
+        assert "帳號或密碼錯誤" in mock_notifier.send_urgent.call_args[0][0]
+
+    def test_overload_is_reported_as_use_too_many_resources(self, mock_notifier):
+        with FakePTTServer(FakePTTScenario(overload_rate=1.0)) as server:
+            assert _service(mock_notifier, server).login("alice", "secret") is False
+            assert server.stats.snapshot()["outcomes"]["overload"] == 1
+
+        assert "系統資源使用過多" in mock_notifier.send_urgent.call_args[0][0]
+
+    def test_too_often_disconnects(self, mock_notifier):
+        with FakePTTServer(FakePTTScenario(too_often_rate=1.0)) as server:
+            assert _service(mock_notifier, server).login("alice", "secret") is False
+            assert server.stats.snapshot()["outcomes"]["too_often"] == 1
+
+    def test_hang_never_answers(self):
+        with FakePTTServer(FakePTTScenario(hang_rate=1.0)) as server:
+            with connect(f"ws://127.0.0.1:{server.port}/bbs") as websocket:
+                websocket.recv(timeout=1)  # welcome screen
+                websocket.send(b"alice,\rsecret\r")
+                with pytest.raises(TimeoutError):
+                    websocket.recv(timeout=0.3)
+            assert server.stats.snapshot()["outcomes"]["hang"] == 1
+
+    def test_batch_login_concurrency_is_visible_to_server(self, mock_notifier):
+        accounts = [(f"user{i}", "secret") for i in range(4)]
+        scenario = FakePTTScenario(latency=Latency("fixed", 20))
+        with FakePTTServer(scenario) as server:
+            results = _service(mock_notifier, server, max_concurrency=2).batch_login(accounts)
+            stats = server.stats.snapshot()
+
+        assert all(results.values()) and len(results) == 4
+        assert stats["peak_sessions"] <= 2
+        assert stats["get_user_calls"] == 4
+
+    def test_lean_login_skips_get_user(self, mock_notifier):
+        with FakePTTServer() as server:
+            service = _service(mock_notifier, server, lean_login=True)
+            assert service.login("alice", "secret", send_notification=False) is True
+            assert server.stats.snapshot()["get_user_calls"] == 0
@@ -0,0 +1,38 @@
+"""Tests for the persistent daily sign-in ledger."""
+
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+from pttautosign.utils.ledger import SignInLedger
+
+
+def test_record_and_query_today(tmp_path):
+    ledger = SignInLedger(str(tmp_path / "data" / "ledger.sqlite3"))
+    ledger.record("alice")
+    assert ledger.signed_in_today(["alice", "bob"]) == {"alice"}
+
+
+def test_survives_reopen(tmp_path):
+    path = str(tmp_path / "ledger.sqlite3")
+    first = SignInLedger(path)
+    first.record("alice")
+    first.close()
+    assert SignInLedger(path).signed_in_today(["alice"]) == {"alice"}
+
+
+def test_previous_day_is_not_today(tmp_path):
+    path = str(tmp_path / "ledger.sqlite3")
+    ledger = SignInLedger(path, tz=timezone(timedelta(hours=8)))
+    ledger.record("alice")
+    yesterday = (datetime.now(ledger.tz).date() - timedelta(days=1)).isoformat()
+    ledger._conn.execute("UPDATE signins SET day = ?", (yesterday,))
+    ledger._conn.commit()
+    assert ledger.signed_in_today(["alice"]) == set()
+
+
+def test_errors_are_swallowed(tmp_path, caplog):
+    ledger = SignInLedger(str(tmp_path / "ledger.sqlite3"))
+    ledger._conn = sqlite3.connect(":memory:")  # no signins table
+    ledger.record("alice")
+    assert ledger.signed_in_today(["alice"]) == set()
+    assert "簽到紀錄" in caplog.text
@@ -0,0 +1,149 @@
+"""Tests for the rotating, compressing log file handler."""
+
+import glob
+import gzip
+import logging
+import os
+import time
+
+import pytest
+
+from pttautosign.utils.config import LogConfig
+from pttautosign.utils.log_file import CompressingRotatingFileHandler, _next_boundary
+from pttautosign.utils.logger import setup_logging
+
+
+def _record(msg: str, created: float = None) -> logging.LogRecord:
+    record = logging.LogRecord("pttautosign.test", logging.INFO, "path", 1, msg, None, None)
+    if created is not None:
+        record.created = created
+    return record
+
+
+@pytest.fixture
+def handler_factory(tmp_path):
+    handlers = []
+
+    def make(**kwargs):
+        handler = CompressingRotatingFileHandler(str(tmp_path / "logs" / "app.log"), **kwargs)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        handlers.append(handler)
+        return handler
+
+    yield make
+    for handler in handlers:
+        handler.close()
+
+
+def _segments(tmp_path):
+    return sorted(glob.glob(str(tmp_path / "logs" / "app.log.*")))
+
+
+def test_rotates_by_size_and_compresses_in_background(tmp_path, handler_factory):
+    handler = handler_factory(max_bytes=100)
+    for i in range(10):
+        handler.emit(_record(f"line {i} " + "x" * 40))
+    assert handler.wait_for_compression(5)
+
+    segments = _segments(tmp_path)
+    assert segments and all(path.endswith(".gz") for path in segments)
+    lines = []
+    for path in segments:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            lines += f.read().splitlines()
+    with open(tmp_path / "logs" / "app.log", encoding="utf-8") as f:
+        lines += f.read().splitlines()
+    assert [line.split()[1] for line in lines] == [str(i) for i in range(10)]
+
+
+def test_rotates_at_time_boundary(tmp_path, handler_factory):
+    handler = handler_factory(when="hourly")
+    handler.emit(_record("before"))
+    handler.emit(_record("after", created=time.time() + 3600))
+    assert handler.wait_for_compression(5)
+
+    (segment,) = _segments(tmp_path)
+    with gzip.open(segment, "rt", encoding="utf-8") as f:
+        assert f.read() == "before\n"
+
+
+def test_retention_keeps_newest_segments_within_cap(tmp_path, handler_factory):
+    handler = handler_factory(max_bytes=1, retention_bytes=200)
+    for i in range(20):
+        handler.emit(_record(os.urandom(100).hex()))
+    assert handler.wait_for_compression(5)
+
+    segments = _segments(tmp_path)
+    assert sum(os.path.getsize(path) for path in segments) <= 200
+    assert 0 < len(segments) < 19
+
+
+def test_leftover_segments_compressed_on_start(tmp_path, handler_factory):
+    os.makedirs(tmp_path / "logs")
+    with open(tmp_path / "logs" / "app.log.20260101-000000-000", "w") as f:
+        f.write("old\n")
+    with open(tmp_path / "logs" / "app.log.20260101-000000-000.gz.tmp", "w") as f:
+        f.write("partial")
+
+    handler = handler_factory()
+    assert handler.wait_for_compression(5)
+
+    assert _segments(tmp_path) == [str(tmp_path / "logs" / "app.log.20260101-000000-000.gz")]
+
+
+def test_unrelated_files_are_left_alone(tmp_path, handler_factory):
+    os.makedirs(tmp_path / "logs")
+    others = ["app.log.bak", "app.log.1", "app.log.20260101", "app.log.old.gz.tmp"]
+    for name in others:
+        (tmp_path / "logs" / name).write_bytes(os.urandom(500))
+
+    handler = handler_factory(max_bytes=1, retention_bytes=100)
+    for i in range(5):
+        handler.emit(_record(os.urandom(100).hex()))
+    assert handler.wait_for_compression(5)
+
+    for name in others:
+        assert (tmp_path / "logs" / name).stat().st_size == 500
+
+
+def test_retention_counts_uncompressed_segments(tmp_path, handler_factory):
+    handler = handler_factory(retention_bytes=300)
+    assert handler.wait_for_compression(5)
+    logs = tmp_path / "logs"
+    (logs / "app.log.20260101-000000-000.gz").write_bytes(b"x" * 200)
+    (logs / "app.log.20260102-000000-000").write_bytes(b"y" * 200)
+
+    handler._prune()
+
+    assert _segments(tmp_path) == [str(logs / "app.log.20260102-000000-000")]
+
+
+def test_next_boundary():
+    now = time.time()
+    assert _next_boundary("", now) == float("inf")
+    assert 0 < _next_boundary("hourly", now) - now <= 3600
+    assert 0 < _next_boundary("daily", now) - now <= 25 * 3600
+
+
+def test_setup_logging_writes_plain_lines_to_log_file(tmp_path):
+    path = tmp_path / "app.log"
+    try:
+        setup_logging(LogConfig(log_level=logging.INFO, log_file=str(path)))
+        logging.getLogger("pttautosign.utils.ptt").warning("帳號 x 登入失敗")
+    finally:
+        setup_logging(LogConfig())
+    content = path.read_text(encoding="utf-8")
+    assert "[utils.ptt] WARNING: 帳號 x 登入失敗" in content
+    assert "\x1b[" not in content
+
+
+def test_rate_limit_counts_each_record_once_with_file_sink(tmp_path, capsys):
+    path = tmp_path / "app.log"
+    try:
+        setup_logging(LogConfig(log_level=logging.INFO, log_file=str(path), rate_limit_burst=3))
+        for i in range(3):
+            logging.getLogger("pttautosign.test").error(f"failure {i}")
+    finally:
+        setup_logging(LogConfig())
+    assert path.read_text(encoding="utf-8").count("failure") == 3
+    assert capsys.readouterr().err.count("failure") == 3
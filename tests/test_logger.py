@@ -2,6 +2,8 @@
 
 import logging
 
+import pytest
+
 from pttautosign.utils.config import LogConfig
 from pttautosign.utils.logger import setup_logging
 
@@ -34,3 +36,244 @@ def test_short_name_unchanged_for_shallow_loggers():
     formatter.format(record)
 
     assert record.name == "a.b"
+
+
+def test_no_color_when_stream_is_not_a_tty():
+    # pytest captures stderr, so it is not a terminal.
+    assert _color_formatter().use_color is False
+
+
+def test_use_color_needs_a_tty_and_no_no_color(monkeypatch):
+    from pttautosign.utils.logger import _use_color
+
+    class Tty:
+        def isatty(self):
+            return True
+
+    assert _use_color(Tty()) is True
+    monkeypatch.setenv("NO_COLOR", "1")
+    assert _use_color(Tty()) is False
+
+
+def test_rendered_names_and_times_are_cached():
+    from pttautosign.utils.logger import ColorShortNameFormatter
+
+    formatter = ColorShortNameFormatter(
+        "%(asctime)s %(levelname)s [%(name)s] %(message)s", datefmt="%H:%M:%S", use_color=True
+    )
+    first = logging.LogRecord("a.b.c.d", logging.WARNING, "path", 1, "one", None, None)
+    second = logging.LogRecord("a.b.c.d", logging.WARNING, "path", 1, "two", None, None)
+    second.created = first.created
+
+    line = formatter.format(first)
+    assert formatter.format(second) == line.replace("one", "two")
+    assert "\033[33mWARNING\033[0m" in line
+    assert formatter._names == {"a.b.c.d": "c.d"}
+
+    second.created = first.created + 1
+    assert formatter.format(second) != line.replace("one", "two")
+
+
+class TestAsyncLogging:
+    def teardown_method(self):
+        setup_logging(LogConfig())
+
+    def test_records_go_through_queue_listener(self):
+        from logging.handlers import QueueHandler
+
+        setup_logging(LogConfig(log_level=logging.INFO, async_logging=True))
+        assert isinstance(logging.getLogger().handlers[0], QueueHandler)
+
+    def test_shutdown_writes_queued_records(self, capsys):
+        from pttautosign.utils.logger import shutdown_logging
+
+        setup_logging(LogConfig(log_level=logging.INFO, async_logging=True, rate_limit_burst=0))
+        for i in range(100):
+            logging.getLogger("pttautosign.test").info(f"record {i}")
+        shutdown_logging()
+        err = capsys.readouterr().err
+        assert "record 0" in err and "record 99" in err
+
+    def test_log_calls_do_not_wait_for_a_slow_consumer(self):
+        import threading
+        import time
+
+        setup_logging(LogConfig(log_level=logging.INFO, async_logging=True))
+        gate = threading.Event()
+        slow = logging.StreamHandler()
+        slow.emit = lambda record: gate.wait(5)
+        from pttautosign.utils import logger as logger_module
+
+        logger_module._listener.handlers = (slow,)
+        started = time.perf_counter()
+        for i in range(50):
+            logging.getLogger("pttautosign.test").info("x")
+        elapsed = time.perf_counter() - started
+        gate.set()
+        assert elapsed < 1.0
+
+
+class TestJsonLogging:
+    def teardown_method(self):
+        setup_logging(LogConfig())
+
+    def _records(self, capsys):
+        import json
+
+        return [json.loads(line) for line in capsys.readouterr().err.splitlines()]
+
+    def test_one_json_object_per_record_without_colors(self, capsys):
+        setup_logging(LogConfig(log_level=logging.INFO, log_format="json"))
+        logging.getLogger("pttautosign.test").error("失敗")
+        err = capsys.readouterr().err
+        assert "\x1b[" not in err
+        import json
+
+        (record,) = [json.loads(line) for line in err.splitlines()]
+        assert record["level"] == "ERROR"
+        assert record["logger"] == "pttautosign.test"
+        assert record["msg"] == "失敗"
+        assert record["run_id"]
+        assert "account" not in record
+
+    def test_account_is_redacted_and_attempt_context_included(self, capsys):
+        from pttautosign.utils import log_context
+
+        setup_logging(LogConfig(log_level=logging.INFO, log_format="json"))
+        with log_context.attempt("Alice", 2), log_context.phase("auth"):
+            logging.getLogger("pttautosign.test").info("帳號 Alice 登入中")
+        (record,) = self._records(capsys)
+        pseudonym = log_context.account_id("alice")
+        assert record["account"] == pseudonym
+        assert record["msg"] == f"帳號 {pseudonym} 登入中"
+        assert record["attempt"] == 2
+        assert record["phase"] == "auth"
+        assert record["elapsed_ms"] >= 0
+
+    def test_extra_fields_included_and_listed_accounts_redacted(self, capsys):
+        setup_logging(LogConfig(log_level=logging.INFO, log_format="json"))
+        logging.getLogger("pttautosign.test").warning(
+            "失敗帳號：bob", extra={"event": "batch_summary", "failed": 1, "_accounts": ["bob"]}
+        )
+        (record,) = self._records(capsys)
+        assert record["event"] == "batch_summary"
+        assert record["failed"] == 1
+        assert "bob" not in record["msg"]
+        assert "_accounts" not in record
+
+    def test_only_whole_usernames_are_redacted(self, capsys):
+        from pttautosign.utils import log_context
+
+        setup_logging(LogConfig(log_level=logging.INFO, log_format="json"))
+        with log_context.attempt("a"):
+            logging.getLogger("pttautosign.test").info("帳號 a 登入失敗：password mismatch")
+        (record,) = self._records(capsys)
+        assert record["msg"] == f"帳號 {log_context.account_id('a')} 登入失敗：password mismatch"
+
+    def test_run_id_is_created_lazily_without_touching_the_environment(self, monkeypatch):
+        import os
+
+        from pttautosign.utils import log_context
+
+        monkeypatch.setattr(log_context, "_run_id", None)
+        first = log_context.run_id()
+        assert first and log_context.run_id() == first
+        assert "PTTAUTOSIGN_RUN_ID" not in os.environ
+
+    @pytest.mark.parametrize("engine", ["thread", "async"])
+    def test_batch_logs_no_username(self, engine, capsys, mock_notifier):
+        from pttautosign.utils.factory import login_service_class
+        from pttautosign.testing.fake_ptt import FakePTTScenario, FakePTTServer
+        from pttautosign.utils.config import PTTConfig
+
+        setup_logging(LogConfig(log_level=logging.DEBUG, log_format="json"))
+        scenario = FakePTTScenario(passwords={"alice": "secret", "bob": "secret"})
+        with FakePTTServer(scenario) as server:
+            config = PTTConfig(host="localhost", port=server.port, max_retries=0, max_concurrency=2)
+            service = login_service_class(engine)(mock_notifier, config)
+            results = service.batch_login([("alice", "secret"), ("bob", "wrong")])
+
+        assert results == {"alice": True, "bob": False}
+        records = self._records(capsys)
+        assert any(record.get("account") for record in records)
+        for record in records:
+            assert "alice" not in record["msg"] and "bob" not in record["msg"]
+
+    def test_async_mode_keeps_caller_context(self, capsys):
+        from pttautosign.utils import log_context
+        from pttautosign.utils.logger import shutdown_logging
+
+        setup_logging(LogConfig(log_level=logging.INFO, log_format="json", async_logging=True))
+        with log_context.attempt("carol", 1):
+            logging.getLogger("pttautosign.test").info("in attempt")
+        shutdown_logging()
+        (record,) = self._records(capsys)
+        assert record["account"] == log_context.account_id("carol")
+        assert record["attempt"] == 1
+
+
+class TestRateLimitFilter:
+    def _filter(self, burst=2, window=10.0):
+        from pttautosign.utils.logger import RateLimitFilter
+
+        self.now = 0.0
+        return RateLimitFilter(burst, window, clock=lambda: self.now)
+
+    def _record(self, lineno=1, msg="帳號 x 登入失敗"):
+        return logging.LogRecord("pttautosign.test", logging.ERROR, "path", lineno, msg, None, None)
+
+    def test_limits_records_per_call_site(self):
+        rate_filter = self._filter(burst=2)
+        assert [rate_filter.filter(self._record(msg=f"帳號 u{i} 登入失敗")) for i in range(4)] == [
+            True, True, False, False
+        ]
+        # Another call site has its own budget.
+        assert rate_filter.filter(self._record(lineno=2)) is True
+
+    def test_summary_after_window(self, caplog):
+        rate_filter = self._filter(burst=1, window=10.0)
+        for _ in range(4):
+            rate_filter.filter(self._record())
+        self.now = 10.0
+        with caplog.at_level(logging.ERROR):
+            assert rate_filter.filter(self._record()) is True
+        (summary,) = caplog.records
+        assert "已略過 3 筆類似 Log" in summary.getMessage()
+        assert summary.suppressed == 3
+        assert summary.name == "pttautosign.test"
+
+    def test_flush_logs_pending_summaries(self, caplog):
+        rate_filter = self._filter(burst=1)
+        rate_filter.filter(self._record())
+        rate_filter.filter(self._record())
+        with caplog.at_level(logging.ERROR):
+            rate_filter.flush()
+            rate_filter.flush()
+        assert [record.suppressed for record in caplog.records] == [1]
+
+    def test_setup_logging_installs_filter_from_config(self, capsys):
+        from pttautosign.utils.logger import shutdown_logging
+
+        setup_logging(LogConfig(log_level=logging.INFO, rate_limit_burst=3))
+        for i in range(10):
+            logging.getLogger("pttautosign.test").error(f"帳號 u{i} 登入失敗")
+        shutdown_logging()
+        lines = capsys.readouterr().err.splitlines()
+        assert len(lines) == 4
+        assert "已略過 7 筆類似 Log" in lines[-1]
+        setup_logging(LogConfig())
+
+    def test_disabled_with_zero_burst(self):
+        from pttautosign.utils import logger
+
+        setup_logging(LogConfig(rate_limit_burst=0))
+        assert logger._rate_limiter is None
+        assert not logging.getLogger().handlers[0].filters
+        setup_logging(LogConfig())
+
+
+def test_format_accounts_caps_the_list():
+    from pttautosign.utils.logger import format_accounts
+
+    assert format_accounts(["a", "b"], limit=3) == "a, b"
+    assert format_accounts([f"u{i}" for i in range(5)], limit=2) == "u0, u1 等 5 個帳號"
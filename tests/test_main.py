@@ -18,6 +18,10 @@ class TestParseArgs:
         monkeypatch.setattr(sys, "argv", ["pttautosign", "--test-login"])
         assert parse_args().test_login is True
 
+    def test_force_flag(self, monkeypatch):
+        monkeypatch.setattr(sys, "argv", ["pttautosign", "--force"])
+        assert parse_args().force is True
+
 
 class TestRunTestLogin:
     def _ctx(self, accounts, results):
@@ -56,7 +60,8 @@ class TestMain:
         main()
         ctx = mock_ctx_cls.return_value
         ctx.initialize.assert_called_once()
-        ctx.run.assert_called_once()
+        ctx.run.assert_called_once_with(force=False)
+        ctx.close.assert_called_once()
 
     @patch(_PATCH_PATCHES, return_value=True)
     @patch(_PATCH_DOTENV)
@@ -88,6 +93,7 @@ class TestMain:
         with pytest.raises(SystemExit) as exc:
             main()
         assert exc.value.code == 1
+        mock_ctx_cls.return_value.close.assert_called_once()
 
     @patch(_PATCH_PATCHES, return_value=False)
     @patch(_PATCH_DOTENV)
@@ -99,3 +105,23 @@ class TestMain:
         with caplog.at_level("WARNING"):
             main()
         assert any("修補" in r.getMessage() for r in caplog.records)
+
+    @patch(_PATCH_CTX)
+    @patch("pttautosign.benchmarks.cli.main", return_value=0)
+    def test_bench_subcommand_dispatches(self, mock_bench, mock_ctx_cls, monkeypatch):
+        monkeypatch.setattr(sys, "argv", ["pttautosign", "bench", "--quick"])
+        with pytest.raises(SystemExit) as exc:
+            main()
+        assert exc.value.code == 0
+        mock_bench.assert_called_once_with(["--quick"])
+        mock_ctx_cls.assert_not_called()
+
+    @patch(_PATCH_CTX)
+    @patch("pttautosign.benchmarks.startup.main", return_value=1)
+    def test_profile_startup_dispatches(self, mock_profile, mock_ctx_cls, monkeypatch):
+        monkeypatch.setattr(sys, "argv", ["pttautosign", "--profile-startup", "--startup-budget-ms", "250"])
+        with pytest.raises(SystemExit) as exc:
+            main()
+        assert exc.value.code == 1
+        mock_profile.assert_called_once_with(budget_ms=250.0)
+        mock_ctx_cls.assert_not_called()
@@ -0,0 +1,48 @@
+"""Tests for latency instrumentation."""
+
+from pttautosign.utils.metrics import AttemptTiming, BatchResult, LatencyHistogram, PhaseTimer
+
+
+def test_phase_timer_accumulates():
+    timer = PhaseTimer()
+    with timer.phase("auth"):
+        pass
+    timer.add("auth", 5)
+    assert timer.phases["auth"] >= 5
+    assert timer.total_ms == timer.phases["auth"]
+
+
+def test_histogram_percentiles_use_nearest_rank():
+    histogram = LatencyHistogram()
+    for value in range(1, 101):
+        histogram.add(value)
+    summary = histogram.summary()
+    assert summary == {"count": 100, "p50": 50, "p95": 95, "p99": 99, "max": 100}
+
+
+def test_empty_histogram():
+    assert LatencyHistogram().summary() == {"count": 0}
+    assert LatencyHistogram().percentile(50) is None
+
+
+def test_batch_result_is_a_plain_mapping_with_timings():
+    result = BatchResult({"a": True})
+    result.record_attempt(AttemptTiming("a", 0, "retry", {"auth": 10.0}))
+    result.record_attempt(AttemptTiming("a", 1, "success", {"auth": 20.0, "notify": 5.0}))
+    assert result == {"a": True}
+    histograms = result.histograms()
+    assert list(histograms) == ["auth", "notify", "attempt"]
+    assert histograms["attempt"].summary()["max"] == 25.0
+    assert result.account_totals() == {"a": 35.0}
+
+
+def test_phase_timer_sets_log_context_phase():
+    from pttautosign.utils import log_context
+
+    timer = PhaseTimer()
+    with log_context.attempt("alice", 1):
+        with timer.phase("connect"):
+            assert log_context.current().phase == "connect"
+            assert log_context.current().account == "alice"
+        assert log_context.current().phase is None
+    assert log_context.current().account is None
@@ -0,0 +1,41 @@
+"""Tests for the persistent notification outbox."""
+
+from pttautosign.utils.outbox import NotificationOutbox, message_key
+
+
+def test_add_and_list_pending_in_order(tmp_path):
+    outbox = NotificationOutbox(str(tmp_path / "data" / "outbox.sqlite3"))
+    assert outbox.add("first") is True
+    assert outbox.add("second", "markdown") is True
+    assert [(text, mode) for _, text, mode in outbox.pending()] == [("first", "html"), ("second", "markdown")]
+
+
+def test_duplicate_messages_are_stored_once(tmp_path):
+    outbox = NotificationOutbox(str(tmp_path / "outbox.sqlite3"))
+    assert outbox.add("same") is True
+    assert outbox.add("same") is False
+    assert len(outbox.pending()) == 1
+
+
+def test_remove_by_key(tmp_path):
+    outbox = NotificationOutbox(str(tmp_path / "outbox.sqlite3"))
+    outbox.add("a")
+    outbox.add("b")
+    outbox.remove(message_key("a"))
+    assert [text for _, text, _ in outbox.pending()] == ["b"]
+
+
+def test_survives_reopen(tmp_path):
+    path = str(tmp_path / "outbox.sqlite3")
+    first = NotificationOutbox(path)
+    first.add("kept")
+    first.close()
+    assert [text for _, text, _ in NotificationOutbox(path).pending()] == ["kept"]
+
+
+def test_unwritable_path_is_swallowed(tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("x")
+    outbox = NotificationOutbox(str(blocker / "outbox.sqlite3"))
+    assert outbox.add("x") is False
+    assert outbox.pending() == []
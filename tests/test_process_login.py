@@ -0,0 +1,70 @@
+"""Tests for the process-isolated login engine (driven against the fake PTT server)."""
+
+from PyPtt import exceptions as PTT_exceptions
+
+from pttautosign.testing.fake_ptt import FakePTTScenario, FakePTTServer
+from pttautosign.utils.config import PTTConfig
+from pttautosign.utils.process_login import ProcessLoginService, _describe_exception, _rebuild_exception
+
+
+def _service(notifier, server, **overrides):
+    options = dict(host="localhost", port=server.port, max_retries=0, login_engine="process")
+    options.update(overrides)
+    return ProcessLoginService(notifier, PTTConfig(**options))
+
+
+class TestExceptionTransport:
+    def test_pyptt_exception_round_trip(self):
+        error = PTT_exceptions.WrongIDorPassword.__new__(PTT_exceptions.WrongIDorPassword)
+        error.message = "wrong"
+        rebuilt = _rebuild_exception(_describe_exception(error, "secret"))
+        assert type(rebuilt) is PTT_exceptions.WrongIDorPassword
+        assert rebuilt.message == "wrong"
+
+    def test_unknown_class_falls_back_to_runtime_error(self):
+        rebuilt = _rebuild_exception(("no.such.module", "Boom", (), {}, "pw=***"))
+        assert isinstance(rebuilt, RuntimeError)
+        assert "Boom" in str(rebuilt)
+
+    def test_password_is_masked_in_text(self):
+        description = _describe_exception(ValueError("bad password hunter2"), "hunter2")
+        assert "hunter2" not in description[4]
+
+
+class TestProcessLoginService:
+    def test_login_runs_in_worker(self, mock_notifier):
+        with FakePTTServer() as server:
+            service = _service(mock_notifier, server)
+            assert service.login("alice", "secret") is True
+        assert "登入天數: 1 天" in mock_notifier.send_message.call_args[0][0]
+        assert service.pool is None  # workers are stopped after the call
+
+    def test_session_error_is_rebuilt_in_parent(self, mock_notifier):
+        with FakePTTServer(FakePTTScenario(passwords={"alice": "secret"})) as server:
+            assert _service(mock_notifier, server).login("alice", "wrong") is False
+        assert "帳號或密碼錯誤" in mock_notifier.send_urgent.call_args[0][0]
+
+    def test_hung_session_is_killed_at_deadline(self, mock_notifier):
+        with FakePTTServer(FakePTTScenario(hang_rate=1.0)) as server:
+            service = _service(mock_notifier, server, connection_timeout=1)
+            results = service.batch_login([("alice", "secret")])
+        assert results == {"alice": False}
+        assert any(t.phases.get("dispatch", 0) >= 1000 for t in results.attempts)
+
+    def test_workers_are_recycled(self, mock_notifier, monkeypatch):
+        spawned = []
+        with FakePTTServer() as server:
+            service = _service(mock_notifier, server, max_concurrency=1, worker_max_logins=1)
+            original_run = ProcessLoginService._run_session
+
+            def spy(self, *args, **kwargs):
+                try:
+                    return original_run(self, *args, **kwargs)
+                finally:
+                    spawned.append(self.pool.spawned)
+
+            monkeypatch.setattr(ProcessLoginService, "_run_session", spy)
+            results = service.batch_login([("alice", "secret"), ("bob", "secret")])
+        assert all(results.values())
+        assert spawned == [1, 2]
+
@@ -52,6 +52,11 @@ class TestFormatSuccessMessage:
         msg = PTTAutoSign(notifier)._format_success_message("x", {"login_count": 1})
         assert "登入成功" in msg
 
+    def test_missing_fields_are_omitted(self, notifier):
+        msg = PTTAutoSign(notifier)._format_success_message("x", {})
+        assert "登入天數" not in msg
+        assert "📫" not in msg
+
 
 class TestFormatErrorMessage:
     def test_known_error_uses_mapped_message(self, notifier):
@@ -87,6 +92,13 @@ class TestLogin:
         assert signer.login("alice", "bad") is False
         assert api.login.call_count == 1
 
+    @patch("pttautosign.utils.ptt.PTT")
+    def test_failure_notification_uses_urgent_lane(self, mock_ptt, notifier):
+        mock_ptt.API.return_value.login.side_effect = _exc(PTT_exceptions.WrongPassword)
+        self._signer(notifier).login("alice", "bad")
+        notifier.send_urgent.assert_called_once()
+        notifier.send_message.assert_not_called()
+
     @patch("pttautosign.utils.ptt.time.sleep")
     @patch("pttautosign.utils.ptt.PTT")
     def test_login_too_often_retries_then_fails(self, mock_ptt, _sleep, notifier):
@@ -117,13 +129,232 @@ class TestBatchLogin:
     def test_empty_accounts_returns_empty(self, notifier):
         assert PTTAutoSign(notifier).batch_login([]) == {}
 
-    @patch.object(PTTAutoSign, "login", return_value=True)
-    def test_aggregates_results(self, _mock_login, notifier):
+    @patch.object(PTTAutoSign, "_attempt_login", return_value=True)
+    def test_aggregates_results(self, _mock_attempt, notifier):
         results = PTTAutoSign(notifier).batch_login([("a", "1"), ("b", "2")])
         assert results == {"a": True, "b": True}
 
-    @patch.object(PTTAutoSign, "login")
-    def test_mixed_results(self, mock_login, notifier):
-        mock_login.side_effect = lambda u, p: u == "good"
+    @patch.object(PTTAutoSign, "_attempt_login")
+    def test_mixed_results(self, mock_attempt, notifier):
+        mock_attempt.side_effect = lambda u, p, attempt, **kw: u == "good"
         results = PTTAutoSign(notifier).batch_login([("good", "1"), ("bad", "2")])
         assert results == {"good": True, "bad": False}
+
+    @patch.object(PTTAutoSign, "_attempt_login")
+    def test_worker_exception_marks_account_failed(self, mock_attempt, notifier):
+        mock_attempt.side_effect = RuntimeError("boom")
+        assert PTTAutoSign(notifier).batch_login([("a", "1")]) == {"a": False}
+
+    @patch.object(PTTAutoSign, "_attempt_login")
+    def test_backoff_does_not_hold_worker(self, mock_attempt, notifier):
+        # One worker: "slow" keeps failing with a 0.3 s backoff; the other
+        # accounts must be processed while it waits, not after.
+        order = []
+
+        def attempt(user, password, attempt, **kw):
+            order.append((user, attempt))
+            if user == "slow":
+                return None if attempt < 1 else True
+            return True
+
+        mock_attempt.side_effect = attempt
+        signer = PTTAutoSign(notifier, PTTConfig(max_concurrency=1, retry_delay=1, max_retries=1))
+        with patch.object(PTTAutoSign, "_backoff", return_value=0.3):
+            results = signer.batch_login([("slow", "1"), ("a", "2"), ("b", "3")])
+        assert results == {"slow": True, "a": True, "b": True}
+        assert order == [("slow", 0), ("a", 0), ("b", 0), ("slow", 1)]
+
+    @patch.object(PTTAutoSign, "_batch_timeout", return_value=0.05)
+    @patch.object(PTTAutoSign, "_attempt_login")
+    def test_batch_timeout_marks_pending_failed(self, mock_attempt, _timeout, notifier):
+        import time
+
+        mock_attempt.side_effect = lambda u, p, attempt, **kw: time.sleep(0.3) or True
+        results = PTTAutoSign(notifier).batch_login([("slow", "1")])
+        assert results == {"slow": False}
+
+    def test_batch_timeout_is_capped(self, notifier):
+        signer = PTTAutoSign(notifier, PTTConfig(max_concurrency=1, max_batch_timeout=600))
+        assert signer._batch_timeout(1) < 600
+        assert signer._batch_timeout(1000) == 600
+        uncapped = PTTAutoSign(notifier, PTTConfig(max_concurrency=1, max_batch_timeout=0))
+        assert uncapped._batch_timeout(1000) == 1000 * uncapped._batch_timeout(1)
+
+    @patch.object(PTTAutoSign, "_attempt_login", return_value=True)
+    def test_flushes_notifications_at_end(self, _mock_attempt, notifier):
+        PTTAutoSign(notifier).batch_login([("a", "1")])
+        notifier.flush.assert_called_once_with()
+
+    @patch.object(PTTAutoSign, "_attempt_login", return_value=True)
+    def test_no_flush_when_notifications_disabled(self, _mock_attempt, notifier):
+        PTTAutoSign(notifier, disable_notifications=True).batch_login([("a", "1")])
+        notifier.flush.assert_not_called()
+
+
+class TestAdaptiveConcurrency:
+    def _signer(self, notifier):
+        config = PTTConfig(
+            max_retries=2, retry_delay=0, adaptive_concurrency=True, min_concurrency=2, max_concurrency=8
+        )
+        return PTTAutoSign(notifier, config)
+
+    def test_disabled_by_default(self, notifier):
+        assert PTTAutoSign(notifier).concurrency is None
+
+    @patch("pttautosign.utils.ptt.PTT")
+    def test_success_grows_window(self, mock_ptt, notifier):
+        mock_ptt.API.return_value.get_user.return_value = {"login_count": 1, "mail": ""}
+        signer = self._signer(notifier)
+        for _ in range(3):
+            signer.login("alice", "pw", send_notification=False)
+        assert signer.concurrency.window == 3
+
+    @patch("pttautosign.utils.ptt.time.sleep")
+    @patch("pttautosign.utils.ptt.PTT")
+    def test_throttling_error_shrinks_window(self, mock_ptt, _sleep, notifier):
+        mock_ptt.API.return_value.login.side_effect = _exc(PTT_exceptions.UseTooManyResources)
+        signer = self._signer(notifier)
+        signer.concurrency.record_success()
+        signer.concurrency.record_success()
+        signer.login("alice", "pw", send_notification=False)
+        assert signer.concurrency.window == 2
+        assert signer.concurrency.snapshot()["decreases"] >= 1
+        assert signer.concurrency.in_flight == 0
+
+
+class TestLoginRateLimit:
+    def test_disabled_by_default(self, notifier):
+        assert PTTAutoSign(notifier).rate_limiter is None
+
+    @patch("pttautosign.utils.ptt.time.sleep")
+    @patch("pttautosign.utils.ptt.PTT")
+    def test_every_attempt_takes_a_token(self, mock_ptt, _sleep, notifier):
+        mock_ptt.API.return_value.login.side_effect = _exc(PTT_exceptions.LoginTooOften)
+        signer = PTTAutoSign(notifier, PTTConfig(max_retries=2, retry_delay=0, login_rate=5, login_burst=2))
+        with patch.object(signer.rate_limiter, "acquire", return_value=0) as acquire:
+            signer.login("alice", "pw", send_notification=False)
+        # Retries go through the limiter too: one token per attempt.
+        assert acquire.call_count == 3
+
+    def test_batch_starts_stay_within_limit(self, notifier):
+        import time
+
+        config = PTTConfig(
+            adaptive_concurrency=True, min_concurrency=1, max_concurrency=4,
+            login_rate=20, login_burst=1, retry_delay=0,
+        )
+        signer = PTTAutoSign(notifier, config)
+        t0 = time.monotonic()
+        starts = []
+
+        def attempt(username, password, attempt, send_notification=True, timings=None):
+            starts.append(time.monotonic())
+            # The first attempts end together, so slots free up in a bunch;
+            # workers must not start on tokens taken while waiting for one.
+            time.sleep(max(0.0, t0 + 0.5 - time.monotonic()))
+            return True
+
+        with patch.object(signer, "_attempt_login", side_effect=attempt):
+            results = signer.batch_login([(f"u{i}", "p") for i in range(8)])
+        assert all(results.values())
+        starts.sort()
+        for i in range(len(starts)):
+            for j in range(i + 1, len(starts)):
+                assert j - i + 1 <= 1 + 20 * (starts[j] - starts[i] + 0.02), starts
+
+
+class TestSignInLedger:
+    def _signer(self, notifier, tmp_path):
+        config = PTTConfig(retry_delay=0, ledger_path=str(tmp_path / "ledger.sqlite3"))
+        return PTTAutoSign(notifier, config)
+
+    @patch("pttautosign.utils.ptt.PTT")
+    def test_success_is_recorded(self, mock_ptt, notifier, tmp_path):
+        mock_ptt.API.return_value.get_user.return_value = {"login_count": 1, "mail": ""}
+        signer = self._signer(notifier, tmp_path)
+        signer.login("alice", "pw", send_notification=False)
+        assert signer.ledger.signed_in_today(["alice", "bob"]) == {"alice"}
+
+    @patch.object(PTTAutoSign, "_attempt_login", return_value=True)
+    def test_batch_skips_accounts_signed_in_today(self, mock_attempt, notifier, tmp_path):
+        signer = self._signer(notifier, tmp_path)
+        signer.ledger.record("alice")
+        results = signer.batch_login([("alice", "1"), ("bob", "2")])
+        assert results == {"alice": True, "bob": True}
+        assert [c.args[0] for c in mock_attempt.call_args_list] == ["bob"]
+
+    @patch.object(PTTAutoSign, "_attempt_login", return_value=True)
+    def test_force_ignores_ledger(self, mock_attempt, notifier, tmp_path):
+        signer = self._signer(notifier, tmp_path)
+        signer.ledger.record("alice")
+        signer.batch_login([("alice", "1")], force=True)
+        assert mock_attempt.call_count == 1
+
+
+class TestLeanLogin:
+    @patch("pttautosign.utils.ptt.PTT")
+    def test_lean_skips_get_user_when_not_notifying(self, mock_ptt, notifier):
+        api = mock_ptt.API.return_value
+        signer = PTTAutoSign(notifier, PTTConfig(lean_login=True), disable_notifications=True)
+        assert signer.login("alice", "pw") is True
+        api.get_user.assert_not_called()
+        api.connect_core.get_screen_queue.assert_not_called()
+
+    @patch("pttautosign.utils.ptt.PTT")
+    def test_lean_reads_mail_hint_from_post_login_screen(self, mock_ptt, notifier):
+        api = mock_ptt.API.return_value
+        api.connect_core.get_screen_queue.return_value = ["【主功能表】 你有新信件\n離開，再見"]
+        signer = PTTAutoSign(notifier, PTTConfig(lean_login=True))
+        assert signer.login("alice", "pw") is True
+        api.get_user.assert_not_called()
+        message = notifier.send_message.call_args[0][0]
+        assert "您有新信件" in message
+        assert "登入天數" not in message
+
+    @patch("pttautosign.utils.ptt.PTT")
+    def test_default_mode_still_fetches_user(self, mock_ptt, notifier):
+        api = mock_ptt.API.return_value
+        api.get_user.return_value = {"login_count": 1, "mail": ""}
+        PTTAutoSign(notifier, PTTConfig(), disable_notifications=True).login("alice", "pw")
+        api.get_user.assert_called_once_with("alice")
+
+
+class TestPhaseTimings:
+    @patch("pttautosign.utils.ptt.PTT")
+    def test_batch_result_carries_phase_histograms(self, mock_ptt, notifier):
+        mock_ptt.API.return_value.get_user.return_value = {"login_count": 1, "mail": ""}
+        results = PTTAutoSign(notifier).batch_login([("a", "1"), ("b", "2")])
+        assert results == {"a": True, "b": True}
+        assert len(results.attempts) == 2
+        histograms = results.histograms()
+        for phase in ("init", "auth", "get_user", "logout", "notify", "attempt"):
+            assert histograms[phase].count == 2
+        assert set(results.account_totals()) == {"a", "b"}
+        assert results.elapsed_ms > 0
+
+    @patch("pttautosign.utils.ptt.PTT")
+    def test_connect_time_is_excluded_from_auth(self, mock_ptt, notifier):
+        import time
+
+        api = mock_ptt.API.return_value
+        api.get_user.return_value = {}
+
+        def login(*args, **kwargs):
+            api.connect_core.connect()
+
+        api.login.side_effect = login
+        api.connect_core.connect.side_effect = lambda: time.sleep(0.05)
+        results = PTTAutoSign(notifier).batch_login([("a", "1")])
+        phases = results.attempts[0].phases
+        assert phases["connect"] >= 40
+        assert phases["auth"] < phases["connect"]
+
+    @patch("pttautosign.utils.ptt.time.sleep")
+    @patch("pttautosign.utils.ptt.PTT")
+    def test_retried_attempts_are_recorded_separately(self, mock_ptt, _sleep, notifier):
+        mock_ptt.API.return_value.login.side_effect = _exc(PTT_exceptions.LoginTooOften)
+        signer = PTTAutoSign(notifier, PTTConfig(max_retries=1, retry_delay=0))
+        with patch.object(PTTAutoSign, "_backoff", return_value=0):
+            results = signer.batch_login([("a", "1")])
+        assert [(t.attempt, t.outcome) for t in results.attempts] == [(0, "retry"), (1, "failure")]
+
@@ -0,0 +1,74 @@
+"""Tests for the token-bucket rate limiter."""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from pttautosign.utils.rate_limit import TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTokenBucket:
+    def test_invalid_parameters_raise(self):
+        with pytest.raises(ValueError):
+            TokenBucket(rate=0)
+        with pytest.raises(ValueError):
+            TokenBucket(rate=1, burst=0)
+
+    def test_burst_is_free_then_spaced_at_rate(self):
+        bucket = TokenBucket(rate=2, burst=3, clock=FakeClock())
+        delays = [bucket.reserve() for _ in range(5)]
+        assert delays[:3] == [0, 0, 0]
+        assert delays[3:] == pytest.approx([0.5, 1.0])
+
+    def test_reservations_are_served_in_order(self):
+        bucket = TokenBucket(rate=1, clock=FakeClock())
+        delays = [bucket.reserve() for _ in range(4)]
+        assert delays == sorted(delays)
+        assert delays == pytest.approx([0, 1, 2, 3])
+
+    def test_bucket_refills_over_time(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=1, burst=2, clock=clock)
+        bucket.reserve()
+        bucket.reserve()
+        clock.now += 10
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == 0
+
+    def test_defer_holds_back_even_a_full_bucket(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=1, burst=3, clock=clock)
+        bucket.defer(5)
+        assert bucket.reserve() == pytest.approx(5)
+        assert bucket.reserve() == pytest.approx(6)
+
+    def test_defer_does_not_shorten_existing_wait(self):
+        bucket = TokenBucket(rate=0.1, clock=FakeClock())
+        bucket.reserve()
+        bucket.defer(1)
+        assert bucket.reserve() == pytest.approx(10)
+
+    @patch("pttautosign.utils.rate_limit.time.sleep")
+    def test_acquire_sleeps_for_reserved_delay(self, mock_sleep):
+        bucket = TokenBucket(rate=1, clock=FakeClock())
+        bucket.acquire()
+        bucket.acquire()
+        mock_sleep.assert_called_once_with(pytest.approx(1.0))
+
+    def test_acquire_async_waits_without_blocking(self):
+        bucket = TokenBucket(rate=1000, burst=1)
+
+        async def take_two():
+            await bucket.acquire_async()
+            return await bucket.acquire_async()
+
+        assert asyncio.run(take_two()) > 0
@@ -0,0 +1,55 @@
+"""Tests for the deadline-ordered retry scheduler."""
+
+import threading
+import time
+
+import pytest
+
+from pttautosign.utils.scheduler import RetryScheduler
+
+
+class TestRetryScheduler:
+    def test_ready_items_are_fifo(self):
+        scheduler = RetryScheduler()
+        for item in ("a", "b", "c"):
+            scheduler.put(item)
+        assert [scheduler.get(), scheduler.get(), scheduler.get()] == ["a", "b", "c"]
+
+    def test_delayed_item_yields_to_ready_items(self):
+        scheduler = RetryScheduler()
+        scheduler.put("later", delay=0.2)
+        scheduler.put("now")
+        assert scheduler.get() == "now"
+        start = time.monotonic()
+        assert scheduler.get() == "later"
+        assert time.monotonic() - start >= 0.1
+
+    def test_get_returns_none_when_all_work_done(self):
+        scheduler = RetryScheduler()
+        scheduler.put("a")
+        scheduler.get()
+        scheduler.task_done()
+        assert scheduler.get() is None
+        assert scheduler.join(timeout=0) is True
+
+    def test_get_times_out(self):
+        scheduler = RetryScheduler()
+        scheduler.put("a", delay=10)
+        assert scheduler.get(timeout=0.01) is None
+
+    def test_close_wakes_waiters(self):
+        scheduler = RetryScheduler()
+        scheduler.put("a", delay=10)
+        got = []
+        waiter = threading.Thread(target=lambda: got.append(scheduler.get()))
+        waiter.start()
+        scheduler.close()
+        waiter.join(timeout=1)
+        assert got == [None]
+        assert scheduler.join(timeout=0) is False
+        with pytest.raises(RuntimeError):
+            scheduler.put("b")
+
+    def test_task_done_underflow_raises(self):
+        with pytest.raises(ValueError):
+            RetryScheduler().task_done()
@@ -1,26 +1,38 @@
 """Tests for the Telegram notification service."""
 
+import json
 from unittest.mock import MagicMock, patch
 
 import pytest
 import requests
 
 from pttautosign.utils.config import TelegramConfig
+from pttautosign.utils.error_throttle import ErrorThrottle
 from pttautosign.utils.telegram import TelegramBot, _redact_context
 
 TOKEN = "123456789:ABCdef_GHI-jkl"
 
 
-def make_bot(**overrides) -> TelegramBot:
-    params = dict(token=TOKEN, chat_id="42", retry_count=3, timeout=10)
+def make_bot(error_throttle=None, **overrides) -> TelegramBot:
+    # Rate limiting is off unless a test turns it on.
+    params = dict(token=TOKEN, chat_id="42", retry_count=3, timeout=10, rate_limit=0, chat_rate_limit=0)
     params.update(overrides)
-    return TelegramBot(TelegramConfig(**params))
+    return TelegramBot(TelegramConfig(**params), error_throttle=error_throttle)
 
 
 def _ok_response() -> MagicMock:
     return MagicMock(raise_for_status=lambda: None)
 
 
+def _error_response(status: int, body=None, headers=None) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status
+    response.url = f"https://api.telegram.org/bot{TOKEN}/sendMessage"
+    response._content = json.dumps(body or {"ok": False, "error_code": status}).encode()
+    response.headers.update(headers or {})
+    return response
+
+
 class TestTokenGuard:
     def test_invalid_token_raises_value_error(self):
         with pytest.raises(ValueError, match="Invalid Telegram bot token"):
@@ -29,16 +41,19 @@ class TestTokenGuard:
     def test_valid_token_constructs(self):
         assert make_bot().api_url.endswith(f"/bot{TOKEN}")
 
+    def test_api_base_is_configurable(self):
+        assert make_bot(api_base="http://127.0.0.1:8081/").api_url == f"http://127.0.0.1:8081/bot{TOKEN}"
+
 
 class TestSendMessage:
-    @patch("pttautosign.utils.telegram.requests.post")
+    @patch("pttautosign.utils.telegram.requests.Session.post")
     def test_success_single_attempt(self, mock_post):
         mock_post.return_value = _ok_response()
         assert make_bot().send_message("hi") is True
         assert mock_post.call_count == 1
 
     @patch("pttautosign.utils.telegram.time.sleep")
-    @patch("pttautosign.utils.telegram.requests.post")
+    @patch("pttautosign.utils.telegram.requests.Session.post")
     def test_retries_then_succeeds(self, mock_post, _sleep):
         failing = MagicMock(
             raise_for_status=MagicMock(
@@ -50,23 +65,169 @@ class TestSendMessage:
         assert mock_post.call_count == 2
 
     @patch("pttautosign.utils.telegram.time.sleep")
-    @patch("pttautosign.utils.telegram.requests.post")
+    @patch("pttautosign.utils.telegram.requests.Session.post")
     def test_all_attempts_fail_returns_false(self, mock_post, _sleep):
         mock_post.side_effect = requests.exceptions.ConnectionError("boom")
         assert make_bot(retry_count=3).send_message("hi") is False
         assert mock_post.call_count == 3
 
     @patch("pttautosign.utils.telegram.time.sleep")
-    @patch("pttautosign.utils.telegram.requests.post")
+    @patch("pttautosign.utils.telegram.requests.Session.post")
     def test_retry_count_below_one_still_attempts_once(self, mock_post, _sleep):
         mock_post.return_value = _ok_response()
         assert make_bot(retry_count=0).send_message("hi") is True
         assert mock_post.call_count == 1
 
 
+class TestRateLimitsAndRetries:
+    @patch("pttautosign.utils.telegram.time.sleep")
+    @patch("pttautosign.utils.telegram.requests.Session.post")
+    def test_429_waits_server_retry_after_plus_jitter(self, mock_post, mock_sleep):
+        mock_post.side_effect = [
+            _error_response(429, {"ok": False, "error_code": 429, "parameters": {"retry_after": 7}}),
+            _ok_response(),
+        ]
+        assert make_bot().send_message("hi") is True
+        (delay,), _ = mock_sleep.call_args
+        assert 7 <= delay <= 7.5
+
+    @patch("pttautosign.utils.telegram.time.sleep")
+    @patch("pttautosign.utils.telegram.requests.Session.post")
+    def test_429_retry_after_header_fallback(self, mock_post, mock_sleep):
+        mock_post.side_effect = [_error_response(429, headers={"Retry-After": "3"}), _ok_response()]
+        assert make_bot().send_message("hi") is True
+        (delay,), _ = mock_sleep.call_args
+        assert 3 <= delay <= 3.5
+
+    @patch("pttautosign.utils.telegram.time.sleep")
+    @patch("pttautosign.utils.telegram.requests.Session.post")
+    def test_429_holds_back_other_senders(self, mock_post, _sleep):
+        mock_post.side_effect = [
+            _error_response(429, {"ok": False, "parameters": {"retry_after": 30}}),
+            _ok_response(),
+        ]
+        bot = make_bot(chat_rate_limit=1)
+        bot.send_message("hi")
+        assert bot.chat_limiter.reserve() >= 29
+
+    @patch("pttautosign.utils.telegram.time.sleep")
+    @patch("pttautosign.utils.telegram.requests.Session.post")
+    def test_429_on_last_attempt_does_not_wait(self, mock_post, mock_sleep):
+        mock_post.return_value = _error_response(429, {"ok": False, "parameters": {"retry_after": 30}})
+        bot = make_bot(retry_count=1, chat_rate_limit=1)
+        assert bot.send_message("hi") is False
+        mock_sleep.assert_not_called()
+        assert bot.chat_limiter.reserve() < 29
+
+    @patch("pttautosign.utils.telegram.time.sleep")
+    @patch("pttautosign.utils.telegram.requests.Session.post")
+    def test_permanent_4xx_fails_fast(self, mock_post, mock_sleep):
+        mock_post.return_value = _error_response(400, {"ok": False, "description": "Bad Request: chat not found"})
+        assert make_bot(retry_count=3).send_message("hi") is False
+        assert mock_post.call_count == 1
+        mock_sleep.assert_not_called()
+
+    @patch("pttautosign.utils.telegram.time.sleep")
+    @patch("pttautosign.utils.telegram.requests.Session.post")
+    def test_5xx_is_retried(self, mock_post, _sleep):
+        mock_post.side_effect = [_error_response(502), _ok_response()]
+        assert make_bot(retry_count=3).send_message("hi") is True
+        assert mock_post.call_count == 2
+
+    @patch("pttautosign.utils.rate_limit.time.sleep")
+    @patch("pttautosign.utils.telegram.requests.Session.post")
+    def test_chat_limiter_paces_sends(self, mock_post, mock_sleep):
+        mock_post.return_value = _ok_response()
+        bot = make_bot(chat_rate_limit=1)
+        for _ in range(3):
+            assert bot.send_message("hi") is True
+        delays = [call.args[0] for call in mock_sleep.call_args_list]
+        assert len(delays) == 2 and all(0.9 <= d <= 2.0 for d in delays)
+
+    def test_zero_rate_disables_limiters(self):
+        bot = make_bot()
+        assert bot.global_limiter is None and bot.chat_limiter is None
+
+
+class TestOutbox:
+    @patch("pttautosign.utils.telegram.time.sleep")
+    @patch("pttautosign.utils.telegram.requests.Session.post")
+    def test_exhausted_retries_store_message(self, mock_post, _sleep, tmp_path):
+        from pttautosign.utils.outbox import NotificationOutbox
+
+        mock_post.side_effect = requests.exceptions.ConnectionError("down")
+        outbox = NotificationOutbox(str(tmp_path / "outbox.sqlite3"))
+        bot = TelegramBot(TelegramConfig(token=TOKEN, chat_id="42", rate_limit=0, chat_rate_limit=0), outbox=outbox)
+        assert bot.send_message("result") is False
+        assert bot.send_message("result") is False
+        assert [text for _, text, _ in outbox.pending()] == ["result"]
+
+    @patch("pttautosign.utils.telegram.requests.Session.post")
+    def test_permanent_failure_is_not_stored(self, mock_post, tmp_path):
+        from pttautosign.utils.outbox import NotificationOutbox
+
+        mock_post.return_value = _error_response(400)
+        outbox = NotificationOutbox(str(tmp_path / "outbox.sqlite3"))
+        bot = TelegramBot(TelegramConfig(token=TOKEN, chat_id="42", rate_limit=0, chat_rate_limit=0), outbox=outbox)
+        assert bot.send_message("bad") is False
+        assert outbox.pending() == []
+
+    @patch("pttautosign.utils.telegram.time.sleep")
+    @patch("pttautosign.utils.telegram.requests.Session.post")
+    def test_replay_sends_oldest_first_and_stops_on_failure(self, mock_post, _sleep, tmp_path):
+        from pttautosign.utils.outbox import NotificationOutbox
+
+        outbox = NotificationOutbox(str(tmp_path / "outbox.sqlite3"))
+        for text in ("one", "two", "three"):
+            outbox.add(text)
+        mock_post.side_effect = [_ok_response()] + [requests.exceptions.ConnectionError("down")] * 3
+        bot = TelegramBot(TelegramConfig(token=TOKEN, chat_id="42", rate_limit=0, chat_rate_limit=0), outbox=outbox)
+        assert bot.replay_outbox() == 1
+        assert mock_post.call_args_list[0].kwargs["json"]["text"] == "one"
+        assert [text for _, text, _ in outbox.pending()] == ["two", "three"]
+
+    @patch("pttautosign.utils.telegram.requests.Session.post")
+    def test_background_replay_is_awaited_by_flush(self, mock_post, tmp_path):
+        from pttautosign.utils.outbox import NotificationOutbox
+
+        mock_post.return_value = _ok_response()
+        outbox = NotificationOutbox(str(tmp_path / "outbox.sqlite3"))
+        outbox.add("late")
+        bot = TelegramBot(TelegramConfig(token=TOKEN, chat_id="42", rate_limit=0, chat_rate_limit=0), outbox=outbox)
+        bot.start_outbox_replay()
+        assert bot.flush(5) is True
+        assert outbox.pending() == []
+
+
+class TestConnectionPool:
+    def test_session_is_created_on_first_use(self):
+        bot = make_bot()
+        assert bot.connection_stats() == {"requests": 0, "connections": 0}
+        assert bot._session is None
+        assert bot.session is bot.session
+
+    def test_pool_is_sized_from_config(self):
+        bot = make_bot(pool_size=3)
+        assert bot.session.get_adapter(bot.api_url)._pool_maxsize == 3
+
+    def test_connections_are_reused(self, caplog):
+        from pttautosign.testing.telegram_stub import TelegramStub
+
+        with TelegramStub() as stub:
+            bot = make_bot(retry_count=1, api_base=stub.base_url)
+            with caplog.at_level("DEBUG", logger="pttautosign.utils.telegram"):
+                for _ in range(3):
+                    assert bot.send_message("hi") is True
+            stats = bot.connection_stats()
+            bot.close()
+
+        assert stats == {"requests": 3, "connections": 1}
+        assert any("連線重用" in r.getMessage() for r in caplog.records)
+
+
 class TestTokenRedactionInLogs:
     @patch("pttautosign.utils.telegram.time.sleep")
-    @patch("pttautosign.utils.telegram.requests.post")
+    @patch("pttautosign.utils.telegram.requests.Session.post")
     def test_token_not_leaked_in_failure_log(self, mock_post, _sleep, caplog):
         # HTTPError messages embed the full request URL, including the token.
         url = f"https://api.telegram.org/bot{TOKEN}/sendMessage"
@@ -104,3 +265,51 @@ class TestErrorNotification:
         body = mock_send.call_args[0][0]
         assert "&lt;script&gt;" in body
         assert "<script>" not in body
+
+    @patch.object(TelegramBot, "send_message", return_value=True)
+    def test_repeated_error_is_reported_once_per_window(self, mock_send):
+        now = [1000.0]
+        bot = make_bot(error_throttle=ErrorThrottle(60, clock=lambda: now[0]))
+        for _ in range(3):
+            assert bot.send_error_notification(ConnectionError("timeout after 30s")) is True
+        assert mock_send.call_count == 1
+        assert "Occurrences" not in mock_send.call_args[0][0]
+
+        now[0] += 61
+        bot.send_error_notification(ConnectionError("timeout after 31s"))
+        assert mock_send.call_count == 2
+        assert "<b>Occurrences:</b> 3 since the last report" in mock_send.call_args[0][0]
+
+    @patch.object(TelegramBot, "send_message", return_value=True)
+    def test_repeat_count_of_stopped_error_is_sent_on_next_check(self, mock_send):
+        now = [1000.0]
+        bot = make_bot(error_throttle=ErrorThrottle(60, clock=lambda: now[0]))
+        for _ in range(3):
+            bot.send_error_notification(ConnectionError("timeout after 30s"))
+        now[0] += 61
+        bot.send_error_notification(ValueError("other"))
+        texts = [call[0][0] for call in mock_send.call_args_list]
+        assert len(texts) == 3
+        assert "ConnectionError: timeout after 30s" in texts[1]
+        assert "<b>Occurrences:</b> 2 more after the last report" in texts[1]
+        assert "ValueError" in texts[2]
+
+    @patch.object(TelegramBot, "send_message", return_value=True)
+    def test_close_sends_due_repeat_counts(self, mock_send):
+        now = [1000.0]
+        bot = make_bot(error_throttle=ErrorThrottle(60, clock=lambda: now[0]))
+        bot.send_error_notification(ConnectionError("timeout"))
+        bot.send_error_notification(ConnectionError("timeout"))
+        bot.close()
+        assert mock_send.call_count == 1
+        now[0] += 61
+        bot.close()
+        assert mock_send.call_count == 2
+        assert "1 more after the last report" in mock_send.call_args[0][0]
+
+    @patch.object(TelegramBot, "send_message", return_value=True)
+    def test_distinct_errors_are_not_throttled(self, mock_send):
+        bot = make_bot(error_throttle=ErrorThrottle(60))
+        bot.send_error_notification(ConnectionError("timeout"))
+        bot.send_error_notification(ValueError("timeout"))
+        assert mock_send.call_count == 2
@@ -0,0 +1,92 @@
+"""Tests for the local Telegram Bot API stub."""
+
+from unittest.mock import patch
+
+import requests
+
+from pttautosign.testing.telegram_stub import STUB_BOT_USERNAME, TelegramStub
+from pttautosign.utils.config import TelegramConfig
+from pttautosign.utils.telegram import TelegramBot
+
+TOKEN = "123456789:ABCdef_GHI-jkl"
+
+
+def _bot(stub: TelegramStub, **overrides) -> TelegramBot:
+    params = dict(token=TOKEN, chat_id="42", retry_count=1, chat_rate_limit=0, api_base=stub.base_url)
+    params.update(overrides)
+    return TelegramBot(TelegramConfig(**params))
+
+
+def test_telegram_bot_sends_through_stub():
+    with TelegramStub() as stub:
+        bot = _bot(stub)
+        assert bot.send_message("hello") is True
+        assert bot.send_message("again") is True
+
+    assert stub.request_count == 2
+    method, payload = stub.requests[0]
+    assert method == "sendMessage"
+    assert payload["chat_id"] == "42" and payload["text"] == "hello"
+    assert stub.statuses() == [200, 200]
+
+
+def test_get_me_and_edit_message_text():
+    with TelegramStub() as stub:
+        me = requests.get(f"{stub.api_url(TOKEN)}/getMe", timeout=5).json()
+        sent = requests.post(f"{stub.api_url(TOKEN)}/sendMessage", json={"chat_id": 1, "text": "a"}, timeout=5).json()
+        message_id = sent["result"]["message_id"]
+        edited = requests.post(
+            f"{stub.api_url(TOKEN)}/editMessageText",
+            json={"chat_id": 1, "message_id": message_id, "text": "b"},
+            timeout=5,
+        )
+        missing = requests.post(
+            f"{stub.api_url(TOKEN)}/editMessageText", json={"chat_id": 1, "message_id": 99, "text": "b"}, timeout=5
+        )
+
+    assert me["result"]["id"] == 123456789 and me["result"]["username"] == STUB_BOT_USERNAME
+    assert edited.json()["result"]["text"] == "b"
+    assert missing.status_code == 400
+
+
+def test_unknown_method_is_404():
+    with TelegramStub() as stub:
+        assert requests.post(f"{stub.api_url(TOKEN)}/sendSticker", json={}, timeout=5).status_code == 404
+
+
+@patch("pttautosign.utils.telegram.time.sleep")
+def test_bot_retries_through_5xx_burst(_sleep):
+    with TelegramStub() as stub:
+        stub.fail_next(502, count=2)
+        assert _bot(stub, retry_count=3).send_message("hello") is True
+    assert stub.statuses() == [502, 502, 200]
+
+
+@patch("pttautosign.utils.telegram.time.sleep")
+def test_bot_waits_retry_after_from_stub(mock_sleep):
+    with TelegramStub() as stub:
+        stub.fail_next(429, retry_after=4)
+        assert _bot(stub, retry_count=2).send_message("hello") is True
+    assert 4 <= mock_sleep.call_args[0][0] <= 4.5
+    assert stub.statuses() == [429, 200]
+
+
+def test_chat_flood_control_returns_retry_after():
+    with TelegramStub(chat_rate=1) as stub:
+        url = f"{stub.api_url(TOKEN)}/sendMessage"
+        first = requests.post(url, json={"chat_id": 1, "text": "a"}, timeout=5)
+        second = requests.post(url, json={"chat_id": 1, "text": "b"}, timeout=5)
+        other_chat = requests.post(url, json={"chat_id": 2, "text": "c"}, timeout=5)
+
+    assert first.status_code == 200 and other_chat.status_code == 200
+    assert second.status_code == 429
+    assert second.json()["parameters"]["retry_after"] == 1
+    assert second.headers["Retry-After"] == "1"
+
+
+def test_paced_bot_is_never_flood_limited():
+    with TelegramStub(chat_rate=20) as stub:
+        bot = _bot(stub, chat_rate_limit=10)
+        for i in range(5):
+            assert bot.send_message(f"m{i}") is True
+    assert stub.statuses() == [200] * 5